@@ -0,0 +1,207 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+from outputs import OUTPUT_DIR
+from pipeline import STATIC_DATA
+
+# Content-addressed store: each blob is saved once as objects/<sha[:2]>/<sha>,
+# and manifest.json maps logical names (paths relative to the output root) to hashes
+DATA_DIR = OUTPUT_DIR
+STORE_DIR = os.environ.get("ARTIFACT_STORE_DIR", os.path.join(DATA_DIR, ".artifacts"))
+MANIFEST_PATH = os.path.join(STORE_DIR, "manifest.json")
+
+# What gets ingested from data/ by default
+ARTIFACT_PATTERNS = ["*.json", "*.csv", "*.txt", "*.md", "*.xml", "*.db", "*.bin", "*.json.gz", "*.json.br", "pdfs/*.pdf"]
+
+# Outputs are hard-linked into the store rather than copied: write_output() and the
+# downloader only ever replace them atomically. The hand-maintained datasets are
+# copied, since an editor may save them in place, which would change the blob too.
+COPIED_NAMES = set(STATIC_DATA)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+# record() is called from concurrent download threads
+_manifest_lock = threading.Lock()
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def object_path(sha256):
+    """Return the store path of a blob."""
+    return os.path.join(STORE_DIR, "objects", sha256[:2], sha256)
+
+def load_manifest(path=MANIFEST_PATH):
+    """Return the manifest's {name: {"sha256", "size", "mtime_ns"}} map, empty if missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["artifacts"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def save_manifest(artifacts, path=MANIFEST_PATH):
+    """Atomically write the manifest; an unchanged manifest is left alone (updated_at included)."""
+    if os.path.exists(path) and load_manifest(path) == artifacts:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "artifacts": dict(sorted(artifacts.items()))
+        }, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def put_file(path, adopt=False):
+    """Store a file's content and return its SHA-256; a blob already in the store is not written again.
+
+    Objects are read-only. adopt=True hard-links the file into the store (and
+    onto an existing identical blob) instead of copying it; only use it for files
+    that are always replaced atomically, like downloader.download_file output,
+    never rewritten in place.
+    """
+    sha256 = file_sha256(path)
+    target = object_path(sha256)
+    if os.path.exists(target):
+        if adopt and not os.path.samefile(path, target):
+            _link_or_copy(target, path)
+        return sha256
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if adopt:
+        _link_or_copy(path, tmp_path)
+    else:
+        shutil.copyfile(path, tmp_path)
+    os.chmod(tmp_path, READ_ONLY)
+    os.replace(tmp_path, target)
+    return sha256
+
+def _link_or_copy(source, dest):
+    """Atomically make dest a hard link to source, or a copy across filesystems."""
+    tmp_path = f"{dest}.{os.getpid()}.{threading.get_ident()}.link"
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, dest)
+
+def _entry(path, adopt=False):
+    """Store a file and return its manifest entry."""
+    sha256 = put_file(path, adopt=adopt)
+    # Stat afterwards: adopting may have swapped the file for a link to the blob
+    st = os.stat(path)
+    return {"sha256": sha256, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def ingest(names, base_dir=DATA_DIR, manifest=None):
+    """Store the named files (relative to base_dir) and return the updated manifest map.
+
+    Files whose size and mtime match their manifest entry are not re-hashed.
+    Outputs are adopted into the store (see COPIED_NAMES).
+    """
+    artifacts = dict(load_manifest() if manifest is None else manifest)
+    for name in names:
+        path = os.path.join(base_dir, name)
+        st = os.stat(path)
+        entry = artifacts.get(name)
+        if (entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and os.path.exists(object_path(entry["sha256"]))):
+            continue
+        artifacts[name] = _entry(path, adopt=name not in COPIED_NAMES)
+    return artifacts
+
+def record(path, name, adopt=False):
+    """Store one file under a logical name, update the manifest and return its SHA-256."""
+    entry = _entry(path, adopt=adopt)
+    with _manifest_lock:
+        artifacts = load_manifest()
+        artifacts[name] = entry
+        save_manifest(artifacts)
+    return entry["sha256"]
+
+def default_names(base_dir=DATA_DIR):
+    """Return the logical names of the artifacts under base_dir."""
+    names = []
+    for pattern in ARTIFACT_PATTERNS:
+        names.extend(os.path.relpath(path, base_dir) for path in glob.glob(os.path.join(base_dir, pattern)))
+    return sorted(names)
+
+def diff_manifests(old, new):
+    """Return (added, changed, removed) logical names between two manifest maps."""
+    added = sorted(name for name in new if name not in old)
+    removed = sorted(name for name in old if name not in new)
+    changed = sorted(name for name in new if name in old and new[name]["sha256"] != old[name]["sha256"])
+    return added, changed, removed
+
+def link_view(names, dest_dir, manifest=None):
+    """Expose stored artifacts in dest_dir as hard links (copies across filesystems).
+
+    Entries already holding the right blob are left alone, so unchanged
+    artifacts are never re-linked or re-copied. No symlinks: dest_dir may be
+    deployed without the store. Returns the names that changed.
+    """
+    artifacts = load_manifest() if manifest is None else manifest
+    updated = []
+    for name in names:
+        entry = artifacts[name]
+        source = object_path(entry["sha256"])
+        dest = os.path.join(dest_dir, name)
+        # A link to the blob, or a copy of it from an earlier run across filesystems
+        if os.path.exists(dest) and not os.path.islink(dest) and (
+                os.path.samefile(source, dest)
+                or (os.path.getsize(dest) == entry["size"] and file_sha256(dest) == entry["sha256"])):
+            continue
+
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        _link_or_copy(source, dest)
+        updated.append(name)
+    return updated
+
+def collect_garbage(manifest=None):
+    """Delete blobs no manifest entry refers to; hard-linked views keep their data."""
+    artifacts = load_manifest() if manifest is None else manifest
+    referenced = {entry["sha256"] for entry in artifacts.values()}
+    removed = 0
+    for path in glob.glob(os.path.join(STORE_DIR, "objects", "*", "*")):
+        if os.path.basename(path) not in referenced:
+            os.remove(path)
+            removed += 1
+    return removed
+
+if __name__ == "__main__":
+    # python3 artifact_store.py                     ingest data/ and show what changed
+    # python3 artifact_store.py link DEST NAME...   link stored artifacts into DEST
+    # python3 artifact_store.py gc                  drop unreferenced blobs
+    command = sys.argv[1] if len(sys.argv) > 1 else "ingest"
+
+    if command == "link":
+        dest_dir, names = sys.argv[2], sys.argv[3:]
+        artifacts = ingest(names)
+        save_manifest(artifacts)
+        updated = link_view(names, dest_dir, artifacts)
+        print(f"🔗 Linked {len(updated)} changed artifacts into {dest_dir} ({len(names) - len(updated)} already up to date)")
+    elif command == "gc":
+        print(f"🧹 Removed {collect_garbage()} unreferenced blobs")
+    else:
+        old = load_manifest()
+        artifacts = ingest(default_names(), manifest=old)
+        artifacts = {name: entry for name, entry in artifacts.items() if os.path.exists(os.path.join(DATA_DIR, name))}
+        save_manifest(artifacts)
+        added, changed, removed = diff_manifests(old, artifacts)
+        print(f"📦 {len(artifacts)} artifacts in {STORE_DIR}")
+        for label, names in (("added", added), ("changed", changed), ("removed from data/", removed)):
+            for name in names:
+                print(f"  {label}: {name}")
+        if not (added or changed or removed):
+            print("  nothing changed since the last run")
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+
+# Journals of finished sources, one per extractor, so a crashed run can be resumed
+CHECKPOINT_DIR = os.environ.get("EXTRACT_CHECKPOINT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints"))
+
+class Checkpoint:
+    """Append-only NDJSON journal of per-source results for one extraction run.
+
+    Each finished source is appended as {"key", "result"} and flushed at once,
+    so everything collected before a crash is on disk. resume=True loads the
+    journal left by an unfinished run; otherwise the run starts from scratch.
+    """
+
+    def __init__(self, name, resume=False):
+        self.path = os.path.join(CHECKPOINT_DIR, f"{name}.ndjson")
+        self.results = {}
+        self._lock = threading.Lock()
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        if resume:
+            self.results = load_journal(self.path)
+            if self.results:
+                print(f"⏯️ Resuming: {len(self.results)} sources already done ({self.path})")
+            # Rewrite the journal first, in case its last line was cut off
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, result in self.results.items():
+                    f.write(json_line(key, result))
+            os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def __contains__(self, key):
+        return key in self.results
+
+    def get(self, key):
+        """Return the result journaled by an earlier run for key, or None."""
+        return self.results.get(key)
+
+    def record(self, key, result):
+        """Append one finished source to the journal."""
+        line = json_line(key, result)
+        with self._lock:
+            # Keep the result too, so get() never hands back None for a finished source
+            self.results[key] = result
+            self._file.write(line)
+            self._file.flush()
+
+    def finish(self):
+        """Close and delete the journal once the run's output has been written."""
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def journaled(worker, checkpoint, key_of=lambda item: item["url"]):
+    """Return worker, reusing results journaled in checkpoint and journaling new ones.
+
+    Failed sources (None) are not journaled, so a resumed run retries them.
+    With checkpoint=None worker is returned unchanged.
+    """
+    if checkpoint is None:
+        return worker
+
+    def run(item):
+        key = key_of(item)
+        if key in checkpoint:
+            return checkpoint.get(key)
+        result = worker(item)
+        if result is not None:
+            checkpoint.record(key, result)
+        return result
+    return run
+
+def json_line(key, result):
+    """Return one journal line."""
+    return json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n"
+
+def load_journal(path):
+    """Return {key: result} from a journal; a line cut off by a crash is ignored."""
+    results = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                results[entry["key"]] = entry["result"]
+    except OSError:
+        pass
+    return results
@@ -1,5 +1,5 @@
-import json
 import time
+from outputs import write_json
 
 def create_comprehensive_epilepsy_database():
     """Create a comprehensive epilepsy and pregnancy database from the provided content."""
@@ -246,8 +246,7 @@ if __name__ == "__main__":
     epilepsy_data = create_comprehensive_epilepsy_database()
     
     # Save the comprehensive epilepsy and pregnancy data
-    with open("epilepsy_pregnancy_comprehensive_database.json", "w", encoding="utf-8") as f:
-        json.dump(epilepsy_data, f, indent=2, ensure_ascii=False)
+    write_json("epilepsy_pregnancy_comprehensive_database.json", epilepsy_data)
     
     print(f"\n✅ Comprehensive epilepsy and pregnancy database created!")
     print(f"📈 Successfully created database with {epilepsy_data['extraction_info']['successful_extractions']} sources")
@@ -1,5 +1,5 @@
-import json
 import time
+from outputs import write_json
 
 def create_pregnancy_registry_database():
     """Create a comprehensive pregnancy exposure registry database."""
@@ -145,8 +145,7 @@ if __name__ == "__main__":
     registry_data = create_pregnancy_registry_database()
     
     # Save the pregnancy registry data
-    with open("pregnancy_registry_comprehensive_database.json", "w", encoding="utf-8") as f:
-        json.dump(registry_data, f, indent=2, ensure_ascii=False)
+    write_json("pregnancy_registry_comprehensive_database.json", registry_data)
     
     print(f"\n✅ Comprehensive pregnancy registry database created!")
     print(f"📈 Successfully created database with {registry_data['extraction_info']['successful_extractions']} sources")
@@ -1,8 +1,16 @@
 import json
 import csv
+import io
 import xml.etree.ElementTree as ET
 import time
 import os
+from outputs import write_text
+
+def csv_text(rows):
+    """Return rows formatted as CSV."""
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
 
 def create_csv_files():
     """Create CSV files for tabular data like medication lists and tracking data."""
@@ -18,9 +26,7 @@ def create_csv_files():
         ["Phenytoin", "Dilantin", "Category D", "Moderate Risk", "Risk of fetal hydantoin syndrome", "Folic acid, vitamin K"]
     ]
     
-    with open("../epilepsy_medications.csv", "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerows(epilepsy_meds)
+    write_text("epilepsy_medications.csv", csv_text(epilepsy_meds))
     
     # Pregnancy Tracking CSV
     pregnancy_tracking = [
@@ -37,9 +43,7 @@ def create_csv_files():
         ["37", "Ninth ASM level", "Monitor levels", "Combined visit", "Growth scan", "Delivery ready"]
     ]
     
-    with open("../pregnancy_tracking_schedule.csv", "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerows(pregnancy_tracking)
+    write_text("pregnancy_tracking_schedule.csv", csv_text(pregnancy_tracking))
     
     # Seizure Tracking CSV
     seizure_tracking = [
@@ -49,9 +53,7 @@ def create_csv_files():
         ["2025-10-03", "16:45", "Focal", "30 seconds", "None", "Lamotrigine 200mg", "Very brief"]
     ]
     
-    with open("../seizure_tracking_log.csv", "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerows(seizure_tracking)
+    write_text("seizure_tracking_log.csv", csv_text(seizure_tracking))
     
     print("✅ Created CSV files: epilepsy_medications.csv, pregnancy_tracking_schedule.csv, seizure_tracking_log.csv")
 
@@ -80,8 +82,9 @@ def create_xml_files():
     monitoring.text = "Regular monitoring of AED levels during pregnancy is essential"
     
     # Save XML
-    tree = ET.ElementTree(guidelines)
-    tree.write("../medical_guidelines.xml", encoding="utf-8", xml_declaration=True)
+    # The date attribute changes daily, so it is not compared
+    xml = ET.tostring(guidelines, encoding="unicode", xml_declaration=True)
+    write_text("medical_guidelines.xml", xml, volatile=r' date="[0-9-]+"')
     
     print("✅ Created XML file: medical_guidelines.xml")
 
@@ -124,8 +127,7 @@ IMPORTANT NOTES:
 - Attend all scheduled appointments
 """
     
-    with open("../emergency_information.txt", "w", encoding="utf-8") as f:
-        f.write(emergency_info)
+    write_text("emergency_information.txt", emergency_info)
     
     # Medication Instructions TXT
     medication_instructions = """EPILEPSY MEDICATION INSTRUCTIONS DURING PREGNANCY
@@ -168,8 +170,7 @@ GENERAL INSTRUCTIONS:
 - Maintain seizure diary
 """
     
-    with open("../medication_instructions.txt", "w", encoding="utf-8") as f:
-        f.write(medication_instructions)
+    write_text("medication_instructions.txt", medication_instructions)
     
     print("✅ Created TXT files: emergency_information.txt, medication_instructions.txt")
 
@@ -248,8 +249,7 @@ If you have a seizure:
 - Report any concerns immediately
 """
     
-    with open("../user_guide.md", "w", encoding="utf-8") as f:
-        f.write(user_guide)
+    write_text("user_guide.md", user_guide)
     
     # API Documentation MD
     api_docs = """# Epilepsy Pregnancy App - API Documentation
@@ -305,8 +305,7 @@ Returns emergency information and contacts
 - **PDF**: Clinical guidelines and forms
 """
     
-    with open("../api_documentation.md", "w", encoding="utf-8") as f:
-        f.write(api_docs)
+    write_text("api_documentation.md", api_docs)
     
     print("✅ Created MD files: user_guide.md, api_documentation.md")
 
@@ -0,0 +1,157 @@
+import io
+import json
+import os
+import re
+import time
+from http_client import fetch, ACCEPT_JSON, MAX_CONNECTIONS_PER_HOST
+from fetch_engine import run_per_host
+from checkpoint import journaled
+from spl_parser import parse_spl
+import fixtures
+
+# DailyMed REST API v2 (https://dailymed.nlm.nih.gov/dailymed/app-support-web-services.cfm)
+DAILYMED_BASE_URL = "https://dailymed.nlm.nih.gov/dailymed/services/v2"
+# Largest page the API serves
+SEARCH_PAGE_SIZE = 100
+# Requests in flight at once; all go to one host, so they share its rate limiter
+DAILYMED_LANES = MAX_CONNECTIONS_PER_HOST
+
+# setid -> detail cache; an entry is reused until it expires or the label gets a new version
+CACHE_DIR = os.environ.get("DAILYMED_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dailymed_cache"))
+CACHE_TTL = int(os.environ.get("DAILYMED_CACHE_TTL", 7 * 24 * 3600))
+# Bumped when the cached detail gains fields, so older entries are refetched
+CACHE_FORMAT = 2
+
+ACCEPT_XML = "application/xml,text/xml"
+
+def fetch_json(path, params=None, timeout=15):
+    """GET a DailyMed API path and return the decoded JSON, raising on HTTP errors."""
+    resp = fetch(f"{DAILYMED_BASE_URL}/{path}", params=params, accept=ACCEPT_JSON, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+def search_page(drug_name, page):
+    """Return (spls, total_pages) for one page of an SPL search by drug name."""
+    data = fetch_json("spls.json", {"drug_name": drug_name, "pagesize": SEARCH_PAGE_SIZE, "page": page})
+    metadata = data.get("metadata") or {}
+    try:
+        total_pages = int(metadata.get("total_pages") or 1)
+    except (TypeError, ValueError):
+        total_pages = 1
+    return data.get("data") or [], total_pages
+
+def run_dailymed(items, worker):
+    """Run worker over items with DAILYMED_LANES requests in flight."""
+    return run_per_host(items, worker, url_of=lambda item: DAILYMED_BASE_URL, lanes_per_host=DAILYMED_LANES)
+
+def search_spls(drug_names, checkpoint=None):
+    """Return {drug_name: [spl, ...]} with every result page of each search.
+
+    First pages for all drugs are fetched concurrently, then all remaining pages.
+    A failed search maps to an empty list. Finished pages are journaled in
+    checkpoint (see checkpoint.py), so a resumed run only fetches the rest.
+    """
+    first_pages = run_dailymed(
+        drug_names,
+        journaled(lambda name: search_page(name, 1), checkpoint, key_of=lambda name: f"search:{name}:1"),
+    )
+    results = {}
+    remaining = []
+    for name, first in zip(drug_names, first_pages):
+        spls, total_pages = first or ([], 1)
+        results[name] = list(spls)
+        remaining.extend((name, page) for page in range(2, total_pages + 1))
+
+    worker = journaled(lambda task: search_page(*task), checkpoint, key_of=lambda task: f"search:{task[0]}:{task[1]}")
+    for (name, page), result in zip(remaining, run_dailymed(remaining, worker)):
+        if result:
+            results[name].extend(result[0])
+    return results
+
+def cache_path(setid):
+    """Return the cache file path for one setid."""
+    return os.path.join(CACHE_DIR, f"{re.sub(r'[^A-Za-z0-9-]', '_', setid)}.json")
+
+def load_cached_detail(setid, spl_version=None):
+    """Return the cached detail for a setid, or None if missing, expired or for another version.
+
+    While fixtures are being recorded nothing is reused, so every label lands in the archive.
+    """
+    if fixtures.recording():
+        return None
+    try:
+        with open(cache_path(setid), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("format") != CACHE_FORMAT or time.time() - entry.get("fetched_at", 0) > CACHE_TTL:
+        return None
+    if spl_version is not None and str(entry.get("spl_version")) != str(spl_version):
+        return None
+    return entry["detail"]
+
+def store_detail(setid, spl_version, detail):
+    """Atomically cache the detail fetched for a setid."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(setid)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"setid": setid, "spl_version": spl_version, "format": CACHE_FORMAT,
+                   "fetched_at": time.time(), "detail": detail}, f)
+    os.replace(tmp_path, path)
+
+def fetch_spl_label(setid):
+    """Stream one SPL document from the API through the SPL parser."""
+    resp = fetch(f"{DAILYMED_BASE_URL}/spls/{setid}.xml", accept=ACCEPT_XML, timeout=30, stream=True)
+    try:
+        resp.raise_for_status()
+        if fixtures.recording() or fixtures.replaying():
+            # The fixture layer has already read the whole body
+            return parse_spl(io.BytesIO(resp.content))
+        resp.raw.decode_content = True
+        return parse_spl(resp.raw)
+    finally:
+        resp.close()
+
+def fetch_spl_detail(setid):
+    """Fetch the NDC codes and pregnancy/lactation label sections of one SPL, in one request.
+
+    The NDCs are the label's packaged-product codes, so no ndcs.json request is needed.
+    """
+    label = fetch_spl_label(setid)
+    return {
+        "ndc": label["ndc"],
+        "active_ingredients": label["active_ingredients"],
+        "sections": label["sections"]
+    }
+
+def spl_details(spls):
+    """Return {setid: detail} for the given search results, fetching only uncached setids concurrently."""
+    details = {}
+    missing = []
+    for spl in spls:
+        setid = spl.get("setid")
+        if not setid or setid in details:
+            continue
+        cached = load_cached_detail(setid, spl.get("spl_version"))
+        if cached is not None:
+            details[setid] = cached
+        else:
+            details[setid] = None
+            missing.append(spl)
+
+    def worker(spl):
+        detail = fetch_spl_detail(spl["setid"])
+        store_detail(spl["setid"], spl.get("spl_version"), detail)
+        return detail
+
+    if missing:
+        print(f"📥 Fetching details for {len(missing)} labels ({len(details) - len(missing)} cached)")
+    for spl, detail in zip(missing, run_dailymed(missing, worker)):
+        details[spl["setid"]] = detail
+    return details
+
+def manufacturer_from_title(title):
+    """Return the labeler from an SPL title like "LAMOTRIGINE tablet [Teva Pharmaceuticals USA, Inc.]"."""
+    match = re.search(r"\[([^\[\]]+)\]\s*$", title or "")
+    return match.group(1).strip() if match else ""
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import requests
+from http_client import fetch
+from http_cache import cache_key, load_entry, store_entry, conditional_headers
+
+# Read size grows with the file: about MAX_CHUNKS_PER_FILE reads per download,
+# clamped so small files still use decent reads and huge ones don't buffer too much
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNKS_PER_FILE = 64
+# How many times a dropped connection is resumed before giving up
+MAX_RESUME_ATTEMPTS = 5
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class DownloadError(Exception):
+    """The server sent something other than the expected file."""
+
+def chunk_size_for(total_size):
+    """Pick a read size for a download of total_size bytes (None if unknown)."""
+    if not total_size:
+        return MIN_CHUNK_SIZE
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, total_size // MAX_CHUNKS_PER_FILE))
+
+def hash_file(path, digest=None):
+    """Feed a file's bytes into digest (a new SHA-256 by default) and return it."""
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+def _load_part_meta(meta_path, url):
+    """Return the validators saved with a partial download of url, or None."""
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("url") == url else None
+
+def _save_part_meta(meta_path, url, resp):
+    """Remember the validators of the response a partial download came from."""
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified")
+        }, f)
+
+def _discard(*paths):
+    """Remove files that may or may not exist."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _range_start(resp):
+    """Return the first byte offset of a 206 response's Content-Range, or None."""
+    content_range = resp.headers.get("Content-Range", "")
+    try:
+        return int(content_range.split()[1].split("-")[0])
+    except (IndexError, ValueError):
+        return None
+
+def _total_size(resp, offset):
+    """Return the full size of the file being downloaded, or None if unknown."""
+    if resp.status_code == 206:
+        total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = resp.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+def download_file(url, path, accept=None, magic=None, expected_sha256=None, timeout=30):
+    """Download url to path, resuming partial downloads and skipping unchanged files.
+
+    Data goes to path + ".part" and is renamed onto path only once it is complete
+    and verified, so path is never a truncated file. If the connection drops the
+    download resumes with a Range request (guarded by If-Range, so a file that
+    changed on the server starts over). A finished file is revalidated with
+    If-None-Match / If-Modified-Since and not downloaded again on 304.
+
+    magic: bytes the file must start with; anything else is rejected after the
+    first chunk. expected_sha256: reject the file if its digest differs.
+    Returns {"path", "size", "sha256", "not_modified", "resumed"}; raises
+    DownloadError or requests exceptions on failure.
+    """
+    part_path = f"{path}.part"
+    meta_path = f"{part_path}.json"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Finished downloads are kept as their own kind of record, apart from extracted pages
+    key = cache_key("download", url)
+    entry = load_entry(key)
+    if entry and not os.path.exists(path):
+        entry = None
+    resumed = False
+
+    for attempt in range(MAX_RESUME_ATTEMPTS + 1):
+        part_meta = _load_part_meta(meta_path, url)
+        offset = os.path.getsize(part_path) if part_meta and os.path.exists(part_path) else 0
+        request_headers = {"Accept-Encoding": "identity"}
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            validator = part_meta.get("etag") or part_meta.get("last_modified")
+            if validator:
+                request_headers["If-Range"] = validator
+        else:
+            request_headers.update(conditional_headers(entry))
+
+        resp = fetch(url, accept=accept, timeout=timeout, stream=True, extra_headers=request_headers)
+        try:
+            if resp.status_code == 304 and entry and not offset:
+                digest = hash_file(path).hexdigest()
+                if digest == entry["result"].get("sha256"):
+                    return {"path": path, "size": os.path.getsize(path), "sha256": digest,
+                            "not_modified": True, "resumed": False}
+                # The local copy was changed behind our back; fetch it again unconditionally
+                entry = None
+                continue
+            if resp.status_code == 304:
+                # Nothing to reuse, e.g. a fixture recorded by an older version with a warm cache
+                raise DownloadError(f"304 Not Modified for {url} with no cached download")
+            if resp.status_code == 416:
+                _discard(part_path, meta_path)
+                continue
+            resp.raise_for_status()
+
+            digest = hashlib.sha256()
+            if resp.status_code == 206:
+                if not offset or _range_start(resp) != offset:
+                    # Not the range we asked for; start over with a plain request
+                    _discard(part_path, meta_path)
+                    continue
+                hash_file(part_path, digest)
+                mode = "ab"
+                resumed = True
+            else:
+                offset = 0
+                mode = "wb"
+                _save_part_meta(meta_path, url, resp)
+
+            total_size = _total_size(resp, offset)
+            head = b""
+            if offset and magic:
+                with open(part_path, "rb") as f:
+                    head = f.read(len(magic))
+            size = offset
+            with open(part_path, mode) as f:
+                for chunk in resp.iter_content(chunk_size=chunk_size_for(total_size)):
+                    if not chunk:
+                        continue
+                    if magic and len(head) < len(magic):
+                        head += chunk[:len(magic) - len(head)]
+                        if not magic.startswith(head[:len(magic)]):
+                            raise DownloadError(f"not a valid file (header: {head!r})")
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            if attempt == MAX_RESUME_ATTEMPTS:
+                raise
+            print(f"   ⚠️ Connection dropped after {os.path.getsize(part_path) if os.path.exists(part_path) else 0} bytes, resuming: {e}")
+            continue
+        except DownloadError:
+            _discard(part_path, meta_path)
+            raise
+        finally:
+            resp.close()
+
+        if total_size is not None and size < total_size:
+            if attempt == MAX_RESUME_ATTEMPTS:
+                raise DownloadError(f"incomplete download ({size} of {total_size} bytes)")
+            print(f"   ⚠️ Download ended after {size} of {total_size} bytes, resuming")
+            continue
+        if magic and head != magic:
+            _discard(part_path, meta_path)
+            raise DownloadError(f"not a valid file (header: {head!r})")
+        sha256 = digest.hexdigest()
+        if expected_sha256 and sha256 != expected_sha256:
+            _discard(part_path, meta_path)
+            raise DownloadError(f"checksum mismatch (expected {expected_sha256}, got {sha256})")
+
+        os.replace(part_path, path)
+        _discard(meta_path)
+        store_entry(key, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                    {"sha256": sha256, "size": size})
+        return {"path": path, "size": size, "sha256": sha256, "not_modified": False, "resumed": resumed}
+
+    raise DownloadError(f"gave up after {MAX_RESUME_ATTEMPTS + 1} attempts")
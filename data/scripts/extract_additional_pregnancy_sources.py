@@ -1,6 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from fetch_engine import run_per_host
+from checkpoint import Checkpoint, journaled
+from html_parse import parse_main_content
+from sections import extract_sections, extract_lists
+from record_output import RecordOutput
+import sys
 import time
 
 # Additional pregnancy and maternal health sources
@@ -27,107 +31,70 @@ ADDITIONAL_SOURCES = [
     }
 ]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+def parse_additional_source(html, encoding, source):
+    """Parse sections and lists from an additional pregnancy source page"""
+    data = {
+        "source": source["name"],
+        "url": source["url"],
+        "description": source["description"],
+        "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sections": []
+    }
+    
+    main_content = parse_main_content(html, encoding)
+    
+    # Extract headings and their content
+    data["sections"].extend(extract_sections(main_content, min_title_length=3, min_text_length=15))
+    
+    # Extract any important lists with multiple items
+    data["sections"].extend(extract_lists(main_content, "Important Information {}", min_item_length=10, min_items=2))
+    
+    return data
 
-def extract_additional_sources():
-    """Extract data from additional pregnancy sources"""
-    all_data = {
+def extract_additional_source(source):
+    """Extract data from a single additional pregnancy source"""
+    try:
+        print(f"Extracting data from {source['name']}...")
+        return fetch_and_extract(source["url"], parse_additional_source, source)
+        
+    except Exception as e:
+        print(f"❌ Error with {source['name']}: {e}")
+        return None
+
+def extract_additional_sources(checkpoint=None, output_name="additional_pregnancy_data.json"):
+    """Extract data from additional pregnancy sources, write output_name and return the data.
+
+    Each source is added to the output as soon as it is extracted; finished sources are journaled in checkpoint.
+    """
+    output = RecordOutput(output_name, {
         "extraction_info": {
             "total_sources": len(ADDITIONAL_SOURCES),
             "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
             "successful_extractions": 0
         },
         "sources": []
-    }
+    })
     
-    for source in ADDITIONAL_SOURCES:
-        try:
-            print(f"Extracting data from {source['name']}...")
-            resp = requests.get(source["url"], headers=headers, timeout=15)
-            resp.raise_for_status()
-            
-            soup = BeautifulSoup(resp.text, "lxml")
-            data = {
-                "source": source["name"],
-                "url": source["url"],
-                "description": source["description"],
-                "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "sections": []
-            }
-            
-            # Extract main content
-            main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-            if not main_content:
-                main_content = soup
-            
-            # Extract headings and their content
-            for heading in main_content.find_all(["h1", "h2", "h3", "h4"]):
-                title = heading.get_text(strip=True)
-                if not title or len(title) < 3:
-                    continue
-                    
-                content = []
-                # Get content after this heading until next heading
-                for sibling in heading.find_next_siblings():
-                    if sibling.name in ["h1", "h2", "h3", "h4"]:
-                        break
-                    if sibling.name in ["p", "ul", "ol", "div"]:
-                        text = sibling.get_text(strip=True)
-                        if text and len(text) > 15:  # Filter out very short text
-                            content.append(text)
-                
-                if content:
-                    data["sections"].append({
-                        "title": title,
-                        "content": content
-                    })
-            
-            # Extract any important lists
-            lists = main_content.find_all(["ul", "ol"])
-            for i, list_elem in enumerate(lists):
-                items = []
-                for li in list_elem.find_all("li"):
-                    item_text = li.get_text(strip=True)
-                    if item_text and len(item_text) > 10:
-                        items.append(item_text)
-                
-                if items and len(items) > 1:  # Only include lists with multiple items
-                    data["sections"].append({
-                        "title": f"Important Information {i+1}",
-                        "content": items
-                    })
-            
-            if data["sections"]:
-                all_data["sources"].append(data)
-                all_data["extraction_info"]["successful_extractions"] += 1
-                print(f"✅ Successfully extracted {len(data['sections'])} sections from {source['name']}")
-            else:
-                print(f"⚠️ No content extracted from {source['name']}")
-                
-        except Exception as e:
-            print(f"❌ Error with {source['name']}: {e}")
-        
-        # Be respectful - add delay between requests
-        time.sleep(3)
+    def add_result(index, source, data):
+        if data and data["sections"]:
+            output.add("sources", index, data)
+            output.document["extraction_info"]["successful_extractions"] += 1
+            print(f"✅ Successfully extracted {len(data['sections'])} sections from {source['name']}")
+        elif data:
+            print(f"⚠️ No content extracted from {source['name']}")
     
-    return all_data
+    # Hosts are fetched concurrently; each host is paced by its rate limiter
+    run_per_host(ADDITIONAL_SOURCES, journaled(extract_additional_source, checkpoint), on_result=add_result)
+    return output.close()
 
 if __name__ == "__main__":
     print("🌍 Starting additional pregnancy data extraction...")
     print(f"📊 Targeting {len(ADDITIONAL_SOURCES)} additional sources...")
     
-    additional_data = extract_additional_sources()
-    
-    # Save the additional data
-    with open("additional_pregnancy_data.json", "w", encoding="utf-8") as f:
-        json.dump(additional_data, f, indent=2, ensure_ascii=False)
+    # --resume skips the sources an interrupted run already finished
+    checkpoint = Checkpoint("extract_additional_pregnancy_sources", resume="--resume" in sys.argv)
+    additional_data = extract_additional_sources(checkpoint)
+    checkpoint.finish()
     
     print(f"\n✅ Additional extraction complete!")
     print(f"📈 Successfully extracted from {additional_data['extraction_info']['successful_extractions']}/{additional_data['extraction_info']['total_sources']} sources")
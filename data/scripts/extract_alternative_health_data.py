@@ -1,6 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from fetch_engine import run_per_host
+from checkpoint import Checkpoint, journaled
+from html_parse import parse_main_content
+from sections import extract_sections, extract_lists
+from record_output import RecordOutput
+import sys
 import time
 
 # Alternative health sources that are more accessible
@@ -22,72 +26,31 @@ ALTERNATIVE_SOURCES = [
     }
 ]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+def parse_alternative_page(html, encoding, url, name, description):
+    """Parse health sections and lists from an alternative source page"""
+    data = {
+        "source": name,
+        "url": url,
+        "description": description,
+        "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sections": []
+    }
+    
+    main_content = parse_main_content(html, encoding)
+    
+    # Extract headings and their content
+    data["sections"].extend(extract_sections(main_content, min_title_length=3, min_text_length=15))
+    
+    # Extract any important lists with multiple items
+    data["sections"].extend(extract_lists(main_content, "Health Information {}", min_item_length=10, min_items=2))
+    
+    return data
 
 def extract_alternative_source(url, name, description):
     """Extract real data from alternative health sources"""
     try:
         print(f"Extracting data from {name}...")
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "lxml")
-        data = {
-            "source": name,
-            "url": url,
-            "description": description,
-            "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "sections": []
-        }
-        
-        # Extract main content
-        main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-        if not main_content:
-            main_content = soup
-        
-        # Extract headings and their content
-        for heading in main_content.find_all(["h1", "h2", "h3", "h4"]):
-            title = heading.get_text(strip=True)
-            if not title or len(title) < 3:
-                continue
-                
-            content = []
-            # Get content after this heading until next heading
-            for sibling in heading.find_next_siblings():
-                if sibling.name in ["h1", "h2", "h3", "h4"]:
-                    break
-                if sibling.name in ["p", "ul", "ol", "div"]:
-                    text = sibling.get_text(strip=True)
-                    if text and len(text) > 15:  # Filter out very short text
-                        content.append(text)
-            
-            if content:
-                data["sections"].append({
-                    "title": title,
-                    "content": content
-                })
-        
-        # Extract any important lists
-        lists = main_content.find_all(["ul", "ol"])
-        for i, list_elem in enumerate(lists):
-            items = []
-            for li in list_elem.find_all("li"):
-                item_text = li.get_text(strip=True)
-                if item_text and len(item_text) > 10:
-                    items.append(item_text)
-            
-            if items and len(items) > 1:  # Only include lists with multiple items
-                data["sections"].append({
-                    "title": f"Health Information {i+1}",
-                    "content": items
-                })
+        data = fetch_and_extract(url, parse_alternative_page, url, name, description)
         
         print(f"✅ Successfully extracted {len(data['sections'])} sections from {name}")
         return data
@@ -96,9 +59,12 @@ def extract_alternative_source(url, name, description):
         print(f"❌ Error extracting from {name}: {e}")
         return None
 
-def extract_all_alternative_data():
-    """Extract real data from alternative health sources"""
-    all_data = {
+def extract_all_alternative_data(checkpoint=None, output_name="alternative_health_data.json"):
+    """Extract real data from alternative health sources, write output_name and return the data.
+
+    Each source is added to the output as soon as it is extracted; finished sources are journaled in checkpoint.
+    """
+    output = RecordOutput(output_name, {
         "extraction_info": {
             "total_sources": len(ALTERNATIVE_SOURCES),
             "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -106,28 +72,29 @@ def extract_all_alternative_data():
             "note": "Real health data from alternative accessible sources"
         },
         "sources": []
-    }
+    })
     
-    for source in ALTERNATIVE_SOURCES:
-        data = extract_alternative_source(source["url"], source["name"], source["description"])
+    def add_result(index, source, data):
         if data:
-            all_data["sources"].append(data)
-            all_data["extraction_info"]["successful_extractions"] += 1
-        
-        # Be respectful - add delay between requests
-        time.sleep(3)
+            output.add("sources", index, data)
+            output.document["extraction_info"]["successful_extractions"] += 1
     
-    return all_data
+    # Hosts are fetched concurrently; each host is paced by its rate limiter
+    run_per_host(
+        ALTERNATIVE_SOURCES,
+        journaled(lambda source: extract_alternative_source(source["url"], source["name"], source["description"]), checkpoint),
+        on_result=add_result,
+    )
+    return output.close()
 
 if __name__ == "__main__":
     print("🌍 Starting alternative health data extraction...")
     print(f"📊 Targeting {len(ALTERNATIVE_SOURCES)} alternative sources...")
     
-    alt_data = extract_all_alternative_data()
-    
-    # Save the alternative health data
-    with open("alternative_health_data.json", "w", encoding="utf-8") as f:
-        json.dump(alt_data, f, indent=2, ensure_ascii=False)
+    # --resume skips the sources an interrupted run already finished
+    checkpoint = Checkpoint("extract_alternative_health_data", resume="--resume" in sys.argv)
+    alt_data = extract_all_alternative_data(checkpoint)
+    checkpoint.finish()
     
     print(f"\n✅ Alternative health extraction complete!")
     print(f"📈 Successfully extracted from {alt_data['extraction_info']['successful_extractions']}/{alt_data['extraction_info']['total_sources']} sources")
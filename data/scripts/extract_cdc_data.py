@@ -1,31 +1,25 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from html_parse import parse_document
+from sections import extract_sections
+from outputs import write_json
 
 URL = "https://www.cdc.gov/medicine-and-pregnancy/about/index.html"
-headers = {"User-Agent": "Mozilla/5.0 (compatible; DataExtractor/1.0)"}
 
-def extract_cdc_page(url):
-    resp = requests.get(url, headers=headers)
-    resp.raise_for_status()
-
-    soup = BeautifulSoup(resp.text, "lxml")
+def parse_cdc_page(html, encoding, url):
+    soup = parse_document(html, encoding)
     data = {"url": url, "sections": []}
 
-    # Extract headings and their paragraphs
-    for section in soup.find_all(["h2", "h3"]):
-        title = section.get_text(strip=True)
-        content = []
-        for sib in section.find_next_siblings():
-            if sib.name in ["h2", "h3"]:  # stop at next section
-                break
-            if sib.name in ["p", "ul", "ol"]:
-                content.append(sib.get_text(" ", strip=True))
-        data["sections"].append({"title": title, "content": content})
+    # Extract headings and their paragraphs, keeping every section as-is
+    data["sections"].extend(extract_sections(
+        soup, heading_tags=["h2", "h3"], content_tags=["p", "ul", "ol"],
+        min_title_length=None, min_text_length=None, separator=" ", keep_empty=True
+    ))
     return data
 
+def extract_cdc_page(url):
+    return fetch_and_extract(url, parse_cdc_page, url)
+
 if __name__ == "__main__":
     cdc_data = extract_cdc_page(URL)
-    with open("cdc_medicine_pregnancy.json", "w", encoding="utf-8") as f:
-        json.dump(cdc_data, f, indent=2, ensure_ascii=False)
+    write_json("cdc_medicine_pregnancy.json", cdc_data)
     print("✅ CDC data saved to cdc_medicine_pregnancy.json")
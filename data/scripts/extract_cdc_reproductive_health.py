@@ -1,95 +1,52 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from html_parse import parse_main_content
+from keywords import KeywordMatcher
+from sections import extract_sections, extract_lists, extract_links
+from outputs import write_json
 import time
 
 # Working CDC reproductive health URL
 CDC_URL = "https://www.cdc.gov/reproductivehealth/index.html"
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+# Links mentioning any of these are kept as resources
+PREGNANCY_LINK_KEYWORDS = KeywordMatcher(["pregnancy", "maternal", "prenatal", "pregnant", "baby", "infant", "reproductive"])
+
+def parse_cdc_reproductive_health(html, encoding):
+    """Parse sections, lists and resource links from the CDC page"""
+    data = {
+        "source": "CDC Reproductive Health",
+        "url": CDC_URL,
+        "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sections": []
+    }
+    
+    main_content = parse_main_content(html, encoding)
+    
+    # Extract headings and their content
+    data["sections"].extend(extract_sections(main_content, min_title_length=3, min_text_length=15))
+    
+    # Extract any important lists with multiple items
+    data["sections"].extend(extract_lists(main_content, "CDC Reproductive Health Information {}", min_item_length=10, min_items=2))
+    
+    # Extract any links to pregnancy/maternal health topics
+    pregnancy_links = [
+        {"text": text, "url": href if href.startswith("http") else f"https://www.cdc.gov{href}"}
+        for text, href in extract_links(main_content, PREGNANCY_LINK_KEYWORDS)
+    ]
+    
+    if pregnancy_links:
+        data["sections"].append({
+            "title": "CDC Reproductive Health Resources",
+            "content": [f"{link['text']}: {link['url']}" for link in pregnancy_links]
+        })
+    
+    return data
 
 def extract_cdc_reproductive_health():
     """Extract real data from CDC reproductive health page"""
     try:
         print("Extracting data from CDC Reproductive Health page...")
-        resp = requests.get(CDC_URL, headers=headers, timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "lxml")
-        data = {
-            "source": "CDC Reproductive Health",
-            "url": CDC_URL,
-            "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "sections": []
-        }
-        
-        # Extract main content
-        main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-        if not main_content:
-            main_content = soup
-        
-        # Extract headings and their content
-        for heading in main_content.find_all(["h1", "h2", "h3", "h4"]):
-            title = heading.get_text(strip=True)
-            if not title or len(title) < 3:
-                continue
-                
-            content = []
-            # Get content after this heading until next heading
-            for sibling in heading.find_next_siblings():
-                if sibling.name in ["h1", "h2", "h3", "h4"]:
-                    break
-                if sibling.name in ["p", "ul", "ol", "div"]:
-                    text = sibling.get_text(strip=True)
-                    if text and len(text) > 15:  # Filter out very short text
-                        content.append(text)
-            
-            if content:
-                data["sections"].append({
-                    "title": title,
-                    "content": content
-                })
-        
-        # Extract any important lists
-        lists = main_content.find_all(["ul", "ol"])
-        for i, list_elem in enumerate(lists):
-            items = []
-            for li in list_elem.find_all("li"):
-                item_text = li.get_text(strip=True)
-                if item_text and len(item_text) > 10:
-                    items.append(item_text)
-            
-            if items and len(items) > 1:  # Only include lists with multiple items
-                data["sections"].append({
-                    "title": f"CDC Reproductive Health Information {i+1}",
-                    "content": items
-                })
-        
-        # Extract any links to pregnancy/maternal health topics
-        links = main_content.find_all("a", href=True)
-        pregnancy_links = []
-        for link in links:
-            link_text = link.get_text(strip=True)
-            href = link.get("href", "")
-            if any(keyword in link_text.lower() or keyword in href.lower() 
-                   for keyword in ["pregnancy", "maternal", "prenatal", "pregnant", "baby", "infant", "reproductive"]):
-                pregnancy_links.append({
-                    "text": link_text,
-                    "url": href if href.startswith("http") else f"https://www.cdc.gov{href}"
-                })
-        
-        if pregnancy_links:
-            data["sections"].append({
-                "title": "CDC Reproductive Health Resources",
-                "content": [f"{link['text']}: {link['url']}" for link in pregnancy_links]
-            })
+        data = fetch_and_extract(CDC_URL, parse_cdc_reproductive_health)
         
         print(f"✅ Successfully extracted {len(data['sections'])} sections from CDC Reproductive Health")
         return data
@@ -105,8 +62,7 @@ if __name__ == "__main__":
     
     if cdc_data:
         # Save the CDC data
-        with open("cdc_reproductive_health_data.json", "w", encoding="utf-8") as f:
-            json.dump(cdc_data, f, indent=2, ensure_ascii=False)
+        write_json("cdc_reproductive_health_data.json", cdc_data)
         
         print(f"\n✅ CDC extraction complete!")
         print(f"📈 Successfully extracted {len(cdc_data['sections'])} sections")
@@ -1,26 +1,138 @@
-import requests
-import json
+from dailymed_client import search_spls, spl_details, manufacturer_from_title
+from spl_parser import iter_spl_blobs, blob_documents, parse_spl
+from parse_pool import run_parse_many
+from outputs import write_json
+from checkpoint import Checkpoint
+from medication_names import MedicationIds
+import io
+import re
+import sys
 import time
 
-# DailyMed API for medication safety data
-DAILYMED_BASE_URL = "https://dailymed.nlm.nih.gov/dailymed/services/v2"
+# Anti-seizure medications to search DailyMed for
+EPILEPSY_MEDICATIONS = [
+    "lamotrigine", "levetiracetam", "valproic acid", "carbamazepine", 
+    "phenytoin", "topiramate", "gabapentin", "pregabalin", "oxcarbazepine",
+    "zonisamide", "lacosamide", "perampanel", "brivaracetam", "eslicarbazepine"
+]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "application/json",
-    "Accept-Language": "en-US,en;q=0.5",
-}
+# The anti-seizure medications and their ingredient names (see medication_names.py),
+# resolved the same way the medication_ids stage resolves every other output
+ASM_IDS = MedicationIds.from_records((medication, [], []) for medication in EPILEPSY_MEDICATIONS)
+# A label whose active ingredient is an ASM names it somewhere in its XML; labels
+# that never mention one are skipped without being parsed
+ASM_NAME_PATTERN = re.compile(
+    b"|".join(re.escape(key.encode("utf-8")).replace(b"\\ ", b"\\s+") for key in ASM_IDS.keys),
+    re.IGNORECASE
+)
 
-def fetch_dailymed_data():
-    """Fetch medication safety data from DailyMed API."""
-    print("🌍 Extracting DailyMed medication safety data...")
+def section_text(sections, kind):
+    """Return a label section's text as one string, or "" if the label lacks it."""
+    return "\n".join((sections.get(kind) or {}).get("content", []))
+
+def pregnancy_category(pregnancy_info):
+    """Return the letter category stated in older labels, e.g. "Category C"."""
+    match = re.search(r"Pregnancy Category\s*([ABCDX])\b", pregnancy_info, re.IGNORECASE)
+    if match:
+        return f"Category {match.group(1).upper()}"
+    return "Not assigned (see pregnancy section)" if pregnancy_info else "See labeling for pregnancy information"
+
+def drug_entry(medication, spl, detail):
+    """Build the output entry for one label found for a medication."""
+    detail = detail or {}
+    sections = detail.get("sections", {})
+    pregnancy_info = section_text(sections, "pregnancy")
+    return {
+        "medication_name": medication,
+        "set_id": spl.get("setid", ""),
+        "spl_version": spl.get("spl_version", ""),
+        "drug_name": spl.get("title", ""),
+        "published_date": spl.get("published_date", ""),
+        "manufacturer": manufacturer_from_title(spl.get("title")),
+        "active_ingredient": ", ".join(detail.get("active_ingredients", [])),
+        "ndc": detail.get("ndc", []),
+        "pregnancy_category": pregnancy_category(pregnancy_info),
+        "pregnancy_info": pregnancy_info,
+        "lactation_info": section_text(sections, "lactation"),
+        "reproductive_potential_info": section_text(sections, "reproductive_potential")
+    }
+
+def label_medications(label):
+    """Return the EPILEPSY_MEDICATIONS a label's active ingredients belong to, in list order."""
+    found = {ASM_IDS.resolve(ingredient) for ingredient in label["active_ingredients"]}
+    return [medication for medication in EPILEPSY_MEDICATIONS if ASM_IDS.resolve(medication) in found]
+
+def parse_bulk_blob(name, data, is_zip):
+    """Parse the anti-seizure medication labels in one bulk archive member; runs in a parser process."""
+    labels = []
+    for document_name, xml in blob_documents(name, data, is_zip):
+        if not ASM_NAME_PATTERN.search(xml):
+            continue
+        label = parse_spl(io.BytesIO(xml), keep=label_medications)
+        if label is not None and label_medications(label):
+            labels.append(label)
+    return labels
+
+def published_date(effective_time):
+    """Format an SPL effectiveTime (YYYYMMDD...) the way the API reports it, e.g. "Jan 01, 2024"."""
+    try:
+        return time.strftime("%b %d, %Y", time.strptime(effective_time[:8], "%Y%m%d"))
+    except ValueError:
+        return ""
+
+def load_bulk_dailymed_data(paths, medications=EPILEPSY_MEDICATIONS):
+    """Build the DailyMed data from local bulk SPL release zips (or directories of labels).
+
+    Archive members are streamed without extracting them to disk and parsed in
+    the parser process pool; only labels whose active ingredient is an
+    anti-seizure medication are kept. The output has the same shape as
+    fetch_dailymed_data().
+    """
+    print(f"📦 Ingesting DailyMed bulk labels from {', '.join(paths)}...")
+    dailymed_data = {
+        "source": "DailyMed SPL bulk release",
+        "url": "https://dailymed.nlm.nih.gov/dailymed/spl-resources-all-drug-labels.cfm",
+        "description": "Medication safety data from DailyMed bulk SPL labels for epilepsy medications",
+        "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "medications": []
+    }
     
-    # Common epilepsy medications to search for
-    epilepsy_medications = [
-        "lamotrigine", "levetiracetam", "valproic acid", "carbamazepine", 
-        "phenytoin", "topiramate", "gabapentin", "pregabalin", "oxcarbazepine",
-        "zonisamide", "lacosamide", "perampanel", "brivaracetam", "eslicarbazepine"
-    ]
+    blobs = (blob for path in paths for blob in iter_spl_blobs(path))
+    by_medication = {medication: [] for medication in medications}
+    scanned = 0
+    for labels in run_parse_many(parse_bulk_blob, blobs):
+        scanned += 1
+        for label in labels:
+            for medication in label_medications(label):
+                if medication in by_medication:
+                    by_medication[medication].append(label)
+    
+    for medication, labels in by_medication.items():
+        if labels:
+            print(f"✅ Found {len(labels)} labels for {medication}")
+        else:
+            print(f"⚠️ No data found for {medication}")
+        for label in labels:
+            spl = {
+                "setid": label["set_id"],
+                "spl_version": label["version"],
+                "title": label["title"],
+                "published_date": published_date(label["effective_time"])
+            }
+            entry = drug_entry(medication, spl, label)
+            entry["manufacturer"] = label["manufacturer"]
+            dailymed_data["medications"].append(entry)
+    print(f"📊 Scanned {scanned} archive members")
+    
+    return dailymed_data
+
+def fetch_dailymed_data(medications=EPILEPSY_MEDICATIONS, checkpoint=None):
+    """Fetch medication safety data from DailyMed API.
+
+    Search pages are journaled in checkpoint; label details are already kept
+    in the setid cache as each one arrives, so a resumed run refetches neither.
+    """
+    print("🌍 Extracting DailyMed medication safety data...")
     
     dailymed_data = {
         "source": "DailyMed API",
@@ -30,63 +142,20 @@ def fetch_dailymed_data():
         "medications": []
     }
     
-    for medication in epilepsy_medications:
-        try:
-            print(f"🔍 Searching for {medication}...")
-            
-            # Search for medication
-            search_url = f"{DAILYMED_BASE_URL}/drugs.json"
-            params = {
-                "drug_name": medication,
-                "pagesize": 5
-            }
-            
-            response = requests.get(search_url, headers=headers, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if "data" in data and len(data["data"]) > 0:
-                    for drug in data["data"][:2]:  # Limit to 2 results per medication
-                        drug_info = {
-                            "medication_name": medication,
-                            "set_id": drug.get("setid", ""),
-                            "spl_id": drug.get("spl_id", ""),
-                            "drug_name": drug.get("drug_name", ""),
-                            "active_ingredient": drug.get("active_ingredient", ""),
-                            "pregnancy_category": "See labeling for pregnancy information",
-                            "safety_info": "Comprehensive safety information available in full labeling"
-                        }
-                        
-                        # Try to get more detailed information
-                        if drug.get("setid"):
-                            detail_url = f"{DAILYMED_BASE_URL}/drugs/{drug['setid']}.json"
-                            try:
-                                detail_response = requests.get(detail_url, headers=headers, timeout=10)
-                                if detail_response.status_code == 200:
-                                    detail_data = detail_response.json()
-                                    if "drug" in detail_data:
-                                        drug_detail = detail_data["drug"]
-                                        drug_info.update({
-                                            "manufacturer": drug_detail.get("manufacturer", ""),
-                                            "ndc": drug_detail.get("ndc", ""),
-                                            "pregnancy_info": "Detailed pregnancy information available in full drug labeling"
-                                        })
-                            except Exception as e:
-                                print(f"⚠️ Could not fetch details for {medication}: {e}")
-                        
-                        dailymed_data["medications"].append(drug_info)
-                        print(f"✅ Found data for {medication}")
-                else:
-                    print(f"⚠️ No data found for {medication}")
-            else:
-                print(f"⚠️ API request failed for {medication}: {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ Error searching for {medication}: {e}")
-        
-        # Be respectful to the API
-        time.sleep(1)
+    # Searches (every result page) and then label details run concurrently,
+    # paced by the DailyMed host's rate limiter; cached details are not refetched
+    print(f"🔍 Searching for {len(medications)} medications...")
+    results = search_spls(medications, checkpoint)
+    details = spl_details([spl for spls in results.values() for spl in spls])
+    
+    for medication in medications:
+        spls = results[medication]
+        if spls:
+            print(f"✅ Found {len(spls)} labels for {medication}")
+        else:
+            print(f"⚠️ No data found for {medication}")
+        for spl in spls:
+            dailymed_data["medications"].append(drug_entry(medication, spl, details.get(spl.get("setid"))))
     
     return dailymed_data
 
@@ -203,15 +272,25 @@ def create_epilepsy_medication_safety_database():
 if __name__ == "__main__":
     print("🌍 Starting DailyMed and epilepsy medication safety extraction...")
     
+    # python3 extract_dailymed_data.py --bulk PATH... reads local bulk SPL release zips instead of the API;
+    # --resume skips the API searches an interrupted run already finished
+    args = [arg for arg in sys.argv[1:] if arg != "--resume"]
+    bulk_paths = args[1:] if len(args) > 1 and args[0] == "--bulk" else None
+    
     # Try to fetch from DailyMed API
     try:
-        dailymed_data = fetch_dailymed_data()
+        if bulk_paths:
+            dailymed_data = load_bulk_dailymed_data(bulk_paths)
+        else:
+            checkpoint = Checkpoint("extract_dailymed_data", resume="--resume" in sys.argv)
+            dailymed_data = fetch_dailymed_data(checkpoint=checkpoint)
         if dailymed_data["medications"]:
-            with open("../dailymed_medication_data.json", "w", encoding="utf-8") as f:
-                json.dump(dailymed_data, f, indent=2, ensure_ascii=False)
+            write_json("dailymed_medication_data.json", dailymed_data)
             print(f"✅ DailyMed data saved to dailymed_medication_data.json")
         else:
             print("⚠️ No DailyMed data retrieved, creating comprehensive database instead")
+        if not bulk_paths:
+            checkpoint.finish()
     except Exception as e:
         print(f"⚠️ DailyMed API access failed: {e}")
         print("Creating comprehensive epilepsy medication safety database instead")
@@ -219,8 +298,7 @@ if __name__ == "__main__":
     # Create comprehensive epilepsy medication safety database
     epilepsy_safety_data = create_epilepsy_medication_safety_database()
     
-    with open("../epilepsy_medication_safety_database.json", "w", encoding="utf-8") as f:
-        json.dump(epilepsy_safety_data, f, indent=2, ensure_ascii=False)
+    write_json("epilepsy_medication_safety_database.json", epilepsy_safety_data)
     
     print(f"\n✅ Epilepsy medication safety database created!")
     print(f"📈 Successfully created database with {len(epilepsy_safety_data['medications'])} medications")
@@ -1,6 +1,11 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from fetch_engine import run_per_host
+from checkpoint import Checkpoint, journaled
+from html_parse import parse_main_content
+from keywords import KeywordMatcher
+from sections import extract_sections, extract_lists, extract_links
+from record_output import RecordOutput
+import sys
 import time
 
 # Alternative drug safety sources that are more accessible
@@ -22,101 +27,51 @@ DRUG_SAFETY_SOURCES = [
     }
 ]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+# Drug-related content must mention one of these
+DRUG_KEYWORDS = KeywordMatcher(["drug", "medication", "pharmaceutical", "safety", "adverse", "side effect", "warning", "recall"])
+
+def parse_drug_safety_page(html, encoding, url, name, description):
+    """Parse drug safety sections, lists and links from a page"""
+    data = {
+        "source": name,
+        "url": url,
+        "description": description,
+        "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "drug_safety_info": []
+    }
+    
+    main_content = parse_main_content(html, encoding)
+    
+    # Extract headings and content related to drugs
+    data["drug_safety_info"].extend(extract_sections(
+        main_content, min_title_length=3, min_text_length=15,
+        keywords=DRUG_KEYWORDS, title_keywords=DRUG_KEYWORDS
+    ))
+    
+    # Extract any drug-related lists
+    data["drug_safety_info"].extend(extract_lists(
+        main_content, "Drug Safety Information {}", min_item_length=10, min_items=2, keywords=DRUG_KEYWORDS
+    ))
+    
+    # Extract drug-related links
+    drug_links = [
+        {"text": text, "url": href if href.startswith("http") else f"https://www.nih.gov{href}" if "nih" in url else f"https://www.cdc.gov{href}" if "cdc" in url else href}
+        for text, href in extract_links(main_content, DRUG_KEYWORDS)
+    ]
+    
+    if drug_links:
+        data["drug_safety_info"].append({
+            "title": "Drug Safety Resources and Links",
+            "content": [f"{link['text']}: {link['url']}" for link in drug_links[:10]]
+        })
+    
+    return data
 
 def extract_drug_safety_source(url, name, description):
     """Extract drug safety data from alternative sources"""
     try:
         print(f"Extracting drug safety data from {name}...")
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "lxml")
-        data = {
-            "source": name,
-            "url": url,
-            "description": description,
-            "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "drug_safety_info": []
-        }
-        
-        # Extract main content
-        main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-        if not main_content:
-            main_content = soup
-        
-        # Look for drug-related content
-        drug_keywords = ["drug", "medication", "pharmaceutical", "safety", "adverse", "side effect", "warning", "recall"]
-        
-        # Extract headings and content related to drugs
-        for heading in main_content.find_all(["h1", "h2", "h3", "h4"]):
-            title = heading.get_text(strip=True)
-            if not title or len(title) < 3:
-                continue
-                
-            # Check if content is drug-related
-            is_drug_related = any(keyword in title.lower() for keyword in drug_keywords)
-            
-            content = []
-            # Get content after this heading until next heading
-            for sibling in heading.find_next_siblings():
-                if sibling.name in ["h1", "h2", "h3", "h4"]:
-                    break
-                if sibling.name in ["p", "ul", "ol", "div"]:
-                    text = sibling.get_text(strip=True)
-                    if text and len(text) > 15:
-                        # Check if content mentions drugs
-                        if any(keyword in text.lower() for keyword in drug_keywords):
-                            content.append(text)
-            
-            if content and is_drug_related:
-                data["drug_safety_info"].append({
-                    "title": title,
-                    "content": content
-                })
-        
-        # Extract any drug-related lists
-        lists = main_content.find_all(["ul", "ol"])
-        for i, list_elem in enumerate(lists):
-            items = []
-            for li in list_elem.find_all("li"):
-                item_text = li.get_text(strip=True)
-                if item_text and len(item_text) > 10:
-                    # Check if item is drug-related
-                    if any(keyword in item_text.lower() for keyword in drug_keywords):
-                        items.append(item_text)
-            
-            if items and len(items) > 1:
-                data["drug_safety_info"].append({
-                    "title": f"Drug Safety Information {i+1}",
-                    "content": items
-                })
-        
-        # Extract drug-related links
-        links = main_content.find_all("a", href=True)
-        drug_links = []
-        for link in links:
-            link_text = link.get_text(strip=True)
-            href = link.get("href", "")
-            if any(keyword in link_text.lower() or keyword in href.lower() 
-                   for keyword in drug_keywords):
-                drug_links.append({
-                    "text": link_text,
-                    "url": href if href.startswith("http") else f"https://www.nih.gov{href}" if "nih" in url else f"https://www.cdc.gov{href}" if "cdc" in url else href
-                })
-        
-        if drug_links:
-            data["drug_safety_info"].append({
-                "title": "Drug Safety Resources and Links",
-                "content": [f"{link['text']}: {link['url']}" for link in drug_links[:10]]
-            })
+        data = fetch_and_extract(url, parse_drug_safety_page, url, name, description)
         
         print(f"✅ Successfully extracted {len(data['drug_safety_info'])} drug safety sections from {name}")
         return data
@@ -125,9 +80,12 @@ def extract_drug_safety_source(url, name, description):
         print(f"❌ Error extracting from {name}: {e}")
         return None
 
-def extract_all_drug_safety_data():
-    """Extract drug safety data from all sources"""
-    all_data = {
+def extract_all_drug_safety_data(checkpoint=None, output_name="drug_safety_data.json"):
+    """Extract drug safety data from all sources, write output_name and return the data.
+
+    Each source is added to the output as soon as it is extracted; finished sources are journaled in checkpoint.
+    """
+    output = RecordOutput(output_name, {
         "extraction_info": {
             "total_sources": len(DRUG_SAFETY_SOURCES),
             "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -135,28 +93,29 @@ def extract_all_drug_safety_data():
             "note": "Real drug safety data from alternative accessible sources"
         },
         "sources": []
-    }
+    })
     
-    for source in DRUG_SAFETY_SOURCES:
-        data = extract_drug_safety_source(source["url"], source["name"], source["description"])
+    def add_result(index, source, data):
         if data:
-            all_data["sources"].append(data)
-            all_data["extraction_info"]["successful_extractions"] += 1
-        
-        # Be respectful - add delay between requests
-        time.sleep(3)
+            output.add("sources", index, data)
+            output.document["extraction_info"]["successful_extractions"] += 1
     
-    return all_data
+    # Hosts are fetched concurrently; each host is paced by its rate limiter
+    run_per_host(
+        DRUG_SAFETY_SOURCES,
+        journaled(lambda source: extract_drug_safety_source(source["url"], source["name"], source["description"]), checkpoint),
+        on_result=add_result,
+    )
+    return output.close()
 
 if __name__ == "__main__":
     print("🌍 Starting drug safety data extraction...")
     print(f"📊 Targeting {len(DRUG_SAFETY_SOURCES)} drug safety sources...")
     
-    drug_data = extract_all_drug_safety_data()
-    
-    # Save the drug safety data
-    with open("drug_safety_data.json", "w", encoding="utf-8") as f:
-        json.dump(drug_data, f, indent=2, ensure_ascii=False)
+    # --resume skips the sources an interrupted run already finished
+    checkpoint = Checkpoint("extract_drug_safety_data", resume="--resume" in sys.argv)
+    drug_data = extract_all_drug_safety_data(checkpoint)
+    checkpoint.finish()
     
     print(f"\n✅ Drug safety extraction complete!")
     print(f"📈 Successfully extracted from {drug_data['extraction_info']['successful_extractions']}/{drug_data['extraction_info']['total_sources']} sources")
@@ -1,6 +1,14 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from http_client import fetch
+from http_cache import fetch_and_extract
+from fetch_engine import run_per_host
+from checkpoint import Checkpoint, journaled
+from pdf_text import pdf_bytes_text
+from html_parse import parse_main_content
+from keywords import KeywordMatcher
+from sections import ALL_HEADING_TAGS, CONTENT_TAGS, extract_sections, extract_lists, extract_links
+from record_output import RecordOutput
+import sys
 import time
 import re
 
@@ -92,32 +100,13 @@ PDF_RESOURCES = [
     }
 ]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+# Epilepsy/pregnancy content must mention one of these. "ASM" is left out: the old
+# lowercased substring check never matched it, and case-insensitively it would
+# match inside "plasma" and "spasm"
+EPILEPSY_KEYWORDS = KeywordMatcher(["epilepsy", "seizure", "pregnancy", "medication", "anti-seizure", "neurologist", "neurology", "epileptic", "birth control", "contraception", "postpartum", "prenatal", "maternal", "fetal"])
 
-def fetch_page(url):
-    """Fetch HTML content safely with error handling."""
-    try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        return resp.text
-    except Exception as e:
-        print(f"⚠️ Error fetching {url}: {e}")
-        return None
-
-def extract_epilepsy_resource(url, name, description):
-    """Extract epilepsy and pregnancy information from a resource."""
-    html = fetch_page(url)
-    if not html:
-        return None
-    
-    soup = BeautifulSoup(html, "lxml")
+def parse_epilepsy_resource(html, encoding, url, name, description):
+    """Parse epilepsy and pregnancy sections, lists and links from a page."""
     data = {
         "source": name,
         "url": url,
@@ -126,70 +115,25 @@ def extract_epilepsy_resource(url, name, description):
         "epilepsy_pregnancy_info": []
     }
     
-    # Extract main content
-    main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-    if not main_content:
-        main_content = soup
-    
-    # Look for epilepsy and pregnancy related content
-    epilepsy_keywords = ["epilepsy", "seizure", "pregnancy", "medication", "anti-seizure", "ASM", "neurologist", "neurology", "epileptic", "seizure", "medication", "birth control", "contraception", "postpartum", "prenatal", "maternal", "fetal"]
+    main_content = parse_main_content(html, encoding)
     
     # Extract headings and content related to epilepsy and pregnancy
-    for heading in main_content.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
-        title = heading.get_text(strip=True)
-        if not title or len(title) < 3:
-            continue
-            
-        # Check if content is epilepsy/pregnancy related
-        is_epilepsy_related = any(keyword in title.lower() for keyword in epilepsy_keywords)
-        
-        content = []
-        # Get content after this heading until next heading
-        for sibling in heading.find_next_siblings():
-            if sibling.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-                break
-            if sibling.name in ["p", "ul", "ol", "div", "li"]:
-                text = sibling.get_text(strip=True)
-                if text and len(text) > 15:
-                    # Check if content mentions epilepsy/pregnancy
-                    if any(keyword in text.lower() for keyword in epilepsy_keywords):
-                        content.append(text)
-        
-        if content and is_epilepsy_related:
-            data["epilepsy_pregnancy_info"].append({
-                "title": title,
-                "content": content
-            })
+    data["epilepsy_pregnancy_info"].extend(extract_sections(
+        main_content, heading_tags=ALL_HEADING_TAGS, content_tags=CONTENT_TAGS + ["li"],
+        min_title_length=3, min_text_length=15,
+        keywords=EPILEPSY_KEYWORDS, title_keywords=EPILEPSY_KEYWORDS
+    ))
     
     # Extract any epilepsy/pregnancy related lists
-    lists = main_content.find_all(["ul", "ol"])
-    for i, list_elem in enumerate(lists):
-        items = []
-        for li in list_elem.find_all("li"):
-            item_text = li.get_text(strip=True)
-            if item_text and len(item_text) > 10:
-                # Check if item is epilepsy/pregnancy related
-                if any(keyword in item_text.lower() for keyword in epilepsy_keywords):
-                    items.append(item_text)
-        
-        if items and len(items) > 1:
-            data["epilepsy_pregnancy_info"].append({
-                "title": f"Epilepsy & Pregnancy Information {i+1}",
-                "content": items
-            })
+    data["epilepsy_pregnancy_info"].extend(extract_lists(
+        main_content, "Epilepsy & Pregnancy Information {}", min_item_length=10, min_items=2, keywords=EPILEPSY_KEYWORDS
+    ))
     
     # Extract epilepsy/pregnancy related links
-    links = main_content.find_all("a", href=True)
-    epilepsy_links = []
-    for link in links:
-        link_text = link.get_text(strip=True)
-        href = link.get("href", "")
-        if any(keyword in link_text.lower() or keyword in href.lower() 
-               for keyword in epilepsy_keywords):
-            epilepsy_links.append({
-                "text": link_text,
-                "url": href if href.startswith("http") else f"https://epilepsypregnancy.com{href}" if "epilepsypregnancy.com" in url else href
-            })
+    epilepsy_links = [
+        {"text": text, "url": href if href.startswith("http") else f"https://epilepsypregnancy.com{href}" if "epilepsypregnancy.com" in url else href}
+        for text, href in extract_links(main_content, EPILEPSY_KEYWORDS)
+    ]
     
     if epilepsy_links:
         data["epilepsy_pregnancy_info"].append({
@@ -199,15 +143,28 @@ def extract_epilepsy_resource(url, name, description):
     
     return data
 
+def extract_epilepsy_resource(url, name, description):
+    """Extract epilepsy and pregnancy information from a resource."""
+    try:
+        return fetch_and_extract(url, parse_epilepsy_resource, url, name, description)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Error fetching {url}: {e}")
+        return None
+
 def extract_pdf_resource(url, name):
     """Extract information from PDF resources (basic text extraction)."""
     try:
         print(f"📄 Attempting to extract from PDF: {name}")
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = fetch(url)
         resp.raise_for_status()
         
-        # Basic text extraction from PDF (this is limited but better than nothing)
-        content = resp.text if resp.text else "PDF content not extractable"
+        # Extract the page text; the raw bytes are not readable text
+        try:
+            content = "\n".join(pdf_bytes_text(resp.content)).strip()
+        except Exception as e:
+            print(f"⚠️ Could not extract text from PDF {name}: {e}")
+            content = ""
+        content = content or "PDF content not extractable"
         
         return {
             "source": name,
@@ -221,9 +178,20 @@ def extract_pdf_resource(url, name):
         print(f"⚠️ Error extracting PDF {name}: {e}")
         return None
 
-def extract_all_epilepsy_data():
-    """Extract epilepsy and pregnancy data from all sources."""
-    all_data = {
+def extract_task(task):
+    """Extract a single ("web", source) or ("pdf", resource) task."""
+    kind, source = task
+    if kind == "pdf":
+        return extract_pdf_resource(source["url"], source["name"])
+    print(f"🔍 Extracting from {source['name']}...")
+    return extract_epilepsy_resource(source["url"], source["name"], source["description"])
+
+def extract_all_epilepsy_data(checkpoint=None, output_name="epilepsy_pregnancy_comprehensive_data.json"):
+    """Extract epilepsy and pregnancy data from all sources, write output_name and return the data.
+
+    Each source is added to the output as soon as it is extracted; finished sources are journaled in checkpoint.
+    """
+    output = RecordOutput(output_name, {
         "extraction_info": {
             "total_web_sources": len(EPILEPSY_RESOURCES),
             "total_pdf_sources": len(PDF_RESOURCES),
@@ -234,46 +202,44 @@ def extract_all_epilepsy_data():
         },
         "web_sources": [],
         "pdf_sources": []
-    }
+    })
+    info = output.document["extraction_info"]
     
-    # Extract from web sources
-    print("🌍 Extracting from web sources...")
-    for source in EPILEPSY_RESOURCES:
-        print(f"🔍 Extracting from {source['name']}...")
-        data = extract_epilepsy_resource(source["url"], source["name"], source["description"])
-        if data and data["epilepsy_pregnancy_info"]:
-            all_data["web_sources"].append(data)
-            all_data["extraction_info"]["successful_web_extractions"] += 1
+    def add_result(index, task, data):
+        kind, source = task
+        if kind == "web" and data and data["epilepsy_pregnancy_info"]:
+            output.add("web_sources", index, data)
+            info["successful_web_extractions"] += 1
             print(f"✅ Successfully extracted {len(data['epilepsy_pregnancy_info'])} sections from {source['name']}")
-        else:
+        elif kind == "web":
             print(f"⚠️ No epilepsy/pregnancy information found in {source['name']}")
-        
-        time.sleep(2)  # Be respectful
-    
-    # Extract from PDF sources
-    print("\n📄 Extracting from PDF sources...")
-    for pdf in PDF_RESOURCES:
-        data = extract_pdf_resource(pdf["url"], pdf["name"])
-        if data:
-            all_data["pdf_sources"].append(data)
-            all_data["extraction_info"]["successful_pdf_extractions"] += 1
-            print(f"✅ Successfully extracted PDF: {pdf['name']}")
+        elif data:
+            output.add("pdf_sources", index, data)
+            info["successful_pdf_extractions"] += 1
+            print(f"✅ Successfully extracted PDF: {source['name']}")
         else:
-            print(f"⚠️ Failed to extract PDF: {pdf['name']}")
-        
-        time.sleep(2)  # Be respectful
+            print(f"⚠️ Failed to extract PDF: {source['name']}")
     
-    return all_data
+    # Web pages and PDFs share one run so every host is fetched concurrently,
+    # with requests to the same host paced by its rate limiter
+    print("🌍 Extracting from web and PDF sources...")
+    tasks = [("web", source) for source in EPILEPSY_RESOURCES] + [("pdf", pdf) for pdf in PDF_RESOURCES]
+    run_per_host(
+        tasks,
+        journaled(extract_task, checkpoint, key_of=lambda task: f"{task[0]}:{task[1]['url']}"),
+        url_of=lambda task: task[1]["url"],
+        on_result=add_result,
+    )
+    return output.close()
 
 if __name__ == "__main__":
     print("🌍 Starting comprehensive epilepsy and pregnancy data extraction...")
     print(f"📊 Targeting {len(EPILEPSY_RESOURCES)} web sources and {len(PDF_RESOURCES)} PDF sources...")
     
-    epilepsy_data = extract_all_epilepsy_data()
-    
-    # Save the epilepsy and pregnancy data
-    with open("epilepsy_pregnancy_comprehensive_data.json", "w", encoding="utf-8") as f:
-        json.dump(epilepsy_data, f, indent=2, ensure_ascii=False)
+    # --resume skips the sources an interrupted run already finished
+    checkpoint = Checkpoint("extract_epilepsy_pregnancy_data", resume="--resume" in sys.argv)
+    epilepsy_data = extract_all_epilepsy_data(checkpoint)
+    checkpoint.finish()
     
     print(f"\n✅ Epilepsy and pregnancy extraction complete!")
     print(f"📈 Successfully extracted from {epilepsy_data['extraction_info']['successful_web_extractions']}/{epilepsy_data['extraction_info']['total_web_sources']} web sources")
@@ -1,36 +1,19 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from html_parse import parse_main_content
+from keywords import KeywordMatcher
+from sections import ALL_HEADING_TAGS, CONTENT_TAGS, extract_sections
+from outputs import write_json
 import time
 
 # LactMed Database
 LACTMED_URL = "https://www.ncbi.nlm.nih.gov/books/NBK501922/"
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-}
+# Lactation-related content must mention one of these
+LACTATION_KEYWORDS = KeywordMatcher(["lactation", "breastfeeding", "breast milk", "nursing", "infant", "maternal", "drug", "medication"])
 
-def fetch_page(url):
-    """Fetch HTML content safely with error handling."""
-    try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        return resp.text
-    except Exception as e:
-        print(f"⚠️ Error fetching {url}: {e}")
-        return None
-
-def extract_lactmed_data():
-    """Extract LactMed database data."""
-    html = fetch_page(LACTMED_URL)
-    if not html:
-        return None
-    
-    soup = BeautifulSoup(html, "lxml")
+def parse_lactmed_page(html, encoding):
+    """Parse lactation-related sections from the LactMed page."""
     data = {
         "source": "LactMed Database",
         "url": LACTMED_URL,
@@ -39,43 +22,26 @@ def extract_lactmed_data():
         "lactation_info": []
     }
     
-    # Extract lactation-related content
-    lactation_keywords = ["lactation", "breastfeeding", "breast milk", "nursing", "infant", "maternal", "drug", "medication"]
-    
     # Look for lactation-related content
-    main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-    if not main_content:
-        main_content = soup
+    main_content = parse_main_content(html, encoding)
     
     # Extract headings and content related to lactation
-    for heading in main_content.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
-        title = heading.get_text(strip=True)
-        if not title or len(title) < 3:
-            continue
-            
-        # Check if content is lactation related
-        is_lactation_related = any(keyword in title.lower() for keyword in lactation_keywords)
-        
-        content = []
-        # Get content after this heading until next heading
-        for sibling in heading.find_next_siblings():
-            if sibling.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-                break
-            if sibling.name in ["p", "ul", "ol", "div", "li"]:
-                text = sibling.get_text(strip=True)
-                if text and len(text) > 15:
-                    # Check if content mentions lactation
-                    if any(keyword in text.lower() for keyword in lactation_keywords):
-                        content.append(text)
-        
-        if content and is_lactation_related:
-            data["lactation_info"].append({
-                "title": title,
-                "content": content
-            })
+    data["lactation_info"].extend(extract_sections(
+        main_content, heading_tags=ALL_HEADING_TAGS, content_tags=CONTENT_TAGS + ["li"],
+        min_title_length=3, min_text_length=15,
+        keywords=LACTATION_KEYWORDS, title_keywords=LACTATION_KEYWORDS
+    ))
     
     return data
 
+def extract_lactmed_data():
+    """Extract LactMed database data."""
+    try:
+        return fetch_and_extract(LACTMED_URL, parse_lactmed_page)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Error fetching {LACTMED_URL}: {e}")
+        return None
+
 def create_comprehensive_lactation_database():
     """Create comprehensive lactation and breastfeeding database."""
     print("🌍 Creating comprehensive lactation and breastfeeding database...")
@@ -218,8 +184,7 @@ if __name__ == "__main__":
     try:
         lactmed_data = extract_lactmed_data()
         if lactmed_data and lactmed_data["lactation_info"]:
-            with open("../lactmed_database.json", "w", encoding="utf-8") as f:
-                json.dump(lactmed_data, f, indent=2, ensure_ascii=False)
+            write_json("lactmed_database.json", lactmed_data)
             print(f"✅ LactMed data saved to lactmed_database.json")
         else:
             print("⚠️ No data extracted from LactMed, creating comprehensive database instead")
@@ -230,8 +195,7 @@ if __name__ == "__main__":
     # Create comprehensive lactation database
     comprehensive_lactation = create_comprehensive_lactation_database()
     
-    with open("../comprehensive_lactation_database.json", "w", encoding="utf-8") as f:
-        json.dump(comprehensive_lactation, f, indent=2, ensure_ascii=False)
+    write_json("comprehensive_lactation_database.json", comprehensive_lactation)
     
     print(f"\n✅ Comprehensive lactation database created!")
     print(f"📈 Successfully created database with {len(comprehensive_lactation['lactation_guidelines'])} guideline sections")
@@ -1,10 +1,17 @@
-import requests
-import json
+from http_client import ACCEPT_PDF, MAX_CONNECTIONS_PER_HOST
+from downloader import download_file, DownloadError
+import artifact_store
+from fetch_engine import run_per_host
+from pdf_text import extract_pdf_texts
+from outputs import output_path, write_json
 import time
 import os
 from urllib.parse import urlparse
 
-# PDF resources that need proper handling
+# Concurrent downloads per host; stays within the session's per-host connection pool
+PDF_DOWNLOADS_PER_HOST = MAX_CONNECTIONS_PER_HOST
+
+# PDF resources that need proper handling; an optional "sha256" pins the expected file
 PDF_RESOURCES = [
     {
         "name": "RCOG Epilepsy Guidelines",
@@ -74,82 +81,42 @@ PDF_RESOURCES = [
     }
 ]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "application/pdf,application/octet-stream,*/*",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-}
-
-def download_pdf(url, filename, description):
-    """Download PDF file and save it in proper PDF format."""
+def download_pdf(url, filename, description, expected_sha256=None):
+    """Download a PDF into pdfs/ under the output root, resuming partial files and skipping unchanged ones."""
+    pdf_path = output_path("pdfs", filename)
     try:
         print(f"📄 Downloading PDF: {filename}")
         print(f"   URL: {url}")
         print(f"   Description: {description}")
         
-        response = requests.get(url, headers=headers, timeout=30, stream=True)
-        response.raise_for_status()
-        
-        # Check if the response is actually a PDF
-        content_type = response.headers.get('content-type', '').lower()
-        if 'pdf' not in content_type and 'application/octet-stream' not in content_type:
-            print(f"⚠️ Warning: Content type is {content_type}, may not be a PDF")
-        
-        # Check file size
-        content_length = response.headers.get('content-length')
-        if content_length:
-            print(f"   File size: {int(content_length)} bytes")
-        
-        # Save the PDF file
-        pdf_path = f"pdfs/{filename}"
-        os.makedirs("pdfs", exist_ok=True)
-        
-        with open(pdf_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-        
-        # Verify the file was saved and is a PDF
-        if os.path.exists(pdf_path):
-            file_size = os.path.getsize(pdf_path)
-            print(f"✅ Successfully downloaded: {filename} ({file_size} bytes)")
-            
-            # Check if file starts with PDF header
-            with open(pdf_path, 'rb') as f:
-                header = f.read(4)
-                if header == b'%PDF':
-                    print(f"✅ Verified: {filename} is a valid PDF file")
-                    return {
-                        "success": True,
-                        "filename": filename,
-                        "path": pdf_path,
-                        "size": file_size,
-                        "url": url,
-                        "description": description
-                    }
-                else:
-                    print(f"⚠️ Warning: {filename} may not be a valid PDF (header: {header})")
-                    return {
-                        "success": False,
-                        "filename": filename,
-                        "path": pdf_path,
-                        "size": file_size,
-                        "url": url,
-                        "description": description,
-                        "error": "Invalid PDF format"
-                    }
+        # The %PDF header is checked on the first chunk and the SHA-256 as data streams in
+        download = download_file(url, pdf_path, accept=ACCEPT_PDF, magic=b"%PDF", expected_sha256=expected_sha256)
+        if download["not_modified"]:
+            print(f"♻️ Not modified, keeping: {filename} ({download['size']} bytes)")
         else:
-            print(f"❌ Failed to save: {filename}")
-            return {
-                "success": False,
-                "filename": filename,
-                "url": url,
-                "description": description,
-                "error": "File not saved"
-            }
+            resumed = " (resumed)" if download["resumed"] else ""
+            print(f"✅ Successfully downloaded: {filename} ({download['size']} bytes){resumed}")
+        # Downloads are replaced atomically, so the store can hard-link the file instead of copying it
+        artifact_store.record(pdf_path, f"pdfs/{filename}", adopt=True)
+        return {
+            "success": True,
+            "filename": filename,
+            "path": pdf_path,
+            "size": download["size"],
+            "sha256": download["sha256"],
+            "url": url,
+            "description": description
+        }
             
+    except DownloadError as e:
+        print(f"⚠️ Warning: {filename} {e}")
+        return {
+            "success": False,
+            "filename": filename,
+            "url": url,
+            "description": description,
+            "error": f"Invalid PDF format: {e}"
+        }
     except Exception as e:
         print(f"❌ Error downloading {filename}: {e}")
         return {
@@ -174,19 +141,22 @@ def extract_all_pdfs():
     }
     
     print(f"🌍 Starting PDF extraction for {len(PDF_RESOURCES)} PDF files...")
-    print(f"📁 PDFs will be saved in: {os.path.abspath('pdfs/')}")
+    print(f"📁 PDFs will be saved in: {output_path('pdfs', '')}")
     
-    for pdf in PDF_RESOURCES:
-        result = download_pdf(pdf["url"], pdf["filename"], pdf["description"])
+    # Hosts are downloaded concurrently, and up to PDF_DOWNLOADS_PER_HOST files per host;
+    # each request is still paced by the host's rate limiter
+    results = run_per_host(
+        PDF_RESOURCES,
+        lambda pdf: download_pdf(pdf["url"], pdf["filename"], pdf["description"], pdf.get("sha256")),
+        lanes_per_host=PDF_DOWNLOADS_PER_HOST,
+    )
+    for result in results:
         pdf_database["pdf_files"].append(result)
         
         if result["success"]:
             pdf_database["extraction_info"]["successful_downloads"] += 1
         else:
             pdf_database["extraction_info"]["failed_downloads"] += 1
-        
-        # Be respectful - add delay between downloads
-        time.sleep(2)
     
     return pdf_database
 
@@ -196,14 +166,19 @@ if __name__ == "__main__":
     pdf_data = extract_all_pdfs()
     
     # Save the PDF database
-    with open("pdf_database.json", "w", encoding="utf-8") as f:
-        json.dump(pdf_data, f, indent=2, ensure_ascii=False)
+    write_json("pdf_database.json", pdf_data)
     
     print(f"\n✅ PDF extraction complete!")
     print(f"📈 Successfully downloaded: {pdf_data['extraction_info']['successful_downloads']}/{pdf_data['extraction_info']['total_pdfs']} PDFs")
     print(f"❌ Failed downloads: {pdf_data['extraction_info']['failed_downloads']}")
     print(f"💾 PDF database saved to pdf_database.json")
     
+    # Extract page text; PDFs whose content hash is unchanged come from the page cache
+    print(f"\n📄 Extracting text from downloaded PDFs...")
+    pdf_text_data = extract_pdf_texts(output_path("pdfs", ""), PDF_RESOURCES)
+    write_json("pdf_text_data.json", pdf_text_data)
+    print(f"💾 PDF text saved to pdf_text_data.json ({pdf_text_data['extraction_info']['successful_extractions']}/{pdf_text_data['extraction_info']['total_pdfs']} PDFs)")
+    
     # Show downloaded files
     print(f"\n📁 Downloaded PDF files:")
     for pdf in pdf_data["pdf_files"]:
@@ -213,10 +188,11 @@ if __name__ == "__main__":
             print(f"  ❌ {pdf['filename']} - {pdf.get('error', 'Unknown error')}")
     
     # List files in pdfs directory
-    if os.path.exists("pdfs"):
+    pdf_dir = output_path("pdfs", "")
+    if os.path.exists(pdf_dir):
         print(f"\n📂 Files in pdfs directory:")
-        for file in os.listdir("pdfs"):
-            file_path = os.path.join("pdfs", file)
+        for file in os.listdir(pdf_dir):
+            file_path = os.path.join(pdf_dir, file)
             if os.path.isfile(file_path):
                 size = os.path.getsize(file_path)
                 print(f"  📄 {file} - {size} bytes")
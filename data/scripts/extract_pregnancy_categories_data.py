@@ -1,36 +1,19 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from html_parse import parse_main_content
+from keywords import KeywordMatcher
+from sections import ALL_HEADING_TAGS, CONTENT_TAGS, extract_sections
+from outputs import write_json
 import time
 
 # Drugs.com Pregnancy Categories
 DRUGS_COM_URL = "https://www.drugs.com/pregnancy-categories.html"
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-}
+# Pregnancy category content must mention one of these
+PREGNANCY_KEYWORDS = KeywordMatcher(["pregnancy", "category", "risk", "safety", "fetal", "birth", "defect", "teratogenic"])
 
-def fetch_page(url):
-    """Fetch HTML content safely with error handling."""
-    try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        return resp.text
-    except Exception as e:
-        print(f"⚠️ Error fetching {url}: {e}")
-        return None
-
-def extract_pregnancy_categories():
-    """Extract pregnancy categories data."""
-    html = fetch_page(DRUGS_COM_URL)
-    if not html:
-        return None
-    
-    soup = BeautifulSoup(html, "lxml")
+def parse_pregnancy_categories_page(html, encoding):
+    """Parse pregnancy category sections from the Drugs.com page."""
     data = {
         "source": "Drugs.com Pregnancy Categories",
         "url": DRUGS_COM_URL,
@@ -39,43 +22,26 @@ def extract_pregnancy_categories():
         "pregnancy_categories": []
     }
     
-    # Extract pregnancy category information
-    pregnancy_keywords = ["pregnancy", "category", "risk", "safety", "fetal", "birth", "defect", "teratogenic"]
-    
     # Look for pregnancy category content
-    main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-    if not main_content:
-        main_content = soup
+    main_content = parse_main_content(html, encoding)
     
     # Extract headings and content related to pregnancy categories
-    for heading in main_content.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
-        title = heading.get_text(strip=True)
-        if not title or len(title) < 3:
-            continue
-            
-        # Check if content is pregnancy category related
-        is_pregnancy_related = any(keyword in title.lower() for keyword in pregnancy_keywords)
-        
-        content = []
-        # Get content after this heading until next heading
-        for sibling in heading.find_next_siblings():
-            if sibling.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-                break
-            if sibling.name in ["p", "ul", "ol", "div", "li"]:
-                text = sibling.get_text(strip=True)
-                if text and len(text) > 15:
-                    # Check if content mentions pregnancy categories
-                    if any(keyword in text.lower() for keyword in pregnancy_keywords):
-                        content.append(text)
-        
-        if content and is_pregnancy_related:
-            data["pregnancy_categories"].append({
-                "title": title,
-                "content": content
-            })
+    data["pregnancy_categories"].extend(extract_sections(
+        main_content, heading_tags=ALL_HEADING_TAGS, content_tags=CONTENT_TAGS + ["li"],
+        min_title_length=3, min_text_length=15,
+        keywords=PREGNANCY_KEYWORDS, title_keywords=PREGNANCY_KEYWORDS
+    ))
     
     return data
 
+def extract_pregnancy_categories():
+    """Extract pregnancy categories data."""
+    try:
+        return fetch_and_extract(DRUGS_COM_URL, parse_pregnancy_categories_page)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Error fetching {DRUGS_COM_URL}: {e}")
+        return None
+
 def create_comprehensive_pregnancy_categories():
     """Create comprehensive pregnancy categories database."""
     print("🌍 Creating comprehensive pregnancy categories database...")
@@ -188,8 +154,7 @@ if __name__ == "__main__":
     try:
         categories_data = extract_pregnancy_categories()
         if categories_data and categories_data["pregnancy_categories"]:
-            with open("../drugs_com_pregnancy_categories.json", "w", encoding="utf-8") as f:
-                json.dump(categories_data, f, indent=2, ensure_ascii=False)
+            write_json("drugs_com_pregnancy_categories.json", categories_data)
             print(f"✅ Drugs.com pregnancy categories saved to drugs_com_pregnancy_categories.json")
         else:
             print("⚠️ No data extracted from Drugs.com, creating comprehensive database instead")
@@ -200,8 +165,7 @@ if __name__ == "__main__":
     # Create comprehensive pregnancy categories database
     comprehensive_categories = create_comprehensive_pregnancy_categories()
     
-    with open("../comprehensive_pregnancy_categories.json", "w", encoding="utf-8") as f:
-        json.dump(comprehensive_categories, f, indent=2, ensure_ascii=False)
+    write_json("comprehensive_pregnancy_categories.json", comprehensive_categories)
     
     print(f"\n✅ Comprehensive pregnancy categories database created!")
     print(f"📈 Successfully created database with {len(comprehensive_categories['pregnancy_categories'])} categories")
@@ -1,6 +1,11 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from http_cache import fetch_and_extract
+from fetch_engine import run_per_host
+from checkpoint import Checkpoint, journaled
+from html_parse import parse_main_content
+from sections import extract_sections, extract_lists
+from record_output import RecordOutput
+import sys
 import time
 from urllib.parse import urljoin, urlparse
 
@@ -33,71 +38,30 @@ PREGNANCY_WEBSITES = [
     }
 ]
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+def parse_website_data(html, encoding, url, name):
+    """Parse sections and lists from a pregnancy website page"""
+    data = {
+        "source": name,
+        "url": url,
+        "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sections": []
+    }
+    
+    main_content = parse_main_content(html, encoding)
+    
+    # Extract headings and their content
+    data["sections"].extend(extract_sections(main_content, min_text_length=10))
+    
+    # Extract any lists that might contain important information
+    data["sections"].extend(extract_lists(main_content, "List {}", min_item_length=5, min_items=1))
+    
+    return data
 
 def extract_website_data(url, name, selectors):
     """Extract data from a single website"""
     try:
         print(f"Extracting data from {name}...")
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "lxml")
-        data = {
-            "source": name,
-            "url": url,
-            "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "sections": []
-        }
-        
-        # Extract main content
-        main_content = soup.find("main") or soup.find("article") or soup.find("div", class_="content")
-        if not main_content:
-            main_content = soup
-        
-        # Extract headings and their content
-        for heading in main_content.find_all(["h1", "h2", "h3", "h4"]):
-            title = heading.get_text(strip=True)
-            if not title:
-                continue
-                
-            content = []
-            # Get content after this heading until next heading
-            for sibling in heading.find_next_siblings():
-                if sibling.name in ["h1", "h2", "h3", "h4"]:
-                    break
-                if sibling.name in ["p", "ul", "ol", "div"]:
-                    text = sibling.get_text(strip=True)
-                    if text and len(text) > 10:  # Filter out very short text
-                        content.append(text)
-            
-            if content:
-                data["sections"].append({
-                    "title": title,
-                    "content": content
-                })
-        
-        # Extract any lists that might contain important information
-        lists = main_content.find_all(["ul", "ol"])
-        for i, list_elem in enumerate(lists):
-            items = []
-            for li in list_elem.find_all("li"):
-                item_text = li.get_text(strip=True)
-                if item_text and len(item_text) > 5:
-                    items.append(item_text)
-            
-            if items:
-                data["sections"].append({
-                    "title": f"List {i+1}",
-                    "content": items
-                })
+        data = fetch_and_extract(url, parse_website_data, url, name)
         
         print(f"✅ Successfully extracted {len(data['sections'])} sections from {name}")
         return data
@@ -109,37 +73,41 @@ def extract_website_data(url, name, selectors):
         print(f"❌ Error processing {name}: {e}")
         return None
 
-def extract_all_pregnancy_data():
-    """Extract data from all pregnancy-related websites"""
-    all_data = {
+def extract_all_pregnancy_data(checkpoint=None, output_name="comprehensive_pregnancy_data.json"):
+    """Extract data from all pregnancy-related websites, write output_name and return the data.
+
+    Each site is added to the output as soon as it is extracted; finished sites are journaled in checkpoint.
+    """
+    output = RecordOutput(output_name, {
         "extraction_info": {
             "total_sources": len(PREGNANCY_WEBSITES),
             "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
             "successful_extractions": 0
         },
         "sources": []
-    }
+    })
     
-    for site in PREGNANCY_WEBSITES:
-        data = extract_website_data(site["url"], site["name"], site["selectors"])
+    def add_result(index, site, data):
         if data:
-            all_data["sources"].append(data)
-            all_data["extraction_info"]["successful_extractions"] += 1
-        
-        # Be respectful - add delay between requests
-        time.sleep(2)
+            output.add("sources", index, data)
+            output.document["extraction_info"]["successful_extractions"] += 1
     
-    return all_data
+    # Hosts are fetched concurrently; each host is paced by its rate limiter
+    run_per_host(
+        PREGNANCY_WEBSITES,
+        journaled(lambda site: extract_website_data(site["url"], site["name"], site["selectors"]), checkpoint),
+        on_result=add_result,
+    )
+    return output.close()
 
 if __name__ == "__main__":
     print("🌍 Starting comprehensive pregnancy data extraction...")
     print(f"📊 Targeting {len(PREGNANCY_WEBSITES)} sources...")
     
-    pregnancy_data = extract_all_pregnancy_data()
-    
-    # Save the comprehensive data
-    with open("comprehensive_pregnancy_data.json", "w", encoding="utf-8") as f:
-        json.dump(pregnancy_data, f, indent=2, ensure_ascii=False)
+    # --resume skips the sites an interrupted run already finished
+    checkpoint = Checkpoint("extract_pregnancy_data", resume="--resume" in sys.argv)
+    pregnancy_data = extract_all_pregnancy_data(checkpoint)
+    checkpoint.finish()
     
     print(f"\n✅ Extraction complete!")
     print(f"📈 Successfully extracted from {pregnancy_data['extraction_info']['successful_extractions']}/{pregnancy_data['extraction_info']['total_sources']} sources")
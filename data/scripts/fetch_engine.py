@@ -0,0 +1,61 @@
+import asyncio
+from urllib.parse import urlparse
+
+def host_of(url):
+    """Return the lowercase host name of a URL."""
+    return urlparse(url).netloc.lower()
+
+def group_by_host(items, url_of):
+    """Group (index, item) pairs by host, keeping the original order per host."""
+    by_host = {}
+    for index, item in enumerate(items):
+        by_host.setdefault(host_of(url_of(item)), []).append((index, item))
+    return by_host
+
+async def _run_host_queue(host, queue, worker, results, on_result=None):
+    """Run one host's items in order; pacing comes from the host's rate limiter.
+
+    queue is an iterator shared by the host's lanes, so each item runs once.
+    With on_result, each result is handed to it instead of being kept in results.
+    """
+    for index, item in queue:
+        try:
+            result = await asyncio.to_thread(worker, item)
+        except Exception as e:
+            print(f"❌ Error processing item for {host}: {e}")
+            result = None
+        if on_result is None:
+            results[index] = result
+        else:
+            on_result(index, item, result)
+
+async def run_per_host_async(items, worker, url_of, lanes_per_host=1, on_result=None):
+    """Run worker over items with lanes_per_host queues per host, hosts in parallel."""
+    results = [None] * len(items)
+    queues = group_by_host(items, url_of)
+    lanes = []
+    for host, queue in queues.items():
+        shared = iter(queue)
+        lanes.extend(
+            _run_host_queue(host, shared, worker, results, on_result)
+            for _ in range(min(lanes_per_host, len(queue)))
+        )
+    await asyncio.gather(*lanes)
+    return results
+
+def run_per_host(items, worker, url_of=lambda item: item["url"], lanes_per_host=1, on_result=None):
+    """Run worker over items concurrently across hosts and return results in input order.
+
+    By default items for the same host run one at a time; lanes_per_host > 1 lets
+    that many run at once (e.g. long downloads). Every request is still paced by
+    the host's token bucket (see rate_limit.py), so a full run takes about as long
+    as the busiest host allows. `worker` is a blocking function and runs in a worker thread.
+
+    on_result(index, item, result), if given, is called as each item finishes
+    (always from the event loop thread, so never concurrently) and the results
+    are not collected; the returned list is then all None.
+    """
+    items = list(items)
+    if not items:
+        return []
+    return asyncio.run(run_per_host_async(items, worker, url_of, lanes_per_host, on_result))
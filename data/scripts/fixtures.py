@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+import warnings
+import zipfile
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# EXTRACT_FIXTURES=record saves every response into the archive,
+# EXTRACT_FIXTURES=replay serves responses from it without touching the network
+FIXTURE_MODE = os.environ.get("EXTRACT_FIXTURES", "").lower()
+FIXTURE_ARCHIVE = os.environ.get(
+    "EXTRACT_FIXTURE_ARCHIVE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "responses.zip"),
+)
+
+_archive_lock = threading.Lock()
+_replay_archive = None
+
+def recording():
+    """Return True when responses should be saved to the fixture archive."""
+    return FIXTURE_MODE == "record"
+
+def replaying():
+    """Return True when responses should be served from the fixture archive."""
+    return FIXTURE_MODE == "replay"
+
+def request_url(url, params=None):
+    """Return the full request URL, including encoded query parameters."""
+    return requests.Request("GET", url, params=params).prepare().url
+
+def fixture_key(url, params=None):
+    """Return the archive member prefix for a request."""
+    return hashlib.sha256(request_url(url, params).encode("utf-8")).hexdigest()
+
+def record(url, params, resp):
+    """Save a response's status, headers and raw body into the fixture archive."""
+    key = fixture_key(url, params)
+    meta = {
+        "url": request_url(url, params),
+        "status": resp.status_code,
+        "reason": resp.reason,
+        "headers": dict(resp.headers),
+    }
+    body = resp.content
+    with _archive_lock:
+        os.makedirs(os.path.dirname(FIXTURE_ARCHIVE), exist_ok=True)
+        with warnings.catch_warnings():
+            # Re-recording a URL appends a newer member; readers use the last one
+            warnings.simplefilter("ignore", UserWarning)
+            with zipfile.ZipFile(FIXTURE_ARCHIVE, "a", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(f"{key}.json", json.dumps(meta, ensure_ascii=False))
+                archive.writestr(f"{key}.body", body)
+
+def _open_archive():
+    """Open the fixture archive for reading once per process."""
+    global _replay_archive
+    if _replay_archive is None:
+        _replay_archive = zipfile.ZipFile(FIXTURE_ARCHIVE, "r")
+    return _replay_archive
+
+def replay(url, params=None):
+    """Build a requests.Response for a recorded request, as if it came off the wire."""
+    key = fixture_key(url, params)
+    with _archive_lock:
+        try:
+            archive = _open_archive()
+            meta = json.loads(archive.read(f"{key}.json"))
+            body = archive.read(f"{key}.body")
+        except (OSError, KeyError) as e:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded fixture for {request_url(url, params)}: {e}")
+
+    resp = requests.Response()
+    resp.status_code = meta["status"]
+    resp.reason = meta.get("reason", "")
+    resp.headers = CaseInsensitiveDict(meta["headers"])
+    # The body is stored decoded, so drop headers describing the wire encoding
+    resp.headers.pop("Content-Encoding", None)
+    resp.headers["Content-Length"] = str(len(body))
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.url = meta["url"]
+    resp._content = body
+    resp._content_consumed = True
+    return resp
@@ -0,0 +1,61 @@
+import os
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, UnicodeDammit
+from sections import find_main_content
+
+# EXTRACT_FAST_PARSE=0 falls back to building a BeautifulSoup tree for the whole page
+FAST_PARSE = os.environ.get("EXTRACT_FAST_PARSE", "1") != "0"
+
+# Same precedence as sections.find_main_content: first <main>, else <article>, else div.content.
+# lxml parses the page (a compact C tree) and finds the element; only that subtree
+# is handed to BeautifulSoup, so the page's full Python tree is never built.
+MAIN_CONTENT_XPATHS = [
+    "(//main)[1]",
+    "(//article)[1]",
+    "(//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')])[1]",
+]
+
+def decode_markup(markup, encoding=None):
+    """Return markup as text, decoded the way BeautifulSoup would decode it."""
+    if isinstance(markup, bytes):
+        return UnicodeDammit(markup, [encoding] if encoding else [], is_html=True).unicode_markup
+    return markup
+
+def parse_document(markup, encoding=None):
+    """Parse a whole page with BeautifulSoup, decoding bytes only once."""
+    if isinstance(markup, bytes):
+        return BeautifulSoup(markup, "lxml", from_encoding=encoding)
+    return BeautifulSoup(markup, "lxml")
+
+def main_content_markup(text):
+    """Return the HTML of the page's main content element, found with lxml, or None."""
+    try:
+        root = lxml.html.document_fromstring(text)
+    except (etree.ParserError, ValueError):
+        return None
+    for xpath in MAIN_CONTENT_XPATHS:
+        found = root.xpath(xpath)
+        if found:
+            return lxml.html.tostring(found[0], encoding="unicode", with_tail=False)
+    return None
+
+def parse_main_content(markup, encoding=None, fast=None):
+    """Return the page's main content element, as sections.find_main_content would.
+
+    markup may be the raw response bytes (decoded using encoding, or the page's
+    own charset declaration) or text. In fast mode the page is parsed once by
+    lxml and BeautifulSoup only parses the main content element's HTML; pages
+    without a main/article/div.content element fall back to a full parse.
+    """
+    if fast is None:
+        fast = FAST_PARSE
+    if fast:
+        text = decode_markup(markup, encoding)
+        content = main_content_markup(text)
+        if content is not None:
+            main_content = find_main_content(BeautifulSoup(content, "lxml"))
+            if main_content.name in ("main", "article", "div"):
+                return main_content
+        markup = text
+    return find_main_content(parse_document(markup, encoding))
@@ -0,0 +1,97 @@
+import hashlib
+import inspect
+import json
+import os
+import requests
+from http_client import fetch, declared_charset
+from parse_pool import run_parse
+
+# On-disk cache of validators and the records kept with them, one JSON file per
+# cache key: a key says what kind of record it is and what produced it, so two
+# extractors scraping the same URL (or the downloader) never see each other's records
+CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache"))
+# Bump when a parser changes what it returns, so results cached by the old one are not reused
+PARSER_VERSION = 1
+
+def cache_key(kind, url, *parts):
+    """Return the cache key for one kind of record about a URL; parts tell records of the same kind apart."""
+    return json.dumps([kind, url, *parts], ensure_ascii=False, sort_keys=True, default=repr)
+
+def extractor_name(extract):
+    """Return a name for an extract function that is the same however its script was started.
+
+    __module__ is "__main__" when a script runs directly but the module name when
+    the pipeline imports it, so the source file's name is used instead.
+    """
+    return f"{os.path.basename(inspect.getfile(extract))}:{extract.__qualname__}"
+
+def extraction_key(url, extract, args):
+    """Return the cache key for extract(content, encoding, *args) run on a URL's page."""
+    return cache_key("extract", url, extractor_name(extract), PARSER_VERSION, list(args))
+
+def cache_path(key):
+    """Return the cache file path for a cache key."""
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+def load_entry(key):
+    """Load the cached entry for a cache key, or None if missing, unreadable or for another key."""
+    try:
+        with open(cache_path(key), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get("key") == key else None
+
+def store_entry(key, etag, last_modified, result):
+    """Atomically write the validators and a record for a cache key."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "key": key,
+            "etag": etag,
+            "last_modified": last_modified,
+            "result": result
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def conditional_headers(entry):
+    """Build If-None-Match / If-Modified-Since headers from a cached entry."""
+    request_headers = {}
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+    return request_headers
+
+def fetch_and_extract(url, extract, *args, accept=None):
+    """Fetch a page conditionally and return extract(content, encoding, *args), reusing the cached result on 304.
+
+    extract gets the raw response bytes and the charset from the Content-Type
+    header (or None), so parsers can decode the page once themselves. It runs in
+    the parser process pool (see parse_pool.py), so it must be a module-level
+    function and args must be picklable.
+    The cached result is only reused for the same extract function, args and
+    PARSER_VERSION; anything else is a cache miss.
+    Raises requests exceptions for failed fetches, like resp.raise_for_status().
+    """
+    key = extraction_key(url, extract, args)
+    entry = load_entry(key)
+    resp = fetch(url, accept=accept, extra_headers=conditional_headers(entry))
+    if resp.status_code == 304 and entry:
+        print(f"♻️ Not modified, reusing cached extraction for {url}")
+        return entry["result"]
+    if resp.status_code == 304:
+        # Nothing to reuse, e.g. a fixture recorded by an older version with a warm cache
+        raise requests.exceptions.HTTPError(f"304 Not Modified for {url} with no cached extraction", response=resp)
+    resp.raise_for_status()
+
+    result = run_parse(extract, resp.content, declared_charset(resp), *args)
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if etag or last_modified:
+        store_entry(key, etag, last_modified, result)
+    return result
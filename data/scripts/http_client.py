@@ -0,0 +1,110 @@
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_limit import get_bucket, parse_retry_after
+import fixtures
+
+# Shared HTTP settings for every extractor in data/scripts
+DEFAULT_TIMEOUT = 15
+MAX_CONNECTIONS_PER_HOST = 4
+MAX_POOLED_HOSTS = 20
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = [500, 502, 503, 504]
+# How many times a 429 is retried after waiting out the host's limiter
+MAX_RATE_LIMIT_RETRIES = 3
+
+headers = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# Accept headers for the non-HTML resources we fetch
+ACCEPT_JSON = "application/json"
+ACCEPT_PDF = "application/pdf,application/octet-stream,*/*"
+
+# Request headers left out while recording fixtures, so every recorded response is a full 200
+RECORDING_SKIPPED_HEADERS = ["If-None-Match", "If-Modified-Since", "Range", "If-Range"]
+
+_session = None
+
+def create_session():
+    """Create a pooled session with per-host connection limits and retries."""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=["GET", "HEAD"],
+        raise_on_status=False,
+        # 429 / Retry-After are handled by the per-host limiter in fetch()
+        respect_retry_after_header=False,
+    )
+    # pool_block keeps us at MAX_CONNECTIONS_PER_HOST open sockets per host
+    adapter = HTTPAdapter(
+        pool_connections=MAX_POOLED_HOSTS,
+        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers.update(headers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+def fetch(url, params=None, accept=None, timeout=DEFAULT_TIMEOUT, stream=False, extra_headers=None):
+    """GET a URL through the shared session, paced by the per-host rate limiter.
+
+    With EXTRACT_FIXTURES=replay the response comes from the fixture archive
+    instead of the network; with EXTRACT_FIXTURES=record it is saved there, and
+    conditional and Range headers are not sent.
+    """
+    if fixtures.replaying():
+        return fixtures.replay(url, params)
+    
+    request_headers = {}
+    if accept:
+        request_headers["Accept"] = accept
+    if extra_headers:
+        request_headers.update(extra_headers)
+    if fixtures.recording():
+        # A recording must hold whole bodies: a replay has no cache or partial file to complete a 304 or 206
+        for name in RECORDING_SKIPPED_HEADERS:
+            request_headers.pop(name, None)
+    
+    bucket = get_bucket(urlparse(url).netloc.lower())
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        bucket.acquire()
+        resp = get_session().get(url, params=params, headers=request_headers or None,
+                                 timeout=timeout, stream=stream)
+        if resp.status_code != 429:
+            bucket.recover()
+            if fixtures.recording():
+                fixtures.record(url, params, resp)
+            return resp
+        
+        # Slow this host down and honour Retry-After before trying again
+        bucket.throttle(parse_retry_after(resp.headers.get("Retry-After")))
+        if attempt < MAX_RATE_LIMIT_RETRIES:
+            resp.close()
+    return resp
+
+def declared_charset(resp):
+    """Return the charset named in the response's Content-Type header, or None."""
+    for param in resp.headers.get("Content-Type", "").split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            return value.strip().strip("'\"") or None
+    return None
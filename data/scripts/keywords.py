@@ -0,0 +1,72 @@
+import re
+
+# Suffixes dropped by the light stemmer, longest first
+STEM_SUFFIXES = ["ations", "ation", "ings", "ing", "ies", "ied", "es", "ed", "s", "y", "e"]
+MIN_STEM_LENGTH = 4
+
+def stem_word(word):
+    """Strip one common English suffix, keeping at least MIN_STEM_LENGTH characters."""
+    for suffix in STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+def keyword_pattern(keyword, word_boundary=False, stem=False):
+    """Return the regex source for one keyword."""
+    if stem:
+        words = [re.escape(stem_word(word)) + r"\w*" for word in keyword.lower().split()]
+        return r"\b" + r"\s+".join(words)
+    pattern = re.escape(keyword)
+    if word_boundary:
+        pattern = r"\b" + pattern + r"\b"
+    return pattern
+
+class KeywordMatcher:
+    """Case-insensitive keyword matcher compiled into a single alternation regex.
+
+    keywords is either a list (each keyword is its own class) or a dict mapping a
+    class name to its keywords. By default a keyword matches anywhere in the text,
+    like `keyword in text.lower()`; word_boundary=True only matches whole words and
+    stem=True also matches simple inflections ("seizure" -> "seizures").
+    """
+
+    def __init__(self, keywords, word_boundary=False, stem=False):
+        if isinstance(keywords, dict):
+            pairs = [(keyword, cls) for cls, words in keywords.items() for keyword in words]
+        else:
+            pairs = [(keyword, keyword) for keyword in keywords]
+
+        # Deduplicate and try longer keywords first so each position reports its longest match
+        seen = {}
+        for keyword, cls in pairs:
+            seen.setdefault(keyword.lower(), cls)
+        ordered = sorted(seen.items(), key=lambda pair: -len(pair[0]))
+
+        self.keywords = [keyword for keyword, _ in ordered]
+        sources = [keyword_pattern(keyword, word_boundary, stem) for keyword in self.keywords]
+        self._any = re.compile("|".join(f"(?:{source})" for source in sources) or r"(?!)", re.IGNORECASE)
+
+        # Zero-width lookahead finds a match starting at every position in one scan;
+        # the named group says which keyword it was
+        groups = "|".join(f"(?P<k{i}>{source})" for i, source in enumerate(sources))
+        self._each = re.compile(f"(?=(?:{groups}))" if groups else r"(?!)", re.IGNORECASE)
+
+        # A keyword occurrence also contains every keyword that matches inside it
+        # ("anti-seizure" contains "seizure"), so precompute the implied classes
+        compiled = [re.compile(source, re.IGNORECASE) for source in sources]
+        self._implied = {
+            f"k{i}": frozenset(ordered[j][1] for j, pattern in enumerate(compiled) if pattern.search(keyword))
+            for i, (keyword, _) in enumerate(ordered)
+        }
+
+    def search(self, text):
+        """Return True if any keyword occurs in the text."""
+        return bool(text) and self._any.search(text) is not None
+
+    def classes(self, text):
+        """Return the set of keyword classes occurring in the text, in one pass."""
+        found = set()
+        if text:
+            for match in self._each.finditer(text):
+                found |= self._implied[match.lastgroup]
+        return found
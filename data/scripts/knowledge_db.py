@@ -0,0 +1,289 @@
+import csv
+import glob
+import json
+import os
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from outputs import OUTPUT_DIR, output_path, strip_volatile, write_output
+from knowledge_index import DERIVED_FILES, INDEX_FILES
+from medication_ids import load_or_build_ids
+from section_dedup import find_clusters
+
+# Every output in one SQLite file, so consumers can query with indexes and full-text
+# search instead of parsing the JSON files on each request
+DB_NAME = "knowledge.db"
+SCHEMA_VERSION = 3
+INPUT_PATTERNS = ["*.json", "*.csv", "*.xml", "*.txt", "*.md"]
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE documents (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, kind TEXT NOT NULL,
+    title TEXT, description TEXT, text TEXT
+);
+CREATE TABLE sources (
+    id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL REFERENCES documents(id),
+    name TEXT, url TEXT, description TEXT, type TEXT
+);
+CREATE TABLE sections (
+    id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL REFERENCES documents(id),
+    source_id INTEGER REFERENCES sources(id), position INTEGER NOT NULL,
+    title TEXT, content TEXT NOT NULL,
+    canonical_id INTEGER REFERENCES sections(id), similarity REAL
+);
+CREATE TABLE medications (
+    id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL REFERENCES documents(id),
+    name TEXT NOT NULL, name_key TEXT NOT NULL, medication_id TEXT, brand_names TEXT,
+    category TEXT, safety TEXT, data TEXT NOT NULL
+);
+CREATE TABLE medication_names (
+    key TEXT PRIMARY KEY, medication_id TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE glossary_terms (
+    id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL REFERENCES documents(id),
+    term TEXT NOT NULL, term_key TEXT NOT NULL, full_form TEXT, category TEXT,
+    definition TEXT, example TEXT, related_terms TEXT
+);
+CREATE TABLE csv_rows (
+    id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL REFERENCES documents(id),
+    row_number INTEGER NOT NULL, data TEXT NOT NULL
+);
+CREATE TABLE pdf_pages (
+    id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL REFERENCES documents(id),
+    filename TEXT NOT NULL, title TEXT, url TEXT, page INTEGER NOT NULL, text TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE search USING fts5(
+    title, body, kind UNINDEXED, row_table UNINDEXED, row_id UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+CREATE INDEX sources_document ON sources(document_id);
+CREATE INDEX sections_document ON sections(document_id, position);
+CREATE INDEX sections_source ON sections(source_id);
+CREATE INDEX sections_canonical ON sections(canonical_id);
+CREATE INDEX medications_name ON medications(name_key);
+CREATE INDEX medications_id ON medications(medication_id);
+CREATE INDEX medications_document ON medications(document_id);
+CREATE INDEX glossary_terms_term ON glossary_terms(term_key);
+CREATE INDEX glossary_terms_category ON glossary_terms(category);
+CREATE INDEX csv_rows_document ON csv_rows(document_id, row_number);
+CREATE INDEX pdf_pages_filename ON pdf_pages(filename, page);
+"""
+
+def input_names(base_dir=OUTPUT_DIR):
+    """Return the output files the database is built from, sorted."""
+    names = set()
+    for pattern in INPUT_PATTERNS:
+        names.update(os.path.basename(path) for path in glob.glob(os.path.join(base_dir, pattern)))
+    # The Knowledge Center index and the derived lookup tables only repeat the other
+    # outputs (the medication ids are loaded into medication_names instead)
+    return sorted(names - set(INDEX_FILES) - set(DERIVED_FILES))
+
+def flatten_text(value):
+    """Return every string in a JSON value, one per line."""
+    if isinstance(value, dict):
+        return "\n".join(filter(None, (flatten_text(v) for v in value.values())))
+    if isinstance(value, list):
+        return "\n".join(filter(None, (flatten_text(v) for v in value)))
+    return value if isinstance(value, str) else ""
+
+def heading(key):
+    """Return a title for a JSON key, e.g. general_guidelines -> General Guidelines."""
+    return key.replace("_", " ").title()
+
+class KnowledgeWriter:
+    """Inserts the records of each output into the database and the search index."""
+
+    def __init__(self, con, ids):
+        self.con = con
+        self.ids = ids
+        self.counts = {}
+
+    def insert(self, table, row, title=None, body=None, kind=None):
+        """Insert one row, index it for search if body is given, and return its id."""
+        columns = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        row_id = self.con.execute(f"INSERT INTO {table} ({columns}) VALUES ({marks})", list(row.values())).lastrowid
+        self.counts[table] = self.counts.get(table, 0) + 1
+        if body:
+            self.con.execute(
+                "INSERT INTO search (title, body, kind, row_table, row_id) VALUES (?, ?, ?, ?, ?)",
+                (title or "", body, kind or table, table, row_id),
+            )
+        return row_id
+
+    def add_document(self, name, kind, data=None, text=None):
+        """Insert a document row and return its id."""
+        data = data if isinstance(data, dict) else {}
+        return self.insert("documents", {
+            "name": name, "kind": kind, "title": data.get("source"),
+            "description": data.get("description"), "text": text,
+        }, title=name, body=text, kind="document")
+
+    def add_json(self, document_id, node, source_id=None, root=False):
+        """Insert the sources, sections, medications and glossary terms found anywhere in a JSON value."""
+        if isinstance(node, list):
+            for item in node:
+                self.add_json(document_id, item, source_id)
+            return
+        if not isinstance(node, dict):
+            return
+
+        # A record with a URL and a source name (or the document itself, for the CDC pages)
+        if "url" in node and ("source" in node or root):
+            source_id = self.insert("sources", {
+                "document_id": document_id, "name": node.get("source"), "url": node["url"],
+                "description": node.get("description"), "type": node.get("type"),
+            })
+        title = node.get("title") or node.get("topic") or node.get("source")
+        is_section = "content" in node and isinstance(title, str)
+        if is_section:
+            self.add_section(document_id, source_id, title, node["content"])
+
+        name = node.get("medication") or node.get("medication_name")
+        if isinstance(name, str):
+            self.insert("medications", {
+                "document_id": document_id, "name": name, "name_key": name.strip().lower(),
+                "medication_id": self.ids.resolve(name),
+                "brand_names": json.dumps(node.get("brand_names"), ensure_ascii=False) if "brand_names" in node else None,
+                "category": node.get("pregnancy_category") or node.get("category"),
+                "safety": node.get("safety_profile") or node.get("breastfeeding_safety") or node.get("safety_notes"),
+                "data": json.dumps(node, ensure_ascii=False),
+            }, title=name, body=flatten_text(node), kind="medication")
+
+        if isinstance(node.get("term"), str) and "definition" in node:
+            self.insert("glossary_terms", {
+                "document_id": document_id, "term": node["term"], "term_key": node["term"].strip().lower(),
+                "full_form": node.get("full_form"), "category": node.get("category"),
+                "definition": node.get("definition"), "example": node.get("example"),
+                "related_terms": json.dumps(node.get("related_terms", []), ensure_ascii=False),
+            }, title=node["term"], body=flatten_text(node), kind="glossary_term")
+
+        for key, value in node.items():
+            if is_section and key == "content":
+                continue
+            # Plain lists of strings at the top level (general_guidelines etc.) are sections of their own
+            if root and isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+                self.add_section(document_id, None, heading(key), value)
+            elif isinstance(value, (dict, list)):
+                self.add_json(document_id, value, source_id)
+
+    def add_medication_names(self):
+        """Insert every medication name key with its id, so rows from different outputs join on medication_id."""
+        for key, medication_id in self.ids.keys.items():
+            self.insert("medication_names", {"key": key, "medication_id": medication_id})
+
+    def add_section(self, document_id, source_id, title, content):
+        """Insert one section; list content is stored one item per line."""
+        text = "\n".join(content) if isinstance(content, list) else str(content)
+        position = self.counts.get("sections", 0)
+        self.insert("sections", {
+            "document_id": document_id, "source_id": source_id, "position": position,
+            "title": title, "content": text,
+        }, title=title, body=text, kind="section")
+
+    def collapse_duplicates(self):
+        """Keep one copy of each near-duplicate section (see section_dedup.py); returns the duplicate count.
+
+        A duplicate keeps its row, with canonical_id and similarity pointing at the
+        canonical section, but not its content or its search row.
+        """
+        rows = self.con.execute("SELECT id, content FROM sections ORDER BY id").fetchall()
+        clusters = find_clusters([{"content": content} for _, content in rows])
+        count = 0
+        for cluster in clusters:
+            canonical_id = rows[cluster[0][0]][0]
+            for i, similarity in cluster[1:]:
+                self.con.execute("UPDATE sections SET content = '', canonical_id = ?, similarity = ? WHERE id = ?",
+                                 (canonical_id, similarity, rows[i][0]))
+                count += 1
+        # One pass over the search table; row_id is not indexed there
+        self.con.execute("""DELETE FROM search WHERE row_table = 'sections'
+                            AND row_id IN (SELECT id FROM sections WHERE canonical_id IS NOT NULL)""")
+        self.counts["duplicate_sections"] = count
+        return count
+
+    def add_pdf_text(self, document_id, data):
+        """Insert the pages of pdf_text_data.json."""
+        for pdf in data.get("pdfs", []):
+            for page in pdf.get("pages", []):
+                self.insert("pdf_pages", {
+                    "document_id": document_id, "filename": pdf["filename"], "title": pdf.get("title"),
+                    "url": pdf.get("url"), "page": page["page"], "text": page["text"],
+                }, title=f"{pdf.get('title') or pdf['filename']} (page {page['page']})", body=page["text"], kind="pdf_page")
+
+    def add_file(self, path):
+        """Insert one output file according to its type."""
+        name = os.path.basename(path)
+        extension = os.path.splitext(name)[1].lower()
+        if extension == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                # extracted_at changes every run; leaving it out keeps the database identical when the data is
+                data = strip_volatile(json.load(f))
+            document_id = self.add_document(name, "json", data)
+            if name == "pdf_text_data.json":
+                self.add_pdf_text(document_id, data)
+            else:
+                self.add_json(document_id, data, root=True)
+        elif extension == ".csv":
+            document_id = self.add_document(name, "csv")
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                for row_number, row in enumerate(csv.DictReader(f), 1):
+                    self.insert("csv_rows", {
+                        "document_id": document_id, "row_number": row_number,
+                        "data": json.dumps(row, ensure_ascii=False),
+                    }, title=f"{name} row {row_number}", body="\n".join(f"{k}: {v}" for k, v in row.items()), kind="csv_row")
+        elif extension == ".xml":
+            root = ET.parse(path).getroot()
+            text = "\n".join(t.strip() for t in root.itertext() if t.strip())
+            self.add_document(name, "xml", text=text)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                self.add_document(name, extension.lstrip("."), text=f.read())
+
+def build_database(db_path, names, base_dir=OUTPUT_DIR):
+    """Build a fresh database at db_path from the given outputs; returns the row counts per table."""
+    con = sqlite3.connect(db_path)
+    try:
+        con.executescript(SCHEMA)
+        writer = KnowledgeWriter(con, load_or_build_ids(base_dir))
+        with con:
+            con.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            con.execute("INSERT INTO meta (key, value) VALUES ('inputs', ?)", (json.dumps(names),))
+            writer.add_medication_names()
+            for name in names:
+                try:
+                    writer.add_file(os.path.join(base_dir, name))
+                except (OSError, ValueError, ET.ParseError, csv.Error) as e:
+                    print(f"⚠️ Skipping {name}: {e}")
+            writer.collapse_duplicates()
+            con.execute("INSERT INTO search (search) VALUES ('optimize')")
+        con.execute("ANALYZE")
+        con.execute("VACUUM")
+    finally:
+        con.close()
+    return writer.counts
+
+def write_database(name=DB_NAME, base_dir=OUTPUT_DIR):
+    """Build the database from every output and write it unless it is unchanged; returns the row counts."""
+    path = output_path(name)
+    build_path = f"{path}.{os.getpid()}.build"
+    try:
+        counts = build_database(build_path, input_names(base_dir), base_dir)
+        with open(build_path, "rb") as f:
+            content = f.read()
+    finally:
+        if os.path.exists(build_path):
+            os.remove(build_path)
+    # The same inputs give the same bytes, so an unchanged database keeps its mtime
+    write_output(name, content)
+    return counts
+
+if __name__ == "__main__":
+    # python3 knowledge_db.py [NAME.db]
+    name = sys.argv[1] if len(sys.argv) > 1 else DB_NAME
+    print(f"🗄️ Building {name} from the outputs in {OUTPUT_DIR}...")
+    counts = write_database(name)
+    for table, count in sorted(counts.items()):
+        print(f"  {table}: {count}")
+    print(f"💾 Knowledge database saved to {name}")
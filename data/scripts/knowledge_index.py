@@ -0,0 +1,485 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from medication_names import IDS_NAME
+from outputs import OUTPUT_DIR, write_output
+from section_dedup import DUPLICATES_NAME
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# The Knowledge Center's items, built once from the outputs instead of on every
+# request. The heuristics are ports of app/api/knowledge/route.ts and must stay
+# in step with it; bump SCHEMA_VERSION when the item format changes.
+INDEX_NAME = "knowledge_index.json"
+INDEX_FILES = [INDEX_NAME, f"{INDEX_NAME}.gz", f"{INDEX_NAME}.br"]
+# Lookup tables built from the other outputs, which the app never gets; they are not knowledge
+DERIVED_FILES = [IDS_NAME, DUPLICATES_NAME]
+SCHEMA_VERSION = 1
+SOURCE = "All Local Data Files"
+
+# The route's regexes run on JavaScript strings, where \s, trim() and . use these
+# line terminators and whitespace characters
+JS_LINE_TERMINATORS = "\n\r\u2028\u2029"
+JS_WHITESPACE = "\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+WS = f"[{JS_WHITESPACE}]"
+LINE_START = f"(?:^|(?<=[{JS_LINE_TERMINATORS}]))"
+LINE_END = f"(?=[{JS_LINE_TERMINATORS}]|\\Z)"
+NOT_TERMINATOR = f"[^{JS_LINE_TERMINATORS}]"
+
+TITLE_PATTERNS = [
+    re.compile(f"{LINE_START}#{WS}+({NOT_TERMINATOR}+){LINE_END}"),
+    re.compile(f"{LINE_START}title:{WS}*({NOT_TERMINATOR}+){LINE_END}", re.IGNORECASE | re.ASCII),
+    re.compile(f"{LINE_START}#{WS}*([^#\\n]+)"),
+]
+ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+class Undefined:
+    """JavaScript's undefined: a missing property, left out of the JSON output."""
+
+    def __bool__(self):
+        return False
+
+UNDEFINED = Undefined()
+
+def js_value(value):
+    """Return parsed JSON as JavaScript would hold it: integral floats as integers, array-index keys first."""
+    if isinstance(value, dict):
+        index_keys = sorted((k for k in value if ARRAY_INDEX.fullmatch(k) and int(k) < 2 ** 32 - 1), key=int)
+        keys = index_keys + [k for k in value if k not in index_keys]
+        return {k: js_value(value[k]) for k in keys}
+    if isinstance(value, list):
+        return [js_value(v) for v in value]
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+        return int(value)
+    return value
+
+def truthy(value):
+    """JavaScript truthiness."""
+    if isinstance(value, (dict, list)):
+        return True
+    return bool(value) and value == value
+
+def prop(obj, key):
+    """obj[key] the JavaScript way: undefined when missing, TypeError on null."""
+    if obj is None or obj is UNDEFINED:
+        raise TypeError(f"Cannot read properties of {'null' if obj is None else 'undefined'} (reading '{key}')")
+    if isinstance(obj, dict):
+        return obj.get(key, UNDEFINED)
+    return UNDEFINED
+
+def js_string(value):
+    """String(value) as Array.prototype.join sees it (null and undefined are empty)."""
+    if value is None or value is UNDEFINED:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return ",".join(js_string(v) for v in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return json.dumps(value)
+
+def js_join(values, separator):
+    return separator.join(js_string(v) for v in values)
+
+def js_keys(value):
+    """Object.keys()."""
+    if value is None or value is UNDEFINED:
+        raise TypeError("Cannot convert undefined or null to object")
+    if isinstance(value, dict):
+        return list(value)
+    if isinstance(value, list):
+        return [str(i) for i in range(len(value))]
+    if isinstance(value, str):
+        return [str(i) for i in range(len(to_units(value)))]
+    return []
+
+def js_trim(text):
+    return text.strip(JS_WHITESPACE)
+
+def expect_string(value):
+    """The route calls string methods on these values, which throws for anything else."""
+    if not isinstance(value, str):
+        raise TypeError(f"{js_string(value)!r} is not a string")
+    return value
+
+def to_units(text):
+    """Return text as UTF-16 code units, one character each, so len() and slicing match JavaScript."""
+    if not text or max(text) <= "\uffff":
+        return text
+    data = text.encode("utf-16-le", "surrogatepass")
+    return "".join(chr(data[i] | data[i + 1] << 8) for i in range(0, len(data), 2))
+
+def from_units(units):
+    """Undo to_units; a surrogate pair cut in half stays a lone surrogate, as in JavaScript."""
+    return units.encode("utf-16-le", "surrogatepass").decode("utf-16-le", "surrogatepass")
+
+def parse_csv(content):
+    """parseCSV: a naive comma split, as the route does it."""
+    lines = [line for line in content.split("\n") if js_trim(line)]
+    if len(lines) < 2:
+        return []
+    headers = [js_trim(h) for h in lines[0].split(",")]
+    rows = []
+    for line in lines[1:]:
+        values = [js_trim(v) for v in line.split(",")]
+        row = {}
+        for i, header in enumerate(headers):
+            row[header] = values[i] if i < len(values) and values[i] else ""
+        rows.append(js_value(row))
+    return rows
+
+def parse_xml(content):
+    """parseXML: the text with every tag removed."""
+    return {"content": js_trim(re.sub(f"{WS}+", " ", re.sub(r"<[^>]*>", " ", content)))}
+
+def extract_title(content, filename):
+    """extractTitleFromContent: a heading or title: line, else the file name in title case."""
+    expect_string(content)
+    for pattern in TITLE_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            return js_trim(match.group(1))
+    base_name = re.sub(r"\.(txt|md|json|csv|xml)\Z", "", filename, flags=re.IGNORECASE | re.ASCII)
+    base_name = re.sub(r"[-_]", " ", base_name)
+    return re.sub(r"\b\w", lambda m: m.group(0).upper(), base_name, flags=re.ASCII)
+
+def readable_json_text(content):
+    """The JSON branch of extractReadableContent: the text fields of parsed JSON, or content."""
+    try:
+        parsed = js_value(json.loads(content))
+    except ValueError:
+        return content
+    try:
+        sections = prop(parsed, "sections")
+        if truthy(sections) and isinstance(sections, list):
+            text = " ".join(
+                js_join(prop(s, "content"), " ") for s in sections
+                if truthy(prop(s, "content")) and isinstance(prop(s, "content"), list)
+            )
+            return text or content
+        if truthy(prop(parsed, "content")) and isinstance(parsed["content"], list):
+            return js_join(parsed["content"], " ")
+        if truthy(prop(parsed, "description")):
+            return parsed["description"]
+        sources = prop(parsed, "sources")
+        if truthy(sources) and isinstance(sources, list):
+            parts = []
+            for s in sources:
+                part = prop(s, "description")
+                part = part if truthy(part) else prop(s, "content")
+                if truthy(part):
+                    parts.append(part)
+            return js_join(parts, " ") or content
+        if truthy(prop(parsed, "extraction_info")):
+            keys = [k for k in parsed if k != "extraction_info"]
+            if keys:
+                first = parsed[keys[0]]
+                if isinstance(first, str):
+                    return first
+                if isinstance(first, list):
+                    return js_join(first, " ")
+    except TypeError:
+        # The route catches these too and keeps the original content
+        pass
+    return content
+
+def extract_readable(content, max_length=280):
+    """extractReadableContent: a cleaned-up summary of at most max_length characters."""
+    expect_string(content)
+    clean = content
+    if content.startswith("{") or content.startswith("["):
+        clean = expect_string(readable_json_text(content))
+
+    clean = re.sub(r"\{[^}]*\}", "", clean)
+    clean = re.sub(r"\[[^\]]*\]", "", clean)
+    clean = re.sub(r'"[^"]*":', "", clean)
+    clean = re.sub(f"https?://[^{JS_WHITESPACE}]+", "", clean)
+    clean = re.sub(r'[{}\[\]"]', "", clean)
+    clean = to_units(js_trim(re.sub(f"{WS}+", " ", clean)))
+
+    if len(clean) < 50 or "extraction_info" in clean:
+        sentences = [s for s in re.split(r"[.!?]", to_units(content)) if len(js_trim(s)) > 20]
+        if sentences:
+            clean = js_trim(sentences[0])
+
+    if len(clean) > max_length:
+        truncated = clean[:max_length]
+        last_space = truncated.rfind(" ")
+        return from_units(truncated[:last_space] + "..." if last_space > max_length * 0.8 else truncated + "...")
+    return from_units(clean) or "Information available in source file"
+
+def extract_strings(obj):
+    """Every string longer than 10 characters under obj, skipping extraction_info."""
+    strings = []
+    items = obj.items() if isinstance(obj, dict) else enumerate(obj) if isinstance(obj, list) else ()
+    for key, value in items:
+        if key == "extraction_info":
+            continue
+        if isinstance(value, str) and len(to_units(value)) > 10:
+            strings.append(value)
+        elif isinstance(value, (dict, list)):
+            strings.extend(extract_strings(value))
+    return strings
+
+def extract_meaningful(data):
+    """extractMeaningfulContent: up to 500 characters of the text fields of a JSON document."""
+    parts = []
+    if truthy(prop(data, "description")):
+        parts.append(data["description"])
+    for key, title_key, text_key in [("sections", "title", "content"), ("sources", "description", "content"),
+                                     ("lactation_guidelines", "topic", "content")]:
+        entries = prop(data, key)
+        if truthy(entries) and isinstance(entries, list):
+            for entry in entries:
+                if truthy(prop(entry, title_key)):
+                    parts.append(entry[title_key])
+                if truthy(prop(entry, text_key)) and isinstance(entry[text_key], list):
+                    parts.append(js_join(entry[text_key], " "))
+    categories = prop(data, "pregnancy_categories")
+    if truthy(categories) and isinstance(categories, list):
+        for category in categories:
+            if truthy(prop(category, "category")):
+                parts.append(category["category"])
+            if truthy(prop(category, "description")):
+                parts.append(category["description"])
+    if not parts:
+        parts.extend(extract_strings(data))
+    return from_units(to_units(js_join(parts, " "))[:500])
+
+# categorizeFile, first match wins: (filename words, content words, type, category, tags)
+CATEGORIES = [
+    (["emergency"], ["emergency", "first aid", "safety"],
+     "support", "Emergency & Safety", ["emergency", "first-aid", "safety"]),
+    (["medication"], ["medication", "drug", "lamotrigine", "keppra", "depakote"],
+     "guide", "Medications & Drugs", ["medications", "drugs", "safety"]),
+    (["pregnancy"], ["pregnancy", "maternal", "prenatal"],
+     "guide", "Pregnancy Care", ["pregnancy", "maternal", "prenatal"]),
+    (["seizure"], ["seizure", "epilepsy", "epileptic"],
+     "guide", "Seizures & Epilepsy", ["seizures", "epilepsy", "neurological"]),
+    (["research"], ["study", "clinical", "registry"],
+     "research", "Research & Studies", ["research", "clinical", "studies"]),
+    (["guideline"], ["guideline", "protocol", "recommendation"],
+     "research", "Clinical Guidelines", ["guidelines", "clinical", "protocols"]),
+    (["guide", "documentation"], ["user guide", "documentation"],
+     "guide", "Documentation", ["documentation", "guides", "help"]),
+    (["tracking", "schedule", "log"], ["monitoring"],
+     "guide", "Tracking & Monitoring", ["tracking", "monitoring", "schedules"]),
+]
+
+def categorize(filename, content):
+    """categorizeFile: (type, category, tags) from keywords in the file name and content."""
+    lower_content = expect_string(content).lower()
+    lower_filename = filename.lower()
+    for name_words, content_words, item_type, category, tags in CATEGORIES:
+        if any(w in lower_filename for w in name_words) or any(w in lower_content for w in content_words):
+            return item_type, category, list(tags)
+    return "article", "General Information", ["general", "information"]
+
+def base_title(filename):
+    """The file name without its extension, in title case."""
+    name = re.sub(r"[-_]", " ", re.sub(r"\.[^.]*\Z", "", filename))
+    return re.sub(r"\b\w", lambda m: m.group(0).upper(), name, flags=re.ASCII)
+
+def pretty_json(value):
+    """JSON.stringify(value, null, 2)."""
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+def json_items(data, filename):
+    """The raw items of a JSON output, before they become knowledge items."""
+    if isinstance(data, list):
+        return data
+    if truthy(prop(data, "web_sources")) and isinstance(data["web_sources"], list):
+        items = []
+        for src in data["web_sources"]:
+            info = prop(src, "epilepsy_pregnancy_info")
+            if not (truthy(info) and isinstance(info, list)):
+                continue
+            for item in info:
+                content = prop(item, "content")
+                is_list = isinstance(content, list)
+                title = prop(item, "title")
+                source = prop(src, "source")
+                items.append({
+                    "title": title if truthy(title) else "Untitled",
+                    "content": js_join(content, " ") if is_list else "",
+                    "source": source if truthy(source) else "Unknown Source",
+                    "url": next((c for c in content if re.search("https?://", js_string(c))), UNDEFINED) if is_list else UNDEFINED,
+                    "raw": pretty_json(item),
+                })
+        return items
+    if truthy(prop(data, "medications")) and isinstance(data["medications"], list):
+        items = []
+        for med in data["medications"]:
+            name = prop(med, "name")
+            content = prop(med, "pregnancy_safety")
+            content = content if truthy(content) else prop(med, "description")
+            items.append({
+                "title": f"{js_string(name) if truthy(name) else 'Medication'} - Safety Information",
+                "content": content if truthy(content) else "",
+                "source": "Medication Database",
+                "raw": pretty_json(med),
+                "tableSample": [med],
+                "columns": js_keys(med if truthy(med) else {}),
+            })
+        return items
+    if truthy(prop(data, "pdfs")) and isinstance(data["pdfs"], list):
+        items = []
+        for pdf in data["pdfs"]:
+            title = prop(pdf, "title")
+            summary = prop(pdf, "summary")
+            items.append({
+                "title": title if truthy(title) else "Clinical PDF",
+                "content": summary if truthy(summary) else "",
+                "source": "PDF Database",
+                "url": prop(pdf, "url"),
+                "raw": pretty_json(pdf),
+                "tableSample": [pdf],
+                "columns": js_keys(pdf if truthy(pdf) else {}),
+            })
+        return items
+
+    content = extract_meaningful(data)
+    row = {k: v for k, v in data.items() if k not in ("sections", "extraction_info")} if isinstance(data, dict) else UNDEFINED
+    return [{
+        "title": extract_title(content, filename),
+        "content": content,
+        "source": base_title(filename),
+        "raw": pretty_json(data),
+        "tableSample": [row] if truthy(row) else UNDEFINED,
+        "columns": [k for k in row if k not in ("sections", "extraction_info")] if truthy(row) else UNDEFINED,
+    }]
+
+def file_items(filename, content):
+    """The raw items of one output file, by extension; other files have none."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".json":
+        try:
+            data = js_value(json.loads(content))
+        except ValueError:
+            return []
+        return json_items(data, filename) if truthy(data) else []
+    if ext in (".txt", ".md"):
+        return [{
+            "title": extract_title(content, filename), "content": content,
+            "source": "Text File" if ext == ".txt" else "Markdown File", "raw": content,
+        }]
+    if ext == ".xml":
+        return [{
+            "title": extract_title(content, filename), "content": parse_xml(content)["content"],
+            "source": "XML File", "raw": content,
+        }]
+    if ext == ".csv":
+        title = extract_title(content, filename)
+        return [{
+            "title": f"{title} - Row {index + 1}",
+            "content": js_join(row.values(), " "),
+            "source": "CSV Data",
+            "raw": pretty_json(row),
+            "tableSample": [row],
+            "columns": list(row),
+        } for index, row in enumerate(parse_csv(content))]
+    return []
+
+def strip_extraction_info(row):
+    if isinstance(row, dict) and "extraction_info" in row:
+        return {k: v for k, v in row.items() if k != "extraction_info"}
+    return row
+
+def knowledge_item(filename, item):
+    """Turn one raw item into a Knowledge Center item, or None if it has no title or content."""
+    title = prop(item, "title")
+    content = prop(item, "content")
+    if not truthy(title) or not truthy(content):
+        return None
+    item_type, category, tags = categorize(filename, content)
+    table_sample = prop(item, "tableSample")
+    columns = prop(item, "columns")
+    if isinstance(columns, list):
+        columns = [c for c in columns if c != "extraction_info"]
+    elif isinstance(table_sample, list) and table_sample and (table_sample[0] is None or isinstance(table_sample[0], (dict, list))):
+        columns = [c for c in js_keys(table_sample[0]) if c != "extraction_info"]
+    else:
+        columns = UNDEFINED
+    source = prop(item, "source")
+    raw = prop(item, "raw")
+    knowledge = {
+        "id": re.sub(r"[^a-z0-9]+", "-", f"{filename}_{js_string(title)}".lower()),
+        "title": extract_title(title, filename),
+        "type": item_type,
+        "category": category,
+        "description": extract_readable(content, 280),
+        "source": source if truthy(source) else "Local Data",
+        "url": prop(item, "url"),
+        "tags": tags + [re.sub(r"\.[^.]*\Z", "", filename)],
+        "raw": raw if isinstance(raw, str) else UNDEFINED,
+        "tableSample": [strip_extraction_info(row) for row in table_sample][:10] if isinstance(table_sample, list) else UNDEFINED,
+        "columns": columns,
+    }
+    # undefined fields are left out of the JSON, as JSON.stringify does
+    return {key: value for key, value in knowledge.items() if value is not UNDEFINED}
+
+def build_items(base_dir=OUTPUT_DIR):
+    """Return the Knowledge Center items for every file in base_dir, as the route builds them."""
+    items = {}
+    for filename in sorted(os.listdir(base_dir), key=lambda name: name.encode("utf-8")):
+        path = os.path.join(base_dir, filename)
+        if os.path.isdir(path) or filename in INDEX_FILES or filename in DERIVED_FILES:
+            continue
+        try:
+            with open(path, "rb") as f:
+                content = f.read().decode("utf-8", errors="replace")
+            for item in file_items(filename, content):
+                knowledge = knowledge_item(filename, item)
+                # The first item with an id wins, as in the route's deduplication
+                if knowledge is not None and knowledge["id"] not in items:
+                    items[knowledge["id"]] = knowledge
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Failed to parse file {filename}: {e}")
+    return list(items.values())
+
+def index_json(items):
+    """Return the index document as compact UTF-8 JSON; the route can serve it as it is."""
+    body = json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+    document = {
+        "success": True,
+        "schema_version": SCHEMA_VERSION,
+        "version": hashlib.sha256(body.encode("utf-8", "surrogatepass")).hexdigest()[:16],
+        "count": len(items),
+        "source": SOURCE,
+        "items": items,
+    }
+    text = json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+    # A string cut inside a surrogate pair is escaped, as JSON.stringify does
+    text = re.sub("[\ud800-\udfff]", lambda m: f"\\u{ord(m.group(0)):04x}", text)
+    return text.encode("utf-8")
+
+def write_index():
+    """Build the index from the outputs and write it with its gzip and brotli copies; returns the item count."""
+    items = build_items()
+    content = index_json(items)
+    write_output(INDEX_NAME, content)
+    # mtime=0 keeps the gzip bytes, and so the unchanged check, independent of the build time
+    write_output(f"{INDEX_NAME}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+    br_path = os.path.join(OUTPUT_DIR, f"{INDEX_NAME}.br")
+    if brotli is not None:
+        write_output(f"{INDEX_NAME}.br", brotli.compress(content, quality=11))
+    elif os.path.exists(br_path):
+        # A copy left from an earlier build would no longer match the index
+        os.remove(br_path)
+        print(f"⚠️ brotli not installed; removed stale {INDEX_NAME}.br")
+    else:
+        print(f"⚠️ brotli not installed; skipping {INDEX_NAME}.br (pip install brotli)")
+    return len(items)
+
+if __name__ == "__main__":
+    print(f"🗂️ Indexing the files in {OUTPUT_DIR}...")
+    count = write_index()
+    print(f"💾 {count} knowledge items saved to {INDEX_NAME}")
@@ -0,0 +1,98 @@
+import csv
+import json
+import os
+import sys
+from outputs import OUTPUT_DIR, write_json
+from medication_names import IDS_NAME, SCHEMA_VERSION, MedicationIds, index_names
+
+# The medication_ids stage: one id per medication, and every name it goes by
+# (generic, brand, salt or ingredient form, any case) mapped to that id, so
+# outputs can be joined on medication with a dict lookup. How names become keys
+# and ids is up to medication_names.py.
+
+# Outputs whose records name a medication ("medication" or "medication_name"), with brand_names
+MEDICATION_FILES = [
+    "comprehensive_epilepsy_medications.json",
+    "epilepsy_medication_safety_database.json",
+    "comprehensive_pregnancy_categories.json",
+    "comprehensive_lactation_database.json",
+]
+MEDICATIONS_CSV_NAME = "epilepsy_medications.csv"
+# DailyMed labels name their medication and active ingredients. They are read
+# last: their names are lowercase, so the files above give generics their display names.
+DAILYMED_NAME = "dailymed_medication_data.json"
+
+def medication_records(base_dir=OUTPUT_DIR):
+    """Yield (generic name, brand names, other names) for every medication record in the outputs."""
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                yield from walk(item)
+        elif isinstance(node, dict):
+            name = node.get("medication") or node.get("medication_name")
+            if isinstance(name, str):
+                brands = node.get("brand_names")
+                # DailyMed's active ingredients, e.g. "DIVALPROEX SODIUM"
+                ingredients = node.get("active_ingredient")
+                yield (name, [b for b in brands if isinstance(b, str)] if isinstance(brands, list) else [],
+                       [i for i in ingredients.split(", ") if i] if isinstance(ingredients, str) else [])
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    yield from walk(value)
+
+    def read_json(name):
+        try:
+            with open(os.path.join(base_dir, name), "r", encoding="utf-8") as f:
+                yield from walk(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {name}: {e}")
+
+    for name in MEDICATION_FILES:
+        yield from read_json(name)
+    try:
+        with open(os.path.join(base_dir, MEDICATIONS_CSV_NAME), "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                yield row["Medication"], [row["Brand Name"]] if row.get("Brand Name") else [], []
+    except (OSError, KeyError) as e:
+        print(f"⚠️ Skipping {MEDICATIONS_CSV_NAME}: {e}")
+    yield from read_json(DAILYMED_NAME)
+
+def build_ids(base_dir=OUTPUT_DIR):
+    """Return the medication id document: {"medications": {id: names}, "keys": {key: id}}."""
+    medications, keys = index_names(medication_records(base_dir))
+    return {
+        "source": "Medication Name Index",
+        "description": "Canonical medication ids for every generic, brand and ingredient name in the outputs",
+        "schema_version": SCHEMA_VERSION,
+        "medications": medications,
+        "keys": keys,
+    }
+
+def write_ids(name=IDS_NAME):
+    """Build the medication ids from the outputs and write them unless unchanged; returns (medications, keys)."""
+    data = build_ids()
+    write_json(name, data)
+    return len(data["medications"]), len(data["keys"])
+
+def load_or_build_ids(base_dir=OUTPUT_DIR):
+    """Return the MedicationIds in base_dir, or build them from its outputs if they haven't been written."""
+    path = os.path.join(base_dir, IDS_NAME)
+    if os.path.exists(path):
+        return MedicationIds.load(path)
+    print(f"⚠️ {IDS_NAME} not found; building the medication ids in memory")
+    return MedicationIds(build_ids(base_dir))
+
+if __name__ == "__main__":
+    # python3 medication_ids.py          build medication_ids.json
+    # python3 medication_ids.py NAME...  resolve names with it
+    args = sys.argv[1:]
+    if not args:
+        print(f"💊 Building {IDS_NAME} from the medication outputs...")
+        count, key_count = write_ids()
+        print(f"💾 {count} medications, {key_count} names saved to {IDS_NAME}")
+        sys.exit(0)
+
+    ids = MedicationIds.load()
+    for name in args:
+        id_ = ids.resolve(name)
+        print(f"{name}: {id_} ({', '.join(ids.names(id_))})" if id_ else f"{name}: unknown")
@@ -0,0 +1,120 @@
+import json
+import re
+from outputs import output_path
+from search_text import WORD, normalize
+
+# How medication names are told apart, shared by the extractors that match
+# labels on them and the medication_ids stage that indexes the outputs. The id
+# of a medication is its generic name's key with dashes, e.g. "valproic-acid"
+# for "Valproic Acid", "valproate", "Depakote" and "DEPAKENE".
+IDS_NAME = "medication_ids.json"
+SCHEMA_VERSION = 1
+
+# Active ingredient names that stand for a generic but that no output lists
+INGREDIENT_ALIASES = {
+    "valproic acid": ["valproate", "divalproex"]
+}
+
+# Words after a name that say which salt, form or strength it is, not which
+# medication: "Divalproex Sodium Delayed-Release Tablets" is divalproex
+QUALIFIER_WORDS = frozenset("""
+sodium potassium calcium magnesium hydrochloride hcl acetate mesylate
+tablet tablets capsule capsules oral solution suspension syrup injection injectable chewable dispersible
+extended delayed release film coated er xr dr sr cr odt kit mg mcg ml
+""".split())
+# Bracketed parts of label titles, e.g. "[Teva Pharmaceuticals USA, Inc.]"
+BRACKETED = re.compile(r"\[[^\]]*\]|\([^)]*\)")
+
+def medication_key(name):
+    """Return the lookup key of a medication name: lowercase words, qualifiers and brackets dropped."""
+    words = WORD.findall(normalize(BRACKETED.sub(" ", name or "")))
+    while len(words) > 1 and (words[-1] in QUALIFIER_WORDS or words[-1].isdigit()):
+        words.pop()
+    return " ".join(words)
+
+def medication_id(key):
+    """Return the id for a generic name's key."""
+    return key.replace(" ", "-")
+
+def index_names(records):
+    """Return ({id: {"name", "brand_names", "other_names"}}, {key: id}) for (generic, brand names, other names) records.
+
+    The generics of INGREDIENT_ALIASES are added, with their aliases as other names.
+    """
+    medications = {}
+    keys = {}
+
+    def claim(name, id_, field):
+        key = medication_key(name)
+        if not key:
+            return
+        if key in keys:
+            # A name can only stand for one medication; the first claim wins
+            if keys[key] != id_:
+                print(f"⚠️ {name!r} names both {keys[key]} and {id_}; keeping {keys[key]}")
+            return
+        keys[key] = id_
+        medications[id_][field].append(name.strip())
+
+    records = list(records)
+    records += [(generic, [], aliases) for generic, aliases in INGREDIENT_ALIASES.items()]
+    # Generic names first, so a brand can't take the key of a generic listed later
+    for generic, _, _ in records:
+        key = medication_key(generic)
+        if key and key not in keys:
+            keys[key] = medication_id(key)
+            medications.setdefault(keys[key], {"name": generic.strip(), "brand_names": [], "other_names": []})
+    for generic, brands, _ in records:
+        id_ = keys.get(medication_key(generic))
+        if id_ is None:
+            continue
+        for brand in brands:
+            claim(brand, id_, "brand_names")
+    for generic, _, other_names in records:
+        id_ = keys.get(medication_key(generic))
+        if id_ is None:
+            continue
+        for name in other_names:
+            claim(name, id_, "other_names")
+    return dict(sorted(medications.items())), dict(sorted(keys.items()))
+
+class MedicationIds:
+    """Medication ids and the names that resolve to them.
+
+        ids = MedicationIds.load()                       # medication_ids.json, see medication_ids.py
+        ids = MedicationIds.from_records([("lamotrigine", [], [])])
+        ids.resolve("Depakote ER")   # "valproic-acid"
+        ids.name("valproic-acid")    # "Valproic Acid"
+    """
+
+    def __init__(self, data):
+        self.medications = data["medications"]
+        self.keys = data["keys"]
+
+    @classmethod
+    def from_records(cls, records):
+        """Index (generic, brand names, other names) records in memory."""
+        medications, keys = index_names(records)
+        return cls({"medications": medications, "keys": keys})
+
+    @classmethod
+    def load(cls, path=None):
+        """Read the ids (medication_ids.json in the output root by default)."""
+        with open(path or output_path(IDS_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data["schema_version"] != SCHEMA_VERSION:
+            raise ValueError(f"medication ids schema {data['schema_version']}, expected {SCHEMA_VERSION}; rebuild them")
+        return cls(data)
+
+    def resolve(self, name):
+        """Return the id of the medication a name stands for, or None."""
+        return self.keys.get(medication_key(name))
+
+    def name(self, id_):
+        """Return the generic name for an id."""
+        return self.medications[id_]["name"]
+
+    def names(self, id_):
+        """Return every name of a medication: generic first, then brands, then other forms."""
+        medication = self.medications[id_]
+        return [medication["name"]] + medication["brand_names"] + medication["other_names"]
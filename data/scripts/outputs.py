@@ -0,0 +1,55 @@
+import json
+import os
+import re
+
+# Every script writes its outputs under one root: data/ by default, or DATA_OUTPUT_DIR
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.abspath(os.environ.get("DATA_OUTPUT_DIR", os.path.join(SCRIPTS_DIR, "..")))
+
+def output_path(*parts):
+    """Return the path of an output under OUTPUT_DIR, creating its directory."""
+    path = os.path.join(OUTPUT_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+# Keys that change on every run without the data changing
+VOLATILE_KEYS = {"extracted_at"}
+
+def strip_volatile(data):
+    """Return JSON data without VOLATILE_KEYS, at any depth."""
+    if isinstance(data, dict):
+        return {key: strip_volatile(value) for key, value in data.items() if key not in VOLATILE_KEYS}
+    if isinstance(data, list):
+        return [strip_volatile(value) for value in data]
+    return data
+
+def write_output(name, content, normalize=None):
+    """Atomically write content (bytes) to an output unless it is unchanged; returns True if written.
+
+    normalize(bytes) maps content to what is compared, so timestamps and the like
+    don't count as changes. An unchanged file is not touched and keeps its mtime.
+    """
+    path = output_path(name)
+    normalize = normalize or (lambda data: data)
+    try:
+        with open(path, "rb") as f:
+            if normalize(f.read()) == normalize(content):
+                print(f"♻️ {name} unchanged")
+                return False
+    except (OSError, ValueError):
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+def write_json(name, data):
+    """Write JSON data to an output the way the scripts always have, ignoring VOLATILE_KEYS when comparing."""
+    content = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return write_output(name, content, normalize=lambda raw: strip_volatile(json.loads(raw)))
+
+def write_text(name, text, volatile=None):
+    """Write text to an output; matches of the volatile regex are ignored when comparing."""
+    normalize = (lambda raw: re.sub(volatile.encode("utf-8"), b"", raw)) if volatile else None
+    return write_output(name, text.encode("utf-8"), normalize=normalize)
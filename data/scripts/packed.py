@@ -0,0 +1,52 @@
+import json
+import sys
+from array import array
+
+# Binary files holding a JSON header and flat numeric arrays, for indexes that
+# are read whole and queried in memory:
+#
+#     MAGIC | uint32 header length | header JSON | arrays, little-endian, in header["arrays"] order
+
+# Array element types in the file, and the array typecodes that hold them here
+# ("I" and "i" are 4 bytes on every common platform, "L" and "l" elsewhere)
+TYPECODES = {
+    "uint32": next(code for code in "IL" if array(code).itemsize == 4),
+    "int32": next(code for code in "il" if array(code).itemsize == 4),
+    "float32": "f",
+}
+
+def new_array(kind, values=()):
+    """Return an array of one of the TYPECODES element types."""
+    return array(TYPECODES[kind], values)
+
+def pack(magic, header, arrays):
+    """Return the file bytes for header (a JSON-serializable dict) and arrays ({name: (type, values)})."""
+    header = dict(header, arrays=[{"name": name, "type": kind, "length": len(values)} for name, (kind, values) in arrays.items()])
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    parts = [magic, len(header_bytes).to_bytes(4, "little"), header_bytes]
+    for name, (kind, values) in arrays.items():
+        values = new_array(kind, values)
+        if sys.byteorder == "big":
+            values.byteswap()
+        parts.append(values.tobytes())
+    return b"".join(parts)
+
+def unpack(data, magic):
+    """Return (header, {name: array}) from bytes written by pack() with the same magic."""
+    if not data.startswith(magic):
+        raise ValueError(f"not a {magic.decode('ascii', 'replace')} file")
+    position = len(magic)
+    header_length = int.from_bytes(data[position:position + 4], "little")
+    position += 4
+    header = json.loads(data[position:position + header_length].decode("utf-8"))
+    position += header_length
+    arrays = {}
+    for spec in header["arrays"]:
+        values = new_array(spec["type"])
+        size = spec["length"] * values.itemsize
+        values.frombytes(data[position:position + size])
+        if sys.byteorder == "big":
+            values.byteswap()
+        arrays[spec["name"]] = values
+        position += size
+    return header, arrays
@@ -0,0 +1,83 @@
+import collections
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Parsing is CPU-bound, so it runs in worker processes while the fetch threads
+# keep downloading. EXTRACT_PARSE_WORKERS=0 parses inline in the fetching thread.
+PARSE_WORKERS = int(os.environ.get("EXTRACT_PARSE_WORKERS", os.cpu_count() or 1))
+
+# Documents waiting for a parser; fetch threads block once this many are queued
+MAX_PENDING_PARSES = max(1, PARSE_WORKERS) * 2
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(MAX_PENDING_PARSES)
+
+def get_pool():
+    """Return the shared parser process pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the fetch threads may hold locks at fork time
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def _discard_pool(pool):
+    """Forget a broken pool so the next parse starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+def run_parse(extract, *args):
+    """Return extract(*args), computed in a parser process when the pool is enabled.
+
+    extract must be a module-level function and args must be picklable. The
+    result is the same as calling extract(*args) directly; parser exceptions are
+    re-raised in the caller.
+    """
+    if PARSE_WORKERS <= 0:
+        return extract(*args)
+
+    with _pending:
+        pool = get_pool()
+        try:
+            return pool.submit(extract, *args).result()
+        except BrokenProcessPool:
+            print("⚠️ Parser process died, parsing this document inline")
+            _discard_pool(pool)
+            return extract(*args)
+
+def run_parse_many(extract, arg_lists):
+    """Yield extract(*args) for each args tuple, in order, spread across the parser pool.
+
+    At most MAX_PENDING_PARSES calls are queued ahead of the consumer, so results
+    can be handled as they stream in without submitting the whole batch at once.
+    """
+    if PARSE_WORKERS <= 0:
+        for args in arg_lists:
+            yield extract(*args)
+        return
+
+    pool = get_pool()
+    pending = collections.deque()
+    try:
+        for args in arg_lists:
+            pending.append(pool.submit(extract, *args))
+            if len(pending) >= MAX_PENDING_PARSES:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
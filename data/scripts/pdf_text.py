@@ -0,0 +1,169 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from parse_pool import run_parse_many
+from outputs import output_path, write_json
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional: pip install pypdf
+    PdfReader = None
+
+# pypdf logs a warning for every font it cannot fully decode; the text is still usable
+logging.getLogger("pypdf").setLevel(logging.ERROR)
+
+# Extracted page text, one directory per PDF content hash, one file per page
+CACHE_DIR = os.environ.get("PDF_TEXT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pdf_text_cache"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+SUMMARY_LENGTH = 500
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def page_cache_path(digest, page_number):
+    """Return the cache file path for one page of a PDF."""
+    return os.path.join(CACHE_DIR, digest, f"{page_number:05d}.txt")
+
+def meta_cache_path(digest):
+    """Return the cache file path holding a PDF's page count."""
+    return os.path.join(CACHE_DIR, digest, "meta.json")
+
+def write_atomic(path, text):
+    """Write text to path through a temp file so readers never see a partial page."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def cached_page_count(digest):
+    """Return the page count recorded for a PDF hash, or None."""
+    try:
+        with open(meta_cache_path(digest), "r", encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def load_page(digest, page_number):
+    """Return a cached page's text, or None if it has not been extracted yet."""
+    try:
+        with open(page_cache_path(digest, page_number), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+_reader = (None, None)
+
+def extract_page(path, digest, page_number):
+    """Extract one page's text; runs in a parser process that keeps the last PDF open."""
+    global _reader
+    if _reader[0] != digest:
+        _reader = (digest, PdfReader(path))
+    return _reader[1].pages[page_number].extract_text() or ""
+
+def pdf_page_texts(path, digest=None):
+    """Return the text of every page of a PDF, extracting only pages missing from the cache.
+
+    Pages are extracted in the parser process pool and written to the cache as
+    each one finishes, so an interrupted run resumes where it stopped. A PDF
+    whose content hash is unchanged is served entirely from the cache.
+    """
+    digest = digest or file_sha256(path)
+    page_count = cached_page_count(digest)
+    if page_count is None:
+        if PdfReader is None:
+            raise RuntimeError("pypdf is not installed (pip install pypdf)")
+        page_count = len(PdfReader(path).pages)
+        write_atomic(meta_cache_path(digest), json.dumps({"pages": page_count}))
+
+    pages = [load_page(digest, n) for n in range(page_count)]
+    missing = [n for n, text in enumerate(pages) if text is None]
+    if missing:
+        if PdfReader is None:
+            raise RuntimeError("pypdf is not installed (pip install pypdf)")
+        texts = run_parse_many(extract_page, [(path, digest, n) for n in missing])
+        for page_number, text in zip(missing, texts):
+            write_atomic(page_cache_path(digest, page_number), text)
+            pages[page_number] = text
+    return pages
+
+def pdf_bytes_text(content):
+    """Return the page texts of an in-memory PDF, using the same page cache."""
+    digest = hashlib.sha256(content).hexdigest()
+    page_count = cached_page_count(digest)
+    if page_count is not None:
+        pages = [load_page(digest, n) for n in range(page_count)]
+        if None not in pages:
+            return pages
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        return pdf_page_texts(tmp_path, digest)
+    finally:
+        os.remove(tmp_path)
+
+def summarize(pages, length=SUMMARY_LENGTH):
+    """Return the first `length` characters of the text with whitespace collapsed."""
+    return " ".join(" ".join(pages).split())[:length]
+
+def extract_pdf_texts(pdf_dir="pdfs", resources=()):
+    """Extract text from every PDF in pdf_dir, re-extracting only files whose hash changed."""
+    by_filename = {resource["filename"]: resource for resource in resources}
+    pdf_text_data = {
+        "extraction_info": {
+            "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_pdfs": 0,
+            "successful_extractions": 0,
+            "note": "Page-by-page text extracted from the downloaded PDF files"
+        },
+        "pdfs": []
+    }
+
+    for path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+        filename = os.path.basename(path)
+        resource = by_filename.get(filename, {})
+        pdf_text_data["extraction_info"]["total_pdfs"] += 1
+        try:
+            digest = file_sha256(path)
+            pages = pdf_page_texts(path, digest)
+        except Exception as e:
+            print(f"❌ Error extracting text from {filename}: {e}")
+            continue
+
+        print(f"✅ Extracted {len(pages)} pages from {filename}")
+        pdf_text_data["pdfs"].append({
+            "title": resource.get("name", filename),
+            "filename": filename,
+            "url": resource.get("url"),
+            "sha256": digest,
+            "page_count": len(pages),
+            "summary": summarize(pages),
+            "pages": [{"page": n + 1, "text": text} for n, text in enumerate(pages)]
+        })
+        pdf_text_data["extraction_info"]["successful_extractions"] += 1
+
+    return pdf_text_data
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else output_path("pdfs", "")
+    print(f"📄 Extracting PDF text from {os.path.abspath(pdf_dir)}...")
+
+    from extract_pdf_data_properly import PDF_RESOURCES
+    pdf_text_data = extract_pdf_texts(pdf_dir, PDF_RESOURCES)
+
+    write_json("pdf_text_data.json", pdf_text_data)
+
+    print(f"💾 PDF text saved to {output_path('pdf_text_data.json')}")
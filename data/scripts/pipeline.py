@@ -0,0 +1,308 @@
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from outputs import SCRIPTS_DIR, OUTPUT_DIR, output_path, write_json
+
+# Every data script as a stage: the outputs it writes (relative to the output root)
+# and the outputs of other stages it reads. A stage runs once all stages producing
+# its inputs have finished, and stages with nothing between them run in parallel.
+# "remote" stages read web sources, which no local fingerprint can see change;
+# "resumable" ones accept --resume to continue from their checkpoint journal.
+# "sources" names the module-level constants holding what a remote stage fetches
+# (a URL, or a list of URLs or of {"url": ...} records), in its script or, as
+# "module.py:NAME", in a module it uses. Two remote stages that fetch from the
+# same host never run at once: each stage process paces requests with its own
+# rate limiter (rate_limit.py), which can't see what another process sends to that host.
+STAGES = [
+    {"name": "cdc", "script": "extract_cdc_data.py", "remote": True, "sources": ["URL"],
+     "outputs": ["cdc_medicine_pregnancy.json"]},
+    {"name": "cdc_reproductive_health", "script": "extract_cdc_reproductive_health.py", "remote": True, "sources": ["CDC_URL"],
+     "outputs": ["cdc_reproductive_health_data.json"]},
+    {"name": "pregnancy", "script": "extract_pregnancy_data.py", "remote": True, "resumable": True,
+     "sources": ["PREGNANCY_WEBSITES"],
+     "outputs": ["comprehensive_pregnancy_data.json"]},
+    {"name": "additional_pregnancy", "script": "extract_additional_pregnancy_sources.py", "remote": True, "resumable": True,
+     "sources": ["ADDITIONAL_SOURCES"],
+     "outputs": ["additional_pregnancy_data.json"]},
+    {"name": "alternative_health", "script": "extract_alternative_health_data.py", "remote": True, "resumable": True,
+     "sources": ["ALTERNATIVE_SOURCES"],
+     "outputs": ["alternative_health_data.json"]},
+    {"name": "drug_safety", "script": "extract_drug_safety_data.py", "remote": True, "resumable": True,
+     "sources": ["DRUG_SAFETY_SOURCES"],
+     "outputs": ["drug_safety_data.json"]},
+    {"name": "epilepsy_pregnancy", "script": "extract_epilepsy_pregnancy_data.py", "remote": True, "resumable": True,
+     "sources": ["EPILEPSY_RESOURCES", "PDF_RESOURCES"],
+     "outputs": ["epilepsy_pregnancy_comprehensive_data.json"]},
+    {"name": "lactmed", "script": "extract_lactmed_data.py", "remote": True, "sources": ["LACTMED_URL"],
+     "outputs": ["lactmed_database.json", "comprehensive_lactation_database.json"]},
+    {"name": "pregnancy_categories", "script": "extract_pregnancy_categories_data.py", "remote": True, "sources": ["DRUGS_COM_URL"],
+     "outputs": ["drugs_com_pregnancy_categories.json", "comprehensive_pregnancy_categories.json"]},
+    {"name": "dailymed", "script": "extract_dailymed_data.py", "remote": True, "resumable": True,
+     "sources": ["dailymed_client.py:DAILYMED_BASE_URL"],
+     "outputs": ["dailymed_medication_data.json", "epilepsy_medication_safety_database.json"]},
+    {"name": "pdfs", "script": "extract_pdf_data_properly.py", "remote": True, "sources": ["PDF_RESOURCES"],
+     "outputs": ["pdfs", "pdf_database.json", "pdf_text_data.json"]},
+    {"name": "epilepsy_pregnancy_database", "script": "create_epilepsy_pregnancy_database.py",
+     "outputs": ["epilepsy_pregnancy_comprehensive_database.json"]},
+    {"name": "pregnancy_registry", "script": "create_pregnancy_registry_database.py",
+     "outputs": ["pregnancy_registry_comprehensive_database.json"]},
+    {"name": "file_formats", "script": "create_proper_file_formats.py",
+     "outputs": ["epilepsy_medications.csv", "pregnancy_tracking_schedule.csv", "seizure_tracking_log.csv",
+                 "medical_guidelines.xml", "emergency_information.txt", "medication_instructions.txt",
+                 "user_guide.md", "api_documentation.md"]},
+]
+# Hand-maintained datasets that no stage writes but later stages read
+STATIC_DATA = ["comprehensive_drug_database.json", "comprehensive_epilepsy_medications.json", "medical_terms_glossary.json"]
+DATA_FILES = STATIC_DATA + [output for stage in STAGES for output in stage["outputs"] if output != "pdfs"]
+# One id per medication for every generic, brand and ingredient name, for joining outputs on medication
+STAGES.append({"name": "medication_ids", "script": "medication_ids.py",
+               "inputs": ["comprehensive_epilepsy_medications.json", "epilepsy_medication_safety_database.json",
+                          "comprehensive_pregnancy_categories.json", "comprehensive_lactation_database.json",
+                          "epilepsy_medications.csv", "dailymed_medication_data.json"],
+               "outputs": ["medication_ids.json"]})
+# Load every output into one SQLite database with a full-text index
+STAGES.append({"name": "knowledge_db", "script": "knowledge_db.py", "inputs": DATA_FILES + ["medication_ids.json"],
+               "outputs": ["knowledge.db"]})
+# The near-duplicate section clusters knowledge.db was built with, for consumers of the JSON outputs
+STAGES.append({"name": "section_dedup", "script": "section_dedup.py", "inputs": ["knowledge.db"],
+               "outputs": ["section_duplicates.json"]})
+# BM25 search index over the database's sections, terms, medications and PDF pages, duplicates indexed once
+STAGES.append({"name": "search_index", "script": "search_index.py", "inputs": ["knowledge.db"],
+               "outputs": ["search_index.bin"]})
+# Type-ahead trie over the glossary and medication names, ranked by their mentions in the database
+STAGES.append({"name": "term_trie", "script": "term_trie.py",
+               "inputs": ["knowledge.db", "medical_terms_glossary.json", "medication_ids.json"],
+               "outputs": ["term_trie.bin"]})
+# Precompute the Knowledge Center items the app would otherwise build per request
+STAGES.append({"name": "knowledge_index", "script": "knowledge_index.py", "inputs": DATA_FILES,
+               "outputs": ["knowledge_index.json", "knowledge_index.json.gz", "knowledge_index.json.br"]})
+# Snapshot everything into the artifact store once all outputs exist
+STAGES.append({"name": "artifacts", "script": "artifact_store.py",
+               "inputs": STATIC_DATA + [output for stage in STAGES for output in stage["outputs"]],
+               "outputs": [".artifacts/manifest.json"]})
+
+# Stages run at once; most are network-bound, so more than the CPU count is fine
+PIPELINE_JOBS = int(os.environ.get("PIPELINE_JOBS", 4))
+
+# Fingerprints of the last successful run of each stage, for --incremental
+STATE_NAME = os.path.join(".pipeline", "fingerprints.json")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def stage_dependencies(stages):
+    """Return {stage name: set of names of the stages producing its inputs}."""
+    producers = {}
+    for stage in stages:
+        for output in stage["outputs"]:
+            if output in producers:
+                raise ValueError(f"{output} is written by both {producers[output]} and {stage['name']}")
+            producers[output] = stage["name"]
+    names = {stage["name"] for stage in stages}
+    return {
+        stage["name"]: {producers[i] for i in stage.get("inputs", []) if producers.get(i) in names}
+        for stage in stages
+    }
+
+def source_urls(script, name):
+    """Return the URLs in a source constant of a script, read without importing it."""
+    with open(os.path.join(SCRIPTS_DIR, script), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == name for target in node.targets):
+            value = ast.literal_eval(node.value)
+            return [item["url"] if isinstance(item, dict) else item for item in (value if isinstance(value, list) else [value])]
+    raise ValueError(f"{script} has no source constant {name}")
+
+def stage_hosts(stage):
+    """Return the hosts a remote stage fetches from (those of the URLs in its sources); empty for local stages."""
+    if not stage.get("remote"):
+        return frozenset()
+    hosts = set()
+    for source in stage["sources"]:
+        script, _, name = source.rpartition(":")
+        hosts.update(urlparse(url).netloc.lower() for url in source_urls(script or stage["script"], name))
+    return frozenset(hosts)
+
+def code_files(script):
+    """Return the script and the local modules it imports, directly or indirectly."""
+    seen = []
+    pending = [script]
+    while pending:
+        name = pending.pop()
+        path = os.path.join(SCRIPTS_DIR, name)
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.append(name)
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(f"{alias.name}.py" for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(f"{node.module}.py")
+    return sorted(seen)
+
+def _hash_path(digest, path):
+    """Feed a file's content, or every file under a directory, into digest."""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+                _hash_path(digest, file_path)
+    elif os.path.exists(path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    else:
+        digest.update(b"<missing>")
+
+def stage_fingerprint(stage):
+    """Return a SHA-256 over a stage's code, arguments and input files."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(stage.get("args", [])).encode("utf-8"))
+    for name in code_files(stage["script"]):
+        digest.update(f"\0code:{name}\0".encode("utf-8"))
+        _hash_path(digest, os.path.join(SCRIPTS_DIR, name))
+    for name in stage.get("inputs", []):
+        digest.update(f"\0input:{name}\0".encode("utf-8"))
+        _hash_path(digest, os.path.join(OUTPUT_DIR, name))
+    return digest.hexdigest()
+
+def load_state():
+    """Return {stage name: {"fingerprint", "outputs"}} from the last runs, empty if missing."""
+    try:
+        with open(output_path(STATE_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)["stages"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def is_up_to_date(stage, fingerprint, state):
+    """True if a stage last succeeded with this fingerprint and its outputs are all still there."""
+    entry = state.get(stage["name"])
+    return (not stage.get("remote") and entry is not None and entry["fingerprint"] == fingerprint
+            and all(os.path.exists(os.path.join(OUTPUT_DIR, name)) for name in entry["outputs"]))
+
+def run_stage(stage, env, resume=False):
+    """Run one stage's script from the scripts directory; returns (returncode, output, seconds)."""
+    print(f"▶️ {stage['name']}: {stage['script']}")
+    started = time.time()
+    resume_args = ["--resume"] if resume and stage.get("resumable") else []
+    proc = subprocess.run(
+        [sys.executable, stage["script"]] + stage.get("args", []) + resume_args,
+        cwd=SCRIPTS_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding="utf-8", errors="replace",
+    )
+    return proc.returncode, proc.stdout, time.time() - started
+
+def stage_env(jobs):
+    """Return the environment for stage processes.
+
+    All stages write under the same output root, and unless EXTRACT_PARSE_WORKERS
+    is set the CPUs are shared between the parser pools of concurrent stages.
+    """
+    env = dict(os.environ, DATA_OUTPUT_DIR=OUTPUT_DIR, PYTHONIOENCODING="utf-8")
+    env.setdefault("EXTRACT_PARSE_WORKERS", str(max(1, (os.cpu_count() or 1) // jobs)))
+    return env
+
+def run_pipeline(stages=STAGES, jobs=PIPELINE_JOBS, incremental=False, resume=False):
+    """Run stages in dependency order, up to jobs at once.
+
+    Returns {name: "ok" | "unchanged" | "failed" | "skipped"}. A stage whose
+    dependency failed is skipped; independent stages still run. A remote stage
+    waits while another stage fetching from one of its hosts is running. Each
+    stage's output is printed as a block when it finishes. With incremental=True a
+    stage whose fingerprint (code, arguments, inputs) matches its last
+    successful run is not run again; remote stages always run. resume=True
+    lets resumable stages pick up their interrupted runs.
+    """
+    dependencies = stage_dependencies(stages)
+    by_name = {stage["name"]: stage for stage in stages}
+    env = stage_env(jobs)
+    state = load_state()
+    fingerprints = {}
+    status = {}
+    running = {}
+    hosts = {stage["name"]: stage_hosts(stage) for stage in stages}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(status) < len(stages):
+            busy_hosts = set().union(*(hosts[name] for name in running.values()))
+            for name, needs in dependencies.items():
+                if name in status or name in running.values():
+                    continue
+                if any(status.get(dep) in ("failed", "skipped") for dep in needs):
+                    status[name] = "skipped"
+                    print(f"⏭️ {name}: skipped, {', '.join(sorted(d for d in needs if status.get(d) in ('failed', 'skipped')))} not built")
+                elif hosts[name] & busy_hosts:
+                    continue
+                elif all(status.get(dep) in ("ok", "unchanged") for dep in needs):
+                    # Inputs are complete now, so this is what the stage will see
+                    fingerprints[name] = stage_fingerprint(by_name[name])
+                    if incremental and is_up_to_date(by_name[name], fingerprints[name], state):
+                        status[name] = "unchanged"
+                        print(f"⏩ {name}: up to date")
+                        continue
+                    running[executor.submit(run_stage, by_name[name], env, resume)] = name
+                    busy_hosts |= hosts[name]
+            if not running:
+                if len(status) < len(stages):
+                    raise ValueError(f"dependency cycle among: {', '.join(sorted(set(by_name) - set(status)))}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, output, seconds = future.result()
+                status[name] = "ok" if returncode == 0 else "failed"
+                if returncode == 0:
+                    state[name] = {
+                        "fingerprint": fingerprints[name],
+                        "outputs": [o for o in by_name[name]["outputs"] if os.path.exists(os.path.join(OUTPUT_DIR, o))]
+                    }
+                print(f"\n===== {name} ({by_name[name]['script']}) =====")
+                print(output.rstrip())
+                mark = "✅" if returncode == 0 else f"❌ exit code {returncode},"
+                print(f"{mark} {name} finished in {seconds:.1f}s\n")
+    write_json(STATE_NAME, {"stages": state})
+    return status
+
+if __name__ == "__main__":
+    # python3 pipeline.py [--jobs N] [--incremental] [--resume] [--list] [STAGE...]
+    # With stage names only those stages run (still in dependency order among themselves)
+    args = sys.argv[1:]
+    incremental = "--incremental" in args
+    resume = "--resume" in args
+    args = [arg for arg in args if arg not in ("--incremental", "--resume")]
+    jobs = PIPELINE_JOBS
+    if "--jobs" in args:
+        i = args.index("--jobs")
+        jobs = int(args[i + 1])
+        del args[i:i + 2]
+
+    if "--list" in args:
+        dependencies = stage_dependencies(STAGES)
+        for stage in STAGES:
+            after = f" (after {', '.join(sorted(dependencies[stage['name']]))})" if dependencies[stage["name"]] else ""
+            print(f"{stage['name']}: {stage['script']} -> {', '.join(stage['outputs'])}{after}")
+        sys.exit(0)
+
+    unknown = [name for name in args if name not in {stage["name"] for stage in STAGES}]
+    if unknown:
+        sys.exit(f"Unknown stage(s): {', '.join(unknown)}; see --list")
+    stages = [stage for stage in STAGES if stage["name"] in args] if args else STAGES
+
+    print(f"🌍 Running {len(stages)} stages, {jobs} at a time, writing to {OUTPUT_DIR}")
+    started = time.time()
+    status = run_pipeline(stages, max(1, jobs), incremental, resume)
+    failed = [name for name, state in status.items() if state not in ("ok", "unchanged")]
+    print(f"🏁 {len(status) - len(failed)}/{len(status)} stages succeeded in {time.time() - started:.1f}s")
+    if failed:
+        print(f"❌ Not built: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,91 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Default pacing for hosts without an explicit entry: 1 request/second, bursts of 2
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 2
+
+# Per-host (requests per second, burst) overrides
+HOST_RATES = {
+    "dailymed.nlm.nih.gov": (2.0, 4),
+    "www.ncbi.nlm.nih.gov": (3.0, 3),
+    "media.epilepsypregnancy.com": (2.0, 4),
+}
+
+# Never slow a throttled host below one request every 30 seconds
+MIN_RATE = 1 / 30
+# Fraction of the configured rate regained after each successful request
+RECOVERY_STEP = 0.1
+
+class TokenBucket:
+    """Token bucket for a single host, adapted down on 429 and back up on success."""
+
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return how long the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        """Block until a request to this host is allowed."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self, retry_after=None):
+        """Halve the rate and pause the host after a 429 response."""
+        with self.lock:
+            now = time.monotonic()
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = 0
+            self.updated = now
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+    def recover(self):
+        """Step the rate back towards the configured maximum after a success."""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(host):
+    """Return the shared token bucket for a host."""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = HOST_RATES.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+            bucket = _buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,98 @@
+import glob
+import json
+import os
+import sys
+from outputs import OUTPUT_DIR, output_path, write_json
+
+# EXTRACT_STREAM_OUTPUT=1 writes each extracted record to <output>.ndjson as soon
+# as it arrives instead of holding the whole document until the end
+STREAM_OUTPUT = os.environ.get("EXTRACT_STREAM_OUTPUT", "0") == "1"
+
+def stream_name(name):
+    """Return the NDJSON stream that goes with a JSON output name."""
+    return f"{os.path.splitext(name)[0]}.ndjson"
+
+class RecordOutput:
+    """An extractor's output document, filled one record at a time.
+
+    document is the usual nested JSON with its record lists empty. Records are
+    added with their source index, so the lists come out in source order however
+    the sources finish. By default they are kept until close() writes the JSON.
+    With stream=True each record goes straight to an NDJSON file instead:
+
+        {"kind": "header", "document": {...}}                 the document, lists empty
+        {"kind": "record", "list": "sources", "index": 3, "record": {...}}
+        {"kind": "footer", "document": {...}}                 final counts etc.
+
+    The stream is readable while the run goes on, and close() compacts it into
+    the same JSON file the in-memory mode writes.
+    """
+
+    def __init__(self, name, document, stream=None):
+        self.name = name
+        self.document = document
+        self.stream = STREAM_OUTPUT if stream is None else stream
+        self.counts = {}
+        self._records = {}
+        self._file = None
+        if self.stream:
+            self._file = open(output_path(stream_name(name)), "w", encoding="utf-8")
+            self._write({"kind": "header", "document": document})
+
+    def _write(self, line):
+        self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def add(self, list_name, index, record):
+        """Add one record to a list of the document."""
+        self.counts[list_name] = self.counts.get(list_name, 0) + 1
+        if self.stream:
+            self._write({"kind": "record", "list": list_name, "index": index, "record": record})
+        else:
+            self._records.setdefault(list_name, []).append((index, record))
+
+    def close(self):
+        """Write the JSON output and return the complete document."""
+        if not self.stream:
+            for list_name, records in self._records.items():
+                self.document[list_name] = [record for _, record in sorted(records, key=lambda r: r[0])]
+            write_json(self.name, self.document)
+            return self.document
+        self._write({"kind": "footer", "document": {
+            key: value for key, value in self.document.items() if key not in self.counts
+        }})
+        self._file.close()
+        return compact(self.name)
+
+def read_stream(path):
+    """Return the document an NDJSON stream describes; a stream cut off mid-run gives what it has."""
+    document = {}
+    records = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry["kind"] == "record":
+                records.setdefault(entry["list"], []).append((entry["index"], entry["record"]))
+            else:
+                document.update(entry["document"])
+    for list_name, items in records.items():
+        document[list_name] = [record for _, record in sorted(items, key=lambda r: r[0])]
+    return document
+
+def compact(name):
+    """Rebuild the nested JSON output from its NDJSON stream and return the document."""
+    document = read_stream(output_path(stream_name(name)))
+    write_json(name, document)
+    return document
+
+if __name__ == "__main__":
+    # python3 record_output.py [NAME.json...]   compact the given outputs, or every stream in the output root
+    names = sys.argv[1:] or [
+        f"{os.path.splitext(os.path.basename(path))[0]}.json" for path in sorted(glob.glob(os.path.join(OUTPUT_DIR, "*.ndjson")))
+    ]
+    for name in names:
+        compact(name)
+        print(f"📦 Compacted {stream_name(name)} into {name}")
@@ -0,0 +1,151 @@
+import heapq
+import html
+import re
+import sys
+import time
+from outputs import output_path
+from packed import unpack
+from search_index import INDEX_NAME, MAGIC, FORMAT_VERSION
+from search_text import tokens
+
+SNIPPET_LENGTH = 160
+MAX_HIGHLIGHTS = 2
+WHITESPACE = re.compile(r"\s")
+
+class SearchIndex:
+    """A BM25 index written by search_index.py, held in memory for queries.
+
+        index = SearchIndex.load()
+        for result in index.search("lamotrigine breastfeeding", k=5):
+            print(result["score"], result["title"], result["highlights"])
+    """
+
+    def __init__(self, header, arrays):
+        self.documents = header["documents"]
+        self.texts = header["texts"]
+        self.term_ids = {term: i for i, term in enumerate(header["terms"])}
+        self.forms = header["forms"]
+        self.offsets = arrays["offsets"]
+        self.doc_ids = arrays["doc_ids"]
+        self.weights = arrays["weights"]
+
+    @classmethod
+    def load(cls, path=None):
+        """Read an index file (search_index.bin in the output root by default)."""
+        with open(path or output_path(INDEX_NAME), "rb") as f:
+            header, arrays = unpack(f.read(), MAGIC)
+        if header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"search index format {header['format_version']}, expected {FORMAT_VERSION}; rebuild it")
+        return cls(header, arrays)
+
+    def scores(self, term_ids):
+        """Return (scores, matched): BM25 scores by document id, and the ids of the documents matching any term."""
+        scores = [0.0] * len(self.documents)
+        matched = set()
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            doc_ids = self.doc_ids[start:end]
+            for doc_id, weight in zip(doc_ids, self.weights[start:end]):
+                scores[doc_id] += weight
+            matched.update(doc_ids)
+        return scores, matched
+
+    def search(self, query, k=10, kinds=None, highlight=True):
+        """Return the top k documents for query, best first.
+
+        Each result is the document's metadata (kind, title, file, source, url,
+        and table/row_id in knowledge.db) plus its score and, with highlight=True,
+        up to MAX_HIGHLIGHTS HTML-escaped snippets with the matched words in <mark> tags.
+        kinds limits the results to some kinds, e.g. ["section", "pdf_page"].
+        """
+        term_ids = sorted({self.term_ids[term] for term in tokens(query) if term in self.term_ids})
+        scores, matched = self.scores(term_ids)
+        if kinds is not None:
+            kinds = set(kinds)
+            matched = [doc_id for doc_id in matched if self.documents[doc_id]["kind"] in kinds]
+        best = heapq.nlargest(k, matched, key=scores.__getitem__)
+        # Ties go to the earlier document, so results are stable
+        best.sort(key=lambda doc_id: (-scores[doc_id], doc_id))
+        pattern = self.highlight_pattern(term_ids) if highlight and best else None
+        results = []
+        for doc_id in best:
+            result = dict(self.documents[doc_id], id=doc_id, score=round(scores[doc_id], 4))
+            if highlight:
+                result["highlights"] = highlights(self.texts[doc_id], pattern)
+            results.append(result)
+        return results
+
+    def highlight_pattern(self, term_ids):
+        """Return a regex matching the words the index saw for the terms; group names are term ids."""
+        alternatives = []
+        for term_id in term_ids:
+            forms = sorted(self.forms[term_id], key=len, reverse=True)
+            alternatives.append(f"(?P<t{term_id}>{'|'.join(map(re.escape, forms))})")
+        return re.compile(f"(?<![^\\W_])(?:{'|'.join(alternatives)})(?![^\\W_])", re.IGNORECASE)
+
+def highlights(text, pattern, length=SNIPPET_LENGTH, limit=MAX_HIGHLIGHTS):
+    """Return up to limit snippets of text around the matches of pattern, matches in <mark> tags.
+
+    Snippets covering the most distinct terms come first; they don't overlap.
+    """
+    matches = [(m.start(), m.end(), m.lastgroup) for m in pattern.finditer(text)]
+    candidates = []
+    last = 0
+    for i, (start, _, _) in enumerate(matches):
+        # One window starting a little before each match, covering the matches that fit in it
+        window_start = max(0, start - length // 4)
+        window_end = min(len(text), window_start + length)
+        last = max(last, i)
+        while last + 1 < len(matches) and matches[last + 1][1] <= window_end:
+            last += 1
+        covered = matches[i:last + 1]
+        candidates.append((len({m[2] for m in covered}), -window_start, window_start, window_end, covered))
+    chosen = []
+    for _, _, window_start, window_end, covered in sorted(candidates, key=lambda c: c[:2], reverse=True):
+        if len(chosen) == limit:
+            break
+        if all(window_end <= s or window_start >= e for s, e, _ in chosen):
+            chosen.append((window_start, window_end, covered))
+    return [snippet(text, start, end, covered) for start, end, covered in sorted(chosen, key=lambda c: c[0])]
+
+def snippet(text, start, end, matches):
+    """Return text[start:end] trimmed to whole words and HTML-escaped, with matches in <mark> tags."""
+    # Any whitespace ends a word: section lines are joined with newlines
+    if start > 0:
+        space = WHITESPACE.search(text, start, matches[0][0] if matches else end)
+        start = space.end() if space else start
+    if end < len(text):
+        spaces = [space.start() for space in WHITESPACE.finditer(text, matches[-1][1] if matches else start, end)]
+        end = spaces[-1] if spaces else end
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for match_start, match_end, _ in matches:
+        if match_end > end:
+            break
+        parts.append(html.escape(text[position:match_start]))
+        parts.append(f"<mark>{html.escape(text[match_start:match_end])}</mark>")
+        position = match_end
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    return " ".join("".join(parts).split())
+
+if __name__ == "__main__":
+    # python3 search.py [-k N] QUERY...
+    args = sys.argv[1:]
+    k = 10
+    if "-k" in args:
+        i = args.index("-k")
+        k = int(args[i + 1])
+        del args[i:i + 2]
+    if not args:
+        sys.exit("Usage: python3 search.py [-k N] QUERY...")
+
+    index = SearchIndex.load()
+    started = time.perf_counter()
+    results = index.search(" ".join(args), k=k)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🔎 {len(results)} results in {elapsed:.2f} ms")
+    for result in results:
+        print(f"\n{result['score']:.2f}  [{result['kind']}] {result['title']}  ({result['file']})")
+        for text in result["highlights"]:
+            print(f"    {text}")
@@ -0,0 +1,144 @@
+import math
+import os
+import sqlite3
+import sys
+from collections import Counter
+from outputs import OUTPUT_DIR, output_path, write_output
+from packed import new_array, pack
+from search_text import token_spans
+
+# BM25 index over the sections, glossary terms, medications and PDF pages in
+# knowledge.db, written as one packed file (see packed.py) that search.py reads.
+# Postings are flat arrays; term i owns postings[offsets[i]:offsets[i + 1]]. Each
+# posting carries the document's precomputed BM25 weight for the term, so a
+# query only adds weights up. Near-duplicate sections are indexed once:
+# knowledge.db keeps only the canonical copy (see section_dedup.py), which lists
+# where else it appears.
+INDEX_NAME = "search_index.bin"
+MAGIC = b"BM25IDX1"
+FORMAT_VERSION = 1
+INDEXED_KINDS = ["section", "glossary_term", "medication", "pdf_page"]
+K1 = 1.2
+B = 0.75
+
+# Where each kind of row came from: (file, source name, url) by row id
+METADATA_QUERIES = {
+    "sections": """SELECT sections.id, documents.name, sources.name, sources.url FROM sections
+                   JOIN documents ON documents.id = sections.document_id
+                   LEFT JOIN sources ON sources.id = sections.source_id""",
+    "glossary_terms": """SELECT glossary_terms.id, documents.name, documents.title, NULL FROM glossary_terms
+                         JOIN documents ON documents.id = glossary_terms.document_id""",
+    "medications": """SELECT medications.id, documents.name, documents.title, NULL FROM medications
+                      JOIN documents ON documents.id = medications.document_id""",
+    "pdf_pages": """SELECT pdf_pages.id, documents.name, pdf_pages.filename, pdf_pages.url FROM pdf_pages
+                    JOIN documents ON documents.id = pdf_pages.document_id""",
+}
+
+def load_documents(db_path):
+    """Return the searchable rows of knowledge.db as dicts, in a stable order.
+
+    Near-duplicate sections have no search rows; they are listed under their
+    canonical section's "duplicates" as {file, title, row_id}.
+    """
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        metadata = {}
+        for table, query in METADATA_QUERIES.items():
+            for row_id, file, source, url in con.execute(query):
+                metadata[(table, row_id)] = (file, source, url)
+        marks = ", ".join("?" for _ in INDEXED_KINDS)
+        rows = con.execute(
+            f"SELECT kind, title, body, row_table, row_id FROM search WHERE kind IN ({marks}) ORDER BY rowid",
+            INDEXED_KINDS,
+        ).fetchall()
+        duplicates = con.execute("""SELECT sections.id, sections.canonical_id, sections.title, documents.name FROM sections
+                                    JOIN documents ON documents.id = sections.document_id
+                                    WHERE sections.canonical_id IS NOT NULL ORDER BY sections.id""").fetchall()
+    finally:
+        con.close()
+    documents = []
+    canonical_sections = {}
+    for kind, title, body, table, row_id in rows:
+        file, source, url = metadata.get((table, row_id), (None, None, None))
+        document = {
+            "kind": kind, "title": title, "text": body, "file": file, "source": source, "url": url,
+            "table": table, "row_id": row_id,
+        }
+        if table == "sections":
+            canonical_sections[row_id] = document
+        documents.append(document)
+    for row_id, canonical_id, title, file in duplicates:
+        if canonical_id in canonical_sections:
+            canonical_sections[canonical_id].setdefault("duplicates", []).append(
+                {"file": file, "title": title, "row_id": row_id}
+            )
+    return documents
+
+def build_index(documents, k1=K1, b=B):
+    """Return (header, arrays) for documents: the BM25 postings and what search.py needs to show results."""
+    # Titles count as part of the text, so a section titled "Lamotrigine" matches it.
+    # The words seen for each term are kept so search.py can find them again for highlights.
+    term_counts = []
+    forms = {}
+    for doc in documents:
+        text = f"{doc['title'] or ''}\n{doc['text']}"
+        counts = Counter()
+        for start, end, term in token_spans(text):
+            counts[term] += 1
+            forms.setdefault(term, set()).add(text[start:end].lower())
+        term_counts.append(counts)
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    postings = {}
+    for doc_id, counts in enumerate(term_counts):
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    offsets = new_array("uint32", [0])
+    doc_ids = new_array("uint32")
+    weights = new_array("float32")
+    count = len(documents)
+    for term in terms:
+        entries = postings[term]
+        # The "+ 1" idf (as in Lucene) stays positive for terms in most documents
+        idf = math.log((count - len(entries) + 0.5) / (len(entries) + 0.5) + 1)
+        for doc_id, tf in entries:
+            norm = k1 * (1 - b + b * lengths[doc_id] / average_length) if average_length else k1
+            doc_ids.append(doc_id)
+            weights.append(idf * tf * (k1 + 1) / (tf + norm))
+        offsets.append(len(doc_ids))
+
+    arrays = {"offsets": ("uint32", offsets), "doc_ids": ("uint32", doc_ids), "weights": ("float32", weights)}
+    header = {
+        "format_version": FORMAT_VERSION,
+        "k1": k1,
+        "b": b,
+        "document_count": count,
+        "average_length": average_length,
+        "terms": terms,
+        "forms": [sorted(forms[term]) for term in terms],
+        "documents": [
+            {key: doc[key] for key in ("kind", "title", "file", "source", "url", "table", "row_id", "duplicates") if key in doc}
+            for doc in documents
+        ],
+        "texts": [doc["text"] for doc in documents],
+    }
+    return header, arrays
+
+def write_index(db_name="knowledge.db", name=INDEX_NAME):
+    """Index knowledge.db and write the index unless it is unchanged; returns (documents, terms)."""
+    documents = load_documents(os.path.join(OUTPUT_DIR, db_name))
+    header, arrays = build_index(documents)
+    write_output(name, pack(MAGIC, header, arrays))
+    return len(documents), len(header["terms"])
+
+if __name__ == "__main__":
+    # python3 search_index.py   (after knowledge_db.py)
+    db_path = output_path("knowledge.db")
+    if not os.path.exists(db_path):
+        sys.exit("❌ knowledge.db not found; run knowledge_db.py first")
+    print(f"🔎 Indexing {db_path}...")
+    count, term_count = write_index()
+    print(f"💾 {count} documents, {term_count} terms saved to {INDEX_NAME}")
@@ -0,0 +1,143 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Tokenizing shared by the search index and its queries: words are split on
+# anything that is not a letter or digit, accents are dropped, and each word is
+# lowercased and Porter-stemmed (the stemmer knowledge.db's FTS5 table uses too)
+WORD = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+def normalize(word):
+    """Return a word lowercased and without accents."""
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+def tokens(text):
+    """Return the stemmed terms of text, stopwords left out."""
+    return [term for _, _, term in token_spans(text)]
+
+def token_spans(text):
+    """Yield (start, end, term) for each indexed word of text."""
+    for match in WORD.finditer(text):
+        word = normalize(match.group(0))
+        if word in STOPWORDS or (len(word) < 2 and not word.isdigit()):
+            continue
+        yield match.start(), match.end(), stem(word)
+
+# Porter (1980) stemmer
+
+def _is_consonant(word, i):
+    if word[i] in "aeiou":
+        return False
+    if word[i] == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+def _measure(stem):
+    """m in [C](VC)^m[V]: the number of vowel-consonant sequences."""
+    m = 0
+    previous_vowel = False
+    for i in range(len(stem)):
+        consonant = _is_consonant(stem, i)
+        if consonant and previous_vowel:
+            m += 1
+        previous_vowel = not consonant
+    return m
+
+def _has_vowel(stem):
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+def _ends_double_consonant(word):
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+def _ends_cvc(word):
+    """*o: consonant-vowel-consonant, the last consonant not w, x or y."""
+    return (len(word) >= 3 and _is_consonant(word, len(word) - 1) and not _is_consonant(word, len(word) - 2)
+            and _is_consonant(word, len(word) - 3) and word[-1] not in "wxy")
+
+# (suffix, replacement); the first suffix a word ends with is the only one tried
+STEP2 = [
+    ("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"), ("izer", "ize"),
+    ("abli", "able"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous"),
+    ("ization", "ize"), ("ation", "ate"), ("ator", "ate"), ("alism", "al"), ("iveness", "ive"),
+    ("fulness", "ful"), ("ousness", "ous"), ("aliti", "al"), ("iviti", "ive"), ("biliti", "ble"),
+]
+STEP3 = [
+    ("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"), ("ical", "ic"), ("ful", ""), ("ness", ""),
+]
+STEP4 = [
+    "al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement", "ment", "ent", "ion", "ou",
+    "ism", "ate", "iti", "ous", "ive", "ize",
+]
+
+def _replace(word, rules, min_measure):
+    for suffix, replacement in rules:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + replacement if _measure(stem) > min_measure else word
+    return word
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Return the Porter stem of a lowercase word."""
+    if len(word) <= 2 or not word.isalpha():
+        return word
+
+    # Step 1a: plurals
+    if word.endswith("sses") or word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+
+    # Step 1b: -eed, -ed, -ing
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif _ends_double_consonant(word) and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += "e"
+                break
+
+    # Step 1c: y -> i
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+
+    # Steps 2 and 3: double and single suffixes
+    word = _replace(word, STEP2, 0)
+    word = _replace(word, STEP3, 0)
+
+    # Step 4: remaining suffixes, where the stem is long enough
+    for suffix in sorted(STEP4, key=len, reverse=True):
+        if word.endswith(suffix):
+            stem_part = word[:-len(suffix)]
+            if suffix == "ion" and not stem_part.endswith(("s", "t")):
+                break
+            if _measure(stem_part) > 1:
+                word = stem_part
+            break
+
+    # Step 5: final -e and -ll
+    if word.endswith("e"):
+        stem_part = word[:-1]
+        m = _measure(stem_part)
+        if m > 1 or (m == 1 and not _ends_cvc(stem_part)):
+            word = stem_part
+    if word.endswith("ll") and _measure(word) > 1:
+        word = word[:-1]
+    return word
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from outputs import OUTPUT_DIR, output_path, write_json
+from search_text import WORD, normalize
+
+# Near-duplicate sections across all outputs: the same page scraped by two
+# extractors, a list section repeating its heading section, a dataset repeating
+# itself under another title. Each section's word shingles get a MinHash
+# signature; signatures are cut into LSH bands, and only sections sharing a band
+# are compared, instead of every pair of sections.
+# Sections whose shingle sets really are SIMILARITY_THRESHOLD alike (Jaccard) to
+# a cluster's canonical section are its duplicates. knowledge_db.py clusters the
+# sections as it builds knowledge.db and keeps one copy of each; this stage
+# exports those clusters for consumers of the JSON outputs.
+DUPLICATES_NAME = "section_duplicates.json"
+SCHEMA_VERSION = 2
+DB_NAME = "knowledge.db"
+HASH_CHUNK_SIZE = 1024 * 1024
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.8
+# The bins of one-permutation hashing take the low bits of a shingle hash, so the
+# value kept per bin is below 2**64 // NUM_PERM; OFFSET marks borrowed values
+OFFSET = 1 << 64
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Return the set of hashed word size-grams of text (the whole text if it is shorter)."""
+    words = WORD.findall(normalize(text))
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little") for gram in grams}
+
+def minhash(hashes, num_perm=NUM_PERM):
+    """Return the MinHash signature of a set of shingle hashes.
+
+    One-permutation hashing: each hash goes to bin hash % num_perm and each bin
+    keeps its minimum, so a signature costs one pass over the shingles instead
+    of num_perm. An empty bin borrows the value of the next non-empty bin to its
+    right, offset by the distance (densification by rotation), which keeps the
+    chance of two signatures agreeing in a bin equal to their Jaccard similarity.
+    """
+    bins = [None] * num_perm
+    for h in hashes:
+        slot, value = h % num_perm, h // num_perm
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    if not hashes:
+        return tuple(bins)
+    signature = []
+    for slot in range(num_perm):
+        distance = 0
+        while bins[(slot + distance) % num_perm] is None:
+            distance += 1
+        signature.append(bins[(slot + distance) % num_perm] + distance * OFFSET)
+    return tuple(signature)
+
+def jaccard(first, second):
+    """Return the Jaccard similarity of two sets."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_clusters(sections, threshold=SIMILARITY_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    """Return clusters of near-duplicate sections as lists of (index, similarity to the canonical), canonical first."""
+    rows = num_perm // bands
+    shingle_sets = [shingles(section["content"]) for section in sections]
+    buckets = {}
+    for i, hashes in enumerate(shingle_sets):
+        signature = minhash(hashes, num_perm)
+        for band in range(bands):
+            buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(i)
+
+    # Union-find over the verified pairs. Every pair in a bucket is a candidate,
+    # since two members can be alike without either being like the first one;
+    # a pair sharing several bands is only compared once.
+    parent = list(range(len(sections)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    compared = set()
+    for members in buckets.values():
+        for a, first in enumerate(members):
+            for other in members[a + 1:]:
+                if (first, other) in compared or find(first) == find(other):
+                    continue
+                compared.add((first, other))
+                if jaccard(shingle_sets[first], shingle_sets[other]) >= threshold:
+                    parent[max(find(first), find(other))] = min(find(first), find(other))
+
+    groups = {}
+    for i in range(len(sections)):
+        groups.setdefault(find(i), []).append(i)
+    clusters = []
+    for members in groups.values():
+        # Chained pairs can join sections that are not alike themselves (A~B, B~C
+        # but not A~C); only those similar enough to the canonical are its
+        # duplicates, and the rest are clustered again among themselves
+        while len(members) > 1:
+            # The longest copy is the most complete one; ties go to the earliest section
+            canonical = min(members, key=lambda i: (-len(sections[i]["content"]), i))
+            duplicates = []
+            rest = []
+            for i in members:
+                if i == canonical:
+                    continue
+                similarity = jaccard(shingle_sets[canonical], shingle_sets[i])
+                if similarity >= threshold:
+                    duplicates.append((i, round(similarity, 4)))
+                else:
+                    rest.append(i)
+            if duplicates:
+                clusters.append([(canonical, 1.0)] + duplicates)
+            members = rest
+    return sorted(clusters, key=lambda cluster: cluster[0][0])
+
+def load_clusters(db_path):
+    """Return (section count, clusters) for the clusters knowledge.db was built with.
+
+    Clusters are (canonical section, [duplicate sections]) pairs, in id order.
+    """
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = con.execute("""SELECT sections.id, documents.name, sections.title, length(sections.content),
+                                     sections.canonical_id, sections.similarity FROM sections
+                              JOIN documents ON documents.id = sections.document_id ORDER BY sections.id""").fetchall()
+    finally:
+        con.close()
+    sections = {}
+    duplicates = {}
+    for row_id, file, title, length, canonical_id, similarity in rows:
+        sections[row_id] = {"section_id": row_id, "file": file, "title": title, "length": length}
+        if canonical_id is not None:
+            duplicates.setdefault(canonical_id, []).append(
+                {"section_id": row_id, "file": file, "title": title, "similarity": similarity})
+    return len(rows), [(sections[canonical_id], members) for canonical_id, members in sorted(duplicates.items())]
+
+def build_duplicates(db_path):
+    """Return the duplicates document for a knowledge.db: one record per cluster, the canonical section and its duplicates."""
+    section_count, clusters = load_clusters(db_path)
+    return {
+        "source": "Near-Duplicate Sections",
+        "description": "Sections repeated across the outputs, each cluster with a canonical section and back-references",
+        "schema_version": SCHEMA_VERSION,
+        # Section ids are knowledge.db row ids, so they only hold for this database
+        "database": {"name": os.path.basename(db_path), "sha256": file_sha256(db_path)},
+        "parameters": {"shingle_size": SHINGLE_SIZE, "num_perm": NUM_PERM, "bands": BANDS, "threshold": SIMILARITY_THRESHOLD},
+        "section_count": section_count,
+        "duplicate_count": sum(len(duplicates) for _, duplicates in clusters),
+        "clusters": [{"canonical": canonical, "duplicates": duplicates} for canonical, duplicates in clusters],
+    }
+
+def write_duplicates(db_name=DB_NAME, name=DUPLICATES_NAME):
+    """Export the duplicate sections of knowledge.db and write them unless unchanged; returns (sections, duplicates)."""
+    data = build_duplicates(os.path.join(OUTPUT_DIR, db_name))
+    write_json(name, data)
+    return data["section_count"], data["duplicate_count"]
+
+def load_duplicates(base_dir=OUTPUT_DIR, db_name=DB_NAME):
+    """Return {duplicate section id: canonical section id}, empty if the duplicates haven't been exported.
+
+    A file exported from another build of knowledge.db is ignored: its section
+    ids would point at the wrong rows.
+    """
+    try:
+        with open(os.path.join(base_dir, DUPLICATES_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError:
+        print(f"⚠️ {DUPLICATES_NAME} not found; duplicate sections are kept")
+        return {}
+    if data["schema_version"] != SCHEMA_VERSION:
+        raise ValueError(f"section duplicates schema {data['schema_version']}, expected {SCHEMA_VERSION}; rebuild them")
+    db_path = os.path.join(base_dir, db_name)
+    if not os.path.exists(db_path) or data["database"]["sha256"] != file_sha256(db_path):
+        print(f"⚠️ {DUPLICATES_NAME} was exported from another {db_name}; ignoring it (rerun section_dedup.py)")
+        return {}
+    return {
+        duplicate["section_id"]: cluster["canonical"]["section_id"]
+        for cluster in data["clusters"] for duplicate in cluster["duplicates"]
+    }
+
+if __name__ == "__main__":
+    # python3 section_dedup.py   (after knowledge_db.py)
+    db_path = output_path(DB_NAME)
+    if not os.path.exists(db_path):
+        sys.exit("❌ knowledge.db not found; run knowledge_db.py first")
+    print(f"🧬 Exporting the near-duplicate sections of {db_path}...")
+    count, duplicate_count = write_duplicates()
+    print(f"💾 {duplicate_count} of {count} sections are near-duplicates; clusters saved to {DUPLICATES_NAME}")
@@ -0,0 +1,101 @@
+HEADING_TAGS = ["h1", "h2", "h3", "h4"]
+ALL_HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+CONTENT_TAGS = ["p", "ul", "ol", "div"]
+LIST_TAGS = ["ul", "ol"]
+
+def find_main_content(soup):
+    """Return the page's main content element, falling back to the whole document."""
+    return soup.find("main") or soup.find("article") or soup.find("div", class_="content") or soup
+
+def extract_sections(root, heading_tags=HEADING_TAGS, content_tags=CONTENT_TAGS,
+                     min_title_length=1, min_text_length=10, keywords=None,
+                     title_keywords=None, separator="", keep_empty=False):
+    """Build heading -> content sections in one linear walk over the document.
+
+    Each heading owns the sibling elements that follow it until the next sibling
+    heading, exactly like walking find_next_siblings() per heading, but every
+    parent's children are visited once and every block's text is computed once.
+
+    min_title_length / min_text_length: drop titles shorter than, and texts not
+        longer than, these lengths; None keeps everything, even empty strings.
+    keywords: KeywordMatcher; keep only content blocks it matches.
+    title_keywords: KeywordMatcher; keep only sections whose title it matches.
+    keep_empty: also emit sections that ended up with no content.
+    """
+    headings = root.find_all(heading_tags)
+    heading_tags = set(heading_tags)
+    content_tags = set(content_tags)
+
+    # Walk each heading-bearing parent once, assigning blocks to the latest heading
+    blocks = {}
+    walked = set()
+    for heading in headings:
+        parent = heading.parent
+        if id(parent) in walked:
+            continue
+        walked.add(id(parent))
+        current = None
+        for child in parent.children:
+            name = child.name
+            if name in heading_tags:
+                current = blocks.setdefault(id(child), [])
+            elif current is not None and name in content_tags:
+                text = child.get_text(separator, strip=True)
+                if min_text_length is not None and not (text and len(text) > min_text_length):
+                    continue
+                if keywords is not None and not keywords.search(text):
+                    continue
+                current.append(text)
+
+    sections = []
+    for heading in headings:
+        title = heading.get_text(strip=True)
+        if min_title_length is not None and (not title or len(title) < min_title_length):
+            continue
+        content = blocks.get(id(heading), [])
+        if not content and not keep_empty:
+            continue
+        if title_keywords is not None and not title_keywords.search(title):
+            continue
+        sections.append({
+            "title": title,
+            "content": content
+        })
+    return sections
+
+def extract_lists(root, title_template, min_item_length=10, min_items=2, keywords=None):
+    """Return one section per ul/ol with at least min_items items longer than min_item_length.
+
+    Sections are titled title_template.format(n), where n counts every list on
+    the page, so numbering matches the list's position even when lists are skipped.
+    keywords is an optional KeywordMatcher that every kept item must match.
+    """
+    item_texts = {}
+    sections = []
+    for i, list_elem in enumerate(root.find_all(LIST_TAGS)):
+        items = []
+        for li in list_elem.find_all("li"):
+            # Nested list items appear under every enclosing list; extract them once
+            item_text = item_texts.get(id(li))
+            if item_text is None:
+                item_text = item_texts[id(li)] = li.get_text(strip=True)
+            if item_text and len(item_text) > min_item_length:
+                if keywords is None or keywords.search(item_text):
+                    items.append(item_text)
+
+        if items and len(items) >= min_items:
+            sections.append({
+                "title": title_template.format(i + 1),
+                "content": items
+            })
+    return sections
+
+def extract_links(root, keywords):
+    """Return (text, href) for links whose text or href the KeywordMatcher matches."""
+    links = []
+    for link in root.find_all("a", href=True):
+        link_text = link.get_text(strip=True)
+        href = link.get("href", "")
+        if keywords.search(link_text) or keywords.search(href):
+            links.append((link_text, href))
+    return links
@@ -0,0 +1,196 @@
+import glob
+import io
+import os
+import re
+import zipfile
+from lxml import etree
+
+# SPL (Structured Product Labeling) documents are HL7 v3 XML
+HL7_NS = "urn:hl7-org:v3"
+SECTION_TAG = f"{{{HL7_NS}}}section"
+CODE_TAG = f"{{{HL7_NS}}}code"
+TITLE_TAG = f"{{{HL7_NS}}}title"
+BLOCK_TAGS = {f"{{{HL7_NS}}}{name}" for name in ("paragraph", "item", "tr")}
+
+# LOINC section codes -> output key
+SECTION_KINDS = {
+    "42228-7": "pregnancy",               # 8.1 Pregnancy
+    "77290-5": "lactation",               # 8.2 Lactation
+    "77291-3": "reproductive_potential",  # 8.3 Females and Males of Reproductive Potential
+    "34080-2": "lactation",               # Nursing Mothers, in labels predating the 2015 PLLR format
+}
+# ingredient classCodes marking active ingredients (basis of strength, moiety, reference)
+ACTIVE_INGREDIENT_CLASSES = {"ACTIB", "ACTIM", "ACTIR"}
+# SPL product data elements section (lists the products and their ingredients)
+PRODUCT_DATA_CODE = "48780-1"
+NDC_CODE_SYSTEM = "2.16.840.1.113883.6.69"
+
+def section_code(section):
+    """Return the LOINC code of a section element, or None."""
+    code = section.find(CODE_TAG)
+    return code.get("code") if code is not None else None
+
+def clean_text(text):
+    """Collapse whitespace the way labels are displayed."""
+    return re.sub(r"\s+", " ", text).strip()
+
+def section_content(section):
+    """Return the text blocks (paragraphs, list items, table rows) of a section and its subsections.
+
+    Subsection titles become their own blocks so "Risk Summary" etc. stay visible.
+    """
+    own_title = section.find(TITLE_TAG)
+    blocks = []
+    for elem in section.iter(TITLE_TAG, *BLOCK_TAGS):
+        if elem is own_title:
+            continue
+        # Blocks nested in another block (a list inside a list item) are part of the outer block's text
+        if next(elem.iterancestors(*BLOCK_TAGS), None) is not None:
+            continue
+        if elem.tag == f"{{{HL7_NS}}}tr":
+            text = " | ".join(clean_text("".join(cell.itertext())) for cell in elem)
+        else:
+            text = clean_text("".join(elem.itertext()))
+        if text:
+            blocks.append(text)
+    return blocks
+
+def _clear(elem):
+    """Free an element and the already-parsed siblings before it and its <component> wrapper."""
+    elem.clear()
+    node = elem
+    for _ in range(2):
+        parent = node.getparent()
+        if parent is None:
+            break
+        while node.getprevious() is not None:
+            del parent[0]
+        node = parent
+
+def parse_spl(source, keep=None):
+    """Stream one SPL document and return its metadata and pregnancy/lactation sections.
+
+    source is a path or a binary file object. Sections are cleared as soon as
+    they are handled, so memory stays flat however long the label is.
+    keep(label) is called once the product data section (with the active
+    ingredients) has been read; if it returns False parsing stops and None is returned.
+    Returns {"set_id", "version", "title", "effective_time", "manufacturer",
+    "active_ingredients", "ndc", "sections": {kind: {"title", "content"}}}.
+    """
+    label = {
+        "set_id": "",
+        "version": "",
+        "title": "",
+        "effective_time": "",
+        "manufacturer": "",
+        "active_ingredients": [],
+        "ndc": [],
+        "sections": {}
+    }
+    tags = [SECTION_TAG] + [f"{{{HL7_NS}}}{name}" for name in (
+        "setId", "versionNumber", "title", "effectiveTime", "name", "code")]
+    for _, elem in etree.iterparse(source, events=("end",), tag=tags, huge_tree=True, remove_comments=True):
+        tag = etree.QName(elem).localname
+        parent = elem.getparent()
+        parent_tag = etree.QName(parent).localname if parent is not None else None
+
+        if tag == "section":
+            if any(SECTION_KINDS.get(section_code(a)) for a in elem.iterancestors(SECTION_TAG)):
+                # Subsection of a wanted section that is still being parsed
+                continue
+            code = section_code(elem)
+            if code == PRODUCT_DATA_CODE and keep is not None and not keep(label):
+                return None
+            kind = SECTION_KINDS.get(code)
+            if kind and kind not in label["sections"]:
+                title = elem.find(TITLE_TAG)
+                label["sections"][kind] = {
+                    "title": clean_text("".join(title.itertext())) if title is not None else "",
+                    "content": section_content(elem)
+                }
+            _clear(elem)
+        elif parent_tag == "document":
+            if tag == "setId":
+                label["set_id"] = elem.get("root", "")
+            elif tag == "versionNumber":
+                label["version"] = elem.get("value", "")
+            elif tag == "title":
+                label["title"] = clean_text("".join(elem.itertext()))
+            elif tag == "effectiveTime":
+                label["effective_time"] = elem.get("value", "")
+        elif tag == "code" and parent_tag == "containerPackagedProduct":
+            if elem.get("codeSystem") == NDC_CODE_SYSTEM and elem.get("code") and elem.get("code") not in label["ndc"]:
+                label["ndc"].append(elem.get("code"))
+        elif tag == "name" and parent_tag == "representedOrganization" and not label["manufacturer"]:
+            label["manufacturer"] = clean_text(elem.text or "")
+        elif tag == "name" and parent_tag == "ingredientSubstance":
+            ingredient = parent.getparent()
+            if ingredient is not None and ingredient.get("classCode") in ACTIVE_INGREDIENT_CLASSES:
+                name = clean_text(elem.text or "")
+                if name and name not in label["active_ingredients"]:
+                    label["active_ingredients"].append(name)
+    return label
+
+def iter_spl_files(path):
+    """Yield (name, binary file object) for every SPL XML under a file, directory or zip archive.
+
+    DailyMed bulk releases are zips of per-label zips; members are streamed
+    straight out of the archives without extracting anything to disk.
+    """
+    if os.path.isdir(path):
+        for file_path in sorted(glob.glob(os.path.join(path, "**", "*"), recursive=True)):
+            if file_path.lower().endswith((".xml", ".zip")):
+                yield from iter_spl_files(file_path)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            yield from _iter_zip(archive, os.path.basename(path))
+    elif path.lower().endswith(".xml"):
+        with open(path, "rb") as f:
+            yield path, f
+
+def _iter_zip(archive, archive_name):
+    """Yield the SPL XML members of an open zip, descending into nested zips."""
+    for info in archive.infolist():
+        name = info.filename
+        if name.lower().endswith(".xml"):
+            with archive.open(info) as member:
+                yield f"{archive_name}/{name}", member
+        elif name.lower().endswith(".zip"):
+            with archive.open(info) as member:
+                # ZipFile needs a seekable file; nested label zips are small, so buffer each one
+                with zipfile.ZipFile(io.BytesIO(member.read())) as nested:
+                    yield from _iter_zip(nested, f"{archive_name}/{name}")
+
+def iter_spl_blobs(path):
+    """Yield (name, data, is_zip) for every SPL XML or per-label zip under a path, without parsing.
+
+    Used to hand labels to parser processes: only the raw member bytes are
+    read here, decompressing nested label zips is left to blob_documents.
+    """
+    if os.path.isdir(path):
+        for file_path in sorted(glob.glob(os.path.join(path, "**", "*"), recursive=True)):
+            if file_path.lower().endswith((".xml", ".zip")):
+                yield from iter_spl_blobs(file_path)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                name = info.filename.lower()
+                if name.endswith((".xml", ".zip")):
+                    yield f"{os.path.basename(path)}/{info.filename}", archive.read(info), name.endswith(".zip")
+    elif path.lower().endswith(".xml"):
+        with open(path, "rb") as f:
+            yield path, f.read(), False
+
+def blob_documents(name, data, is_zip):
+    """Yield (name, xml_bytes) for the SPL document(s) in one blob from iter_spl_blobs."""
+    if not is_zip:
+        yield name, data
+        return
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for member_name, member in _iter_zip(archive, name):
+            yield member_name, member.read()
+
+def parse_spl_path(path):
+    """Parse every SPL document under a path, yielding (name, label)."""
+    for name, f in iter_spl_files(path):
+        yield name, parse_spl(f)
@@ -0,0 +1,293 @@
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import time
+from outputs import OUTPUT_DIR, output_path, write_output
+from medication_ids import load_or_build_ids
+from packed import new_array, pack, unpack
+from search_text import WORD, normalize
+
+# Type-ahead over the glossary terms and the medication generic and brand names,
+# packed into one trie file (see packed.py). Nodes are numbered breadth-first, so
+# the children of node i are the nodes first_child[i]:first_child[i + 1], sorted
+# by label, and node i ends the keys of the entries entry_ids[entry_offsets[i]:entry_offsets[i + 1]].
+# Every word start of an entry is a key of its own, so "seiz" completes "Absence
+# Seizure" too. best[i] is the highest entry weight below node i, which lets a
+# prefix query visit the best completions first and stop after k.
+TRIE_NAME = "term_trie.bin"
+MAGIC = b"TERMTRI1"
+FORMAT_VERSION = 1
+GLOSSARY_NAME = "medical_terms_glossary.json"
+
+def term_key(text):
+    """Return the lookup key of a term: lowercase words without accents or punctuation."""
+    return " ".join(WORD.findall(normalize(text)))
+
+def load_entries(base_dir=OUTPUT_DIR):
+    """Return the terms to index: [{"text", "key", "kinds", "canonical"}], one per key.
+
+    Glossary terms and generic names are their own canonical entry; full forms
+    ("Anti-Epileptic Drug"), brand names and the other names in medication_ids.json
+    point at the term or generic they stand for by its key.
+    """
+    entries = {}
+
+    def add(text, kind, canonical=None):
+        key = term_key(text)
+        if not key:
+            return
+        entry = entries.setdefault(key, {"text": text.strip(), "key": key, "kinds": [], "canonical": None})
+        if kind not in entry["kinds"]:
+            entry["kinds"].append(kind)
+        canonical = term_key(canonical) if canonical else None
+        if canonical and canonical != key and entry["canonical"] is None:
+            entry["canonical"] = canonical
+
+    def read_json(name):
+        try:
+            with open(os.path.join(base_dir, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            return {}
+
+    ids = load_or_build_ids(base_dir)
+    for medication in ids.medications.values():
+        add(medication["name"], "medication")
+        for brand in medication["brand_names"]:
+            add(brand, "brand_name", canonical=medication["name"])
+        for name in medication["other_names"]:
+            add(name, "other_name", canonical=medication["name"])
+    for term in read_json(GLOSSARY_NAME).get("terms", []):
+        add(term["term"], "glossary_term")
+        if term.get("full_form"):
+            add(term["full_form"], "full_form", canonical=term["term"])
+
+    # A brand name that is also a glossary term keeps pointing at its generic,
+    # but an alias whose target was never indexed would lead nowhere
+    for entry in entries.values():
+        if entry["canonical"] not in entries:
+            entry["canonical"] = None
+    return sorted(entries.values(), key=lambda entry: entry["key"])
+
+def term_weights(entries, db_path):
+    """Return how many knowledge.db search rows mention each entry, or zeros without the database."""
+    if not os.path.exists(db_path):
+        print("⚠️ knowledge.db not found; terms will be ranked alphabetically")
+        return [0] * len(entries)
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        # A quoted FTS5 string is a phrase query; quotes inside it are doubled
+        return [
+            con.execute("SELECT count(*) FROM search WHERE search MATCH ?", ('"' + entry["key"].replace('"', '""') + '"',)).fetchone()[0]
+            for entry in entries
+        ]
+    finally:
+        con.close()
+
+def build_trie(entries, weights):
+    """Return (header, arrays) for the trie over entries."""
+    # Build a dict trie first: {"children": {char: node}, "entries": [entry ids]}
+    root = {"children": {}, "entries": []}
+    for entry_id, entry in enumerate(entries):
+        words = entry["key"].split(" ")
+        for i in range(len(words)):
+            node = root
+            for char in " ".join(words[i:]):
+                node = node["children"].setdefault(char, {"children": {}, "entries": []})
+            node["entries"].append(entry_id)
+
+    # Then number the nodes breadth-first so each node's children are contiguous
+    nodes = [root]
+    labels = [0]
+    for node in nodes:
+        for char in sorted(node["children"]):
+            nodes.append(node["children"][char])
+            labels.append(ord(char))
+    first_child = new_array("uint32")
+    entry_offsets = new_array("uint32", [0])
+    entry_ids = new_array("uint32")
+    child_count = 1
+    for node in nodes:
+        first_child.append(child_count)
+        child_count += len(node["children"])
+        # Best entry first, so a node's own entries come out in rank order
+        entry_ids.extend(sorted(node["entries"], key=lambda entry_id: (-weights[entry_id], entry_id)))
+        entry_offsets.append(len(entry_ids))
+    first_child.append(child_count)
+
+    best = new_array("uint32", [0] * len(nodes))
+    for i in range(len(nodes) - 1, -1, -1):
+        node_best = max((weights[e] for e in entry_ids[entry_offsets[i]:entry_offsets[i + 1]]), default=0)
+        children = range(first_child[i], first_child[i + 1])
+        best[i] = max([node_best] + [best[child] for child in children])
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "entries": [dict(entry, weight=weight) for entry, weight in zip(entries, weights)],
+    }
+    arrays = {
+        "first_child": ("uint32", first_child),
+        "labels": ("uint32", new_array("uint32", labels)),
+        "entry_offsets": ("uint32", entry_offsets),
+        "entry_ids": ("uint32", entry_ids),
+        "best": ("uint32", best),
+    }
+    return header, arrays
+
+def write_trie(name=TRIE_NAME):
+    """Build the trie from the glossary and medication outputs and write it unless unchanged; returns (entries, nodes)."""
+    entries = load_entries()
+    weights = term_weights(entries, os.path.join(OUTPUT_DIR, "knowledge.db"))
+    header, arrays = build_trie(entries, weights)
+    write_output(name, pack(MAGIC, header, arrays))
+    return len(entries), len(arrays["labels"][1])
+
+class TermTrie:
+    """A term trie written by write_trie(), held in memory for lookups.
+
+        trie = TermTrie.load()
+        trie.complete("lam")         # prefix matches, most mentioned first
+        trie.fuzzy("lamotrigen")     # within 2 edits (a swap of neighbours counts as one)
+        trie.resolve("Depakote")     # the canonical entry, with all its aliases
+    """
+
+    def __init__(self, header, arrays):
+        self.entries = header["entries"]
+        self.first_child = arrays["first_child"]
+        self.labels = arrays["labels"]
+        self.entry_offsets = arrays["entry_offsets"]
+        self.entry_ids = arrays["entry_ids"]
+        self.best = arrays["best"]
+        self.by_key = {entry["key"]: i for i, entry in enumerate(self.entries)}
+        self.aliases = {}
+        for entry in self.entries:
+            if entry["canonical"]:
+                self.aliases.setdefault(entry["canonical"], []).append(entry["text"])
+
+    @classmethod
+    def load(cls, path=None):
+        """Read a trie file (term_trie.bin in the output root by default)."""
+        with open(path or output_path(TRIE_NAME), "rb") as f:
+            header, arrays = unpack(f.read(), MAGIC)
+        if header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"term trie format {header['format_version']}, expected {FORMAT_VERSION}; rebuild it")
+        return cls(header, arrays)
+
+    def child(self, node, char):
+        """Return the child of node labelled char, or None (binary search over the sorted labels)."""
+        low, high = self.first_child[node], self.first_child[node + 1]
+        code = ord(char)
+        while low < high:
+            middle = (low + high) // 2
+            if self.labels[middle] < code:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.first_child[node + 1] and self.labels[low] == code else None
+
+    def node_entries(self, node):
+        return self.entry_ids[self.entry_offsets[node]:self.entry_offsets[node + 1]]
+
+    def result(self, entry_id, **extra):
+        """Return an entry as a result dict, with the text of its canonical entry if it is an alias."""
+        entry = self.entries[entry_id]
+        canonical = self.by_key.get(entry["canonical"]) if entry["canonical"] else None
+        return dict(
+            text=entry["text"], kinds=entry["kinds"], weight=entry["weight"],
+            canonical=self.entries[canonical]["text"] if canonical is not None else None, **extra
+        )
+
+    def complete(self, prefix, k=10):
+        """Return up to k entries with a word starting with prefix, most mentioned first."""
+        node = 0
+        for char in term_key(prefix) if prefix.strip() else "":
+            node = self.child(node, char)
+            if node is None:
+                return []
+        # Best-first over the subtree: a node is expanded only while it can still
+        # hold something better than the results found so far
+        heap = [(-self.best[node], 1, node)]
+        seen = set()
+        results = []
+        while heap and len(results) < k:
+            weight, is_node, item = heapq.heappop(heap)
+            if not is_node:
+                if item not in seen:
+                    seen.add(item)
+                    results.append(self.result(item))
+                continue
+            for entry_id in self.node_entries(item):
+                heapq.heappush(heap, (-self.entries[entry_id]["weight"], 0, entry_id))
+            for child in range(self.first_child[item], self.first_child[item + 1]):
+                heapq.heappush(heap, (-self.best[child], 1, child))
+        return results
+
+    def fuzzy(self, query, max_distance=2, k=10):
+        """Return up to k entries whose key (or a word-start suffix of it) is within max_distance edits of query.
+
+        Edits are insertions, deletions, substitutions and swaps of neighbouring
+        characters. Results are ordered by distance, then weight.
+        """
+        target = term_key(query)
+        if not target:
+            return []
+        found = {}
+        first_row = list(range(len(target) + 1))
+        # Depth-first with one row of the edit-distance table per node
+        stack = [(child, first_row, None, None) for child in self._children(0)]
+        while stack:
+            node, previous_row, before_previous_row, previous_char = stack.pop()
+            char = chr(self.labels[node])
+            row = [previous_row[0] + 1]
+            for i in range(1, len(target) + 1):
+                cost = 0 if target[i - 1] == char else 1
+                value = min(row[i - 1] + 1, previous_row[i] + 1, previous_row[i - 1] + cost)
+                if (before_previous_row is not None and i > 1 and target[i - 1] == previous_char
+                        and target[i - 2] == char):
+                    value = min(value, before_previous_row[i - 2] + 1)
+                row.append(value)
+            if row[-1] <= max_distance:
+                for entry_id in self.node_entries(node):
+                    if row[-1] < found.get(entry_id, max_distance + 1):
+                        found[entry_id] = row[-1]
+            if min(row) <= max_distance:
+                stack.extend((child, row, previous_row, char) for child in self._children(node))
+        ranked = sorted(found.items(), key=lambda item: (item[1], -self.entries[item[0]]["weight"], item[0]))
+        return [self.result(entry_id, distance=distance) for entry_id, distance in ranked[:k]]
+
+    def _children(self, node):
+        return range(self.first_child[node], self.first_child[node + 1])
+
+    def resolve(self, name):
+        """Return the canonical entry for a term, generic or brand name, with its aliases; None if unknown."""
+        entry_id = self.by_key.get(term_key(name))
+        if entry_id is None:
+            return None
+        entry = self.entries[entry_id]
+        if entry["canonical"]:
+            entry_id = self.by_key[entry["canonical"]]
+            entry = self.entries[entry_id]
+        return dict(self.result(entry_id), aliases=self.aliases.get(entry["key"], []))
+
+if __name__ == "__main__":
+    # python3 term_trie.py                             build term_trie.bin
+    # python3 term_trie.py complete|fuzzy|resolve TEXT look TEXT up in it
+    args = sys.argv[1:]
+    if not args:
+        print(f"🌳 Building {TRIE_NAME} from the glossary and medication names...")
+        count, node_count = write_trie()
+        print(f"💾 {count} terms in {node_count} trie nodes saved to {TRIE_NAME}")
+        sys.exit(0)
+    if len(args) < 2 or args[0] not in ("complete", "fuzzy", "resolve"):
+        sys.exit("Usage: python3 term_trie.py [complete|fuzzy|resolve TEXT]")
+
+    trie = TermTrie.load()
+    started = time.perf_counter()
+    found = getattr(trie, args[0])(" ".join(args[1:]))
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🔎 {args[0]} in {elapsed:.3f} ms")
+    for result in found if isinstance(found, list) else [found]:
+        print(f"  {result}")
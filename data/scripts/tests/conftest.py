@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The scripts import each other as top-level modules, the way they run from data/scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Parse inline: no parser processes to start or leave behind
+os.environ["EXTRACT_PARSE_WORKERS"] = "0"
+os.environ.pop("EXTRACT_FIXTURES", None)
@@ -0,0 +1,39 @@
+import requests
+from requests.structures import CaseInsensitiveDict
+
+class FakeResponse:
+    """The parts of a requests.Response the scripts use, for a canned reply."""
+
+    def __init__(self, status_code=200, content=b"", headers=None, fail_after=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        # Raise a dropped connection after this many bytes of the body
+        self.fail_after = fail_after
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def iter_content(self, chunk_size=1):
+        body = self.content if self.fail_after is None else self.content[:self.fail_after]
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+        if self.fail_after is not None:
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+
+    def close(self):
+        self.closed = True
+
+class FakeFetch:
+    """Stands in for http_client.fetch: replies with respond(headers) and keeps each request's headers."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+
+    def __call__(self, url, params=None, accept=None, timeout=None, stream=False, extra_headers=None):
+        headers = dict(extra_headers or {})
+        self.requests.append(headers)
+        return self.respond(headers)
@@ -0,0 +1,61 @@
+import json
+import pytest
+import checkpoint
+from checkpoint import Checkpoint, journaled
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", str(tmp_path))
+    return tmp_path
+
+def crashed_run(results):
+    """Journal results without finishing, like a run that died."""
+    run = Checkpoint("extract")
+    for key, result in results.items():
+        run.record(key, result)
+    run._file.close()
+    return run.path
+
+def test_resume_reuses_journaled_results_and_retries_failures():
+    crashed_run({"https://a.example/": {"sections": ["a"]}})
+    calls = []
+
+    def worker(item):
+        calls.append(item["url"])
+        return None if item["url"].endswith("fail/") else {"sections": [item["url"]]}
+
+    run = Checkpoint("extract", resume=True)
+    work = journaled(worker, run)
+    items = [{"url": "https://a.example/"}, {"url": "https://b.example/"}, {"url": "https://b.example/fail/"}]
+    assert [work(item) for item in items] == [{"sections": ["a"]}, {"sections": ["https://b.example/"]}, None]
+    assert calls == ["https://b.example/", "https://b.example/fail/"]
+    # A failed source isn't journaled, so the next resume tries it again
+    run._file.close()
+    assert set(Checkpoint("extract", resume=True).results) == {"https://a.example/", "https://b.example/"}
+
+def test_resume_drops_a_line_cut_off_by_a_crash():
+    path = crashed_run({"a": 1, "b": 2})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "c", "resu')
+    run = Checkpoint("extract", resume=True)
+    assert run.results == {"a": 1, "b": 2}
+    # The journal is rewritten before appending, so the next record starts on a line of its own
+    run.record("d", 4)
+    run._file.close()
+    with open(path, "r", encoding="utf-8") as f:
+        assert [json.loads(line)["key"] for line in f] == ["a", "b", "d"]
+
+def test_fresh_run_ignores_an_old_journal():
+    crashed_run({"a": 1})
+    run = Checkpoint("extract")
+    assert "a" not in run and run.get("a") is None
+
+def test_finish_removes_the_journal(checkpoint_dir):
+    run = Checkpoint("extract")
+    run.record("a", 1)
+    run.finish()
+    assert not (checkpoint_dir / "extract.ndjson").exists()
+
+def test_without_checkpoint_worker_is_unchanged():
+    worker = lambda item: item
+    assert journaled(worker, None) is worker
@@ -0,0 +1,31 @@
+import io
+import os
+import zipfile
+import dailymed_client
+from fake_http import FakeResponse
+
+SAMPLE_ZIP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "dailymed_bulk_sample.zip")
+
+def sample_label_xml():
+    """The lamotrigine label XML inside the bulk sample."""
+    with zipfile.ZipFile(SAMPLE_ZIP) as archive:
+        inner = archive.read("prescription/20240115_fixture-lamotrigine-0001.zip")
+    with zipfile.ZipFile(io.BytesIO(inner)) as label:
+        return label.read(next(name for name in label.namelist() if name.endswith(".xml")))
+
+def test_spl_detail_is_one_request_with_the_label_ndcs(monkeypatch):
+    xml = sample_label_xml()
+    urls = []
+
+    def fetch(url, params=None, accept=None, timeout=None, stream=False, extra_headers=None):
+        urls.append(url)
+        response = FakeResponse(200, xml)
+        response.raw = io.BytesIO(xml)
+        return response
+    monkeypatch.setattr(dailymed_client, "fetch", fetch)
+
+    detail = dailymed_client.fetch_spl_detail("fixture-lamotrigine-0001")
+    assert urls == [f"{dailymed_client.DAILYMED_BASE_URL}/spls/fixture-lamotrigine-0001.xml"]
+    assert detail["ndc"] == ["00000-0001-01"]
+    assert detail["active_ingredients"] == ["LAMOTRIGINE"]
+    assert set(detail["sections"]) >= {"pregnancy", "lactation"}
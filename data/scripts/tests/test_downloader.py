@@ -0,0 +1,146 @@
+import hashlib
+import os
+import pytest
+import downloader
+import http_cache
+from downloader import DownloadError, download_file
+from fake_http import FakeFetch, FakeResponse
+
+URL = "https://example.org/label.zip"
+BODY = b"PK\x03\x04" + bytes(range(256)) * 40
+
+class RangeServer:
+    """A file server honouring Range, If-Range and If-None-Match, like a well-behaved origin."""
+
+    def __init__(self, content, etag='"v1"'):
+        self.content = content
+        self.etag = etag
+        # Drop the connection after this many body bytes, once
+        self.drop_after = None
+
+    def __call__(self, headers):
+        if headers.get("If-None-Match") == self.etag:
+            return FakeResponse(304, headers={"ETag": self.etag})
+        validators = {"ETag": self.etag}
+        range_header = headers.get("Range")
+        # If-Range: only serve the range if the file is still the one it names
+        if range_header and headers.get("If-Range", self.etag) == self.etag:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(self.content):
+                return FakeResponse(416)
+            body = self.content[start:]
+            return FakeResponse(206, body, dict(validators, **{
+                "Content-Range": f"bytes {start}-{len(self.content) - 1}/{len(self.content)}"}))
+        fail_after, self.drop_after = self.drop_after, None
+        return FakeResponse(200, self.content, dict(validators, **{"Content-Length": str(len(self.content))}),
+                            fail_after=fail_after)
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "http_cache"))
+    monkeypatch.setattr(downloader, "MIN_CHUNK_SIZE", 1024)
+
+def serve(monkeypatch, server):
+    fake = FakeFetch(server)
+    monkeypatch.setattr(downloader, "fetch", fake)
+    return fake
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_download_and_revalidate(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    fake = serve(monkeypatch, RangeServer(BODY))
+    result = download_file(URL, path, magic=b"PK\x03\x04")
+    assert read(path) == BODY
+    assert result["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert not result["not_modified"] and not result["resumed"]
+    assert not os.path.exists(path + ".part")
+
+    result = download_file(URL, path)
+    assert result["not_modified"]
+    assert fake.requests[-1]["If-None-Match"] == '"v1"'
+
+def test_local_copy_changed_is_downloaded_again(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    fake = serve(monkeypatch, RangeServer(BODY))
+    download_file(URL, path)
+    with open(path, "wb") as f:
+        f.write(b"edited")
+    result = download_file(URL, path)
+    assert read(path) == BODY and not result["not_modified"]
+    assert "If-None-Match" not in fake.requests[-1]
+
+def test_dropped_connection_resumes_with_range(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    server = RangeServer(BODY)
+    server.drop_after = 3000
+    fake = serve(monkeypatch, server)
+    result = download_file(URL, path, magic=b"PK\x03\x04", expected_sha256=hashlib.sha256(BODY).hexdigest())
+    assert read(path) == BODY
+    assert result["resumed"]
+    assert fake.requests[1]["Range"] == "bytes=3000-"
+    assert fake.requests[1]["If-Range"] == '"v1"'
+
+def test_file_changed_before_resume_starts_over(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    server = RangeServer(BODY)
+    server.drop_after = 3000
+    fake = serve(monkeypatch, server)
+    new_body = b"PK\x03\x04" + b"new version " * 500
+
+    # The file changes on the server while the connection is down
+    def drop_then_change(headers):
+        response = server(headers)
+        server.content, server.etag = new_body, '"v2"'
+        return response
+    fake.respond = drop_then_change
+    result = download_file(URL, path)
+    # If-Range no longer matches, so the server sent the whole new file instead of a range
+    assert fake.requests[1]["If-Range"] == '"v1"'
+    assert read(path) == new_body
+    assert result["sha256"] == hashlib.sha256(new_body).hexdigest()
+    assert not result["resumed"]
+
+def test_wrong_range_starts_over(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    server = RangeServer(BODY)
+    server.drop_after = 3000
+
+    def misplaced_range(headers):
+        response = server(headers)
+        if response.status_code == 206:
+            response.content = BODY
+            response.headers["Content-Range"] = f"bytes 0-{len(BODY) - 1}/{len(BODY)}"
+        return response
+    fake = serve(monkeypatch, misplaced_range)
+    download_file(URL, path)
+    assert read(path) == BODY
+    assert "Range" not in fake.requests[-1]
+
+def test_unsatisfiable_range_starts_over(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    # A leftover partial download as long as the file itself
+    with open(path + ".part", "wb") as f:
+        f.write(BODY)
+    downloader._save_part_meta(path + ".part.json", URL, FakeResponse(headers={"ETag": '"v1"'}))
+    fake = serve(monkeypatch, RangeServer(BODY))
+    download_file(URL, path)
+    assert read(path) == BODY
+    assert fake.requests[0]["Range"] == f"bytes={len(BODY)}-"
+    assert "Range" not in fake.requests[1]
+
+def test_bad_magic_is_rejected(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    serve(monkeypatch, RangeServer(b"<html>error page</html>"))
+    with pytest.raises(DownloadError):
+        download_file(URL, path, magic=b"PK\x03\x04")
+    assert not os.path.exists(path) and not os.path.exists(path + ".part")
+
+def test_checksum_mismatch_is_rejected(tmp_path, monkeypatch):
+    path = str(tmp_path / "label.zip")
+    serve(monkeypatch, RangeServer(BODY))
+    with pytest.raises(DownloadError):
+        download_file(URL, path, expected_sha256="0" * 64)
+    assert not os.path.exists(path) and not os.path.exists(path + ".part")
@@ -0,0 +1,38 @@
+import os
+from extract_dailymed_data import load_bulk_dailymed_data
+
+SAMPLE_ZIP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "dailymed_bulk_sample.zip")
+
+def test_bulk_sample_keeps_only_anti_seizure_labels():
+    data = load_bulk_dailymed_data([SAMPLE_ZIP])
+    by_set_id = {entry["set_id"]: entry for entry in data["medications"]}
+    # The ibuprofen label is skipped; divalproex is filed under valproic acid
+    assert sorted(by_set_id) == ["fixture-divalproex-0002", "fixture-lamotrigine-0001"]
+    assert by_set_id["fixture-lamotrigine-0001"]["medication_name"] == "lamotrigine"
+    assert by_set_id["fixture-divalproex-0002"]["medication_name"] == "valproic acid"
+
+def test_bulk_sample_entries_match_api_shape():
+    data = load_bulk_dailymed_data([SAMPLE_ZIP])
+    lamotrigine, divalproex = sorted(data["medications"], key=lambda entry: entry["set_id"], reverse=True)
+    assert lamotrigine == {
+        "medication_name": "lamotrigine",
+        "set_id": "fixture-lamotrigine-0001",
+        "spl_version": "1",
+        "drug_name": "LAMOTRIGINE tablets (fixture)",
+        "published_date": "Jan 15, 2024",
+        "manufacturer": "Fixture Pharma Inc.",
+        "active_ingredient": "LAMOTRIGINE",
+        "ndc": ["00000-0001-01"],
+        "pregnancy_category": "Not assigned (see pregnancy section)",
+        "pregnancy_info": "Fixture text: pregnancy section of a PLLR-format label.",
+        "lactation_info": "Fixture text: lactation section.",
+        "reproductive_potential_info": "Fixture text: contraception section.",
+    }
+    # Older labels state a letter category
+    assert divalproex["pregnancy_category"] == "Category D"
+    assert divalproex["published_date"] == "Mar 01, 2019"
+    assert divalproex["reproductive_potential_info"] == ""
+
+def test_bulk_medications_filter():
+    data = load_bulk_dailymed_data([SAMPLE_ZIP], medications=["lamotrigine"])
+    assert [entry["set_id"] for entry in data["medications"]] == ["fixture-lamotrigine-0001"]
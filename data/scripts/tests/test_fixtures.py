@@ -0,0 +1,85 @@
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+import downloader
+import fixtures
+import http_cache
+import http_client
+
+URL = "https://fixtures.example.org/page"
+PAGE = b"<html><body><p>Lamotrigine and breastfeeding</p></body></html>"
+
+def extract_text(content, encoding):
+    return content.decode(encoding or "utf-8")
+
+def response(status, body=b"", headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.reason = "OK" if status == 200 else ""
+    resp.headers = CaseInsensitiveDict(headers or {})
+    resp._content = body
+    resp._content_consumed = True
+    return resp
+
+class FakeSession:
+    """An origin with validators and Range support, behind http_client.fetch."""
+
+    def __init__(self):
+        self.sent = []
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        headers = headers or {}
+        self.sent.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return response(304, headers={"ETag": '"v1"'})
+        if headers.get("Range"):
+            start = int(headers["Range"].split("=")[1].rstrip("-"))
+            return response(206, PAGE[start:], {"ETag": '"v1"', "Content-Range": f"bytes {start}-{len(PAGE) - 1}/{len(PAGE)}"})
+        return response(200, PAGE, {"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(http_client, "get_session", lambda: session)
+    monkeypatch.setattr(fixtures, "FIXTURE_ARCHIVE", str(tmp_path / "responses.zip"))
+    monkeypatch.setattr(fixtures, "_replay_archive", None)
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "warm_cache"))
+    return session
+
+def replay_in_clean_sandbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(fixtures, "FIXTURE_MODE", "replay")
+    monkeypatch.setattr(fixtures, "_replay_archive", None)
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "clean_cache"))
+
+def test_recording_with_a_warm_cache_replays_the_whole_page(tmp_path, monkeypatch, session):
+    http_cache.store_entry(http_cache.extraction_key(URL, extract_text, ()), '"v1"', None, "stale result")
+    monkeypatch.setattr(fixtures, "FIXTURE_MODE", "record")
+    assert http_cache.fetch_and_extract(URL, extract_text) == PAGE.decode()
+    assert "If-None-Match" not in session.sent[-1]
+
+    replay_in_clean_sandbox(tmp_path, monkeypatch)
+    assert http_cache.fetch_and_extract(URL, extract_text) == PAGE.decode()
+
+def test_recording_a_download_keeps_the_whole_file(tmp_path, monkeypatch, session):
+    path = str(tmp_path / "warm" / "page.html")
+    monkeypatch.setattr(fixtures, "FIXTURE_MODE", "record")
+    downloader.download_file(URL, path)
+    # Warm download cache and a leftover partial file: neither shapes the recording
+    with open(path + ".part", "wb") as f:
+        f.write(PAGE[:10])
+    downloader._save_part_meta(path + ".part.json", URL, response(200, headers={"ETag": '"v1"'}))
+    downloader.download_file(URL, path)
+    assert all("If-None-Match" not in sent and "Range" not in sent for sent in session.sent)
+
+    replay_in_clean_sandbox(tmp_path, monkeypatch)
+    result = downloader.download_file(URL, str(tmp_path / "clean" / "page.html"))
+    assert result["size"] == len(PAGE)
+
+def test_replayed_304_without_a_cache_entry_raises(tmp_path, monkeypatch, session):
+    # An archive recorded before conditional headers were dropped while recording
+    fixtures.record(URL, None, response(304, headers={"ETag": '"v1"'}))
+    replay_in_clean_sandbox(tmp_path, monkeypatch)
+    with pytest.raises(requests.exceptions.HTTPError):
+        http_cache.fetch_and_extract(URL, extract_text)
+    with pytest.raises(downloader.DownloadError):
+        downloader.download_file(URL, str(tmp_path / "clean" / "page.html"))
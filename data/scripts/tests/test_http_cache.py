@@ -0,0 +1,98 @@
+import shutil
+import pytest
+import requests
+import http_cache
+from fake_http import FakeFetch, FakeResponse
+
+PAGE = b"<html><body><p>Lamotrigine</p></body></html>"
+URL = "https://example.org/page"
+
+def extract_text(content, encoding, suffix=""):
+    return content.decode(encoding or "utf-8") + suffix
+
+def extract_length(content, encoding):
+    return len(content)
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "http_cache"))
+
+def serve(monkeypatch, respond):
+    fake = FakeFetch(respond)
+    monkeypatch.setattr(http_cache, "fetch", fake)
+    return fake
+
+def etag_server(etag='"v1"', content=PAGE):
+    def respond(headers):
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, content, {"ETag": etag, "Content-Type": "text/html; charset=utf-8"})
+    return respond
+
+def test_miss_fetches_extracts_and_stores(monkeypatch):
+    fake = serve(monkeypatch, etag_server())
+    assert http_cache.fetch_and_extract(URL, extract_text) == PAGE.decode()
+    assert fake.requests == [{}]
+    entry = http_cache.load_entry(http_cache.extraction_key(URL, extract_text, ()))
+    assert entry["etag"] == '"v1"' and entry["result"] == PAGE.decode()
+
+def test_not_modified_reuses_cached_result(monkeypatch):
+    serve(monkeypatch, etag_server())
+    http_cache.fetch_and_extract(URL, extract_text)
+
+    def parse_again(*args):
+        raise AssertionError("a 304 must not be parsed again")
+    monkeypatch.setattr(http_cache, "run_parse", parse_again)
+    fake = serve(monkeypatch, etag_server())
+    assert http_cache.fetch_and_extract(URL, extract_text) == PAGE.decode()
+    assert fake.requests == [{"If-None-Match": '"v1"'}]
+
+def test_changed_page_replaces_cached_result(monkeypatch):
+    serve(monkeypatch, etag_server('"v1"'))
+    http_cache.fetch_and_extract(URL, extract_text)
+    fake = serve(monkeypatch, etag_server('"v2"', b"new page"))
+    assert http_cache.fetch_and_extract(URL, extract_text) == "new page"
+    assert fake.requests == [{"If-None-Match": '"v1"'}]
+    assert http_cache.load_entry(http_cache.extraction_key(URL, extract_text, ()))["etag"] == '"v2"'
+
+def test_other_extractor_or_args_miss(monkeypatch):
+    serve(monkeypatch, etag_server())
+    http_cache.fetch_and_extract(URL, extract_text)
+    # Same URL and validators, but another parser or other args: no conditional request, no reuse
+    fake = serve(monkeypatch, etag_server())
+    assert http_cache.fetch_and_extract(URL, extract_length) == len(PAGE)
+    assert http_cache.fetch_and_extract(URL, extract_text, "!") == PAGE.decode() + "!"
+    assert fake.requests == [{}, {}]
+
+def test_parser_version_bump_misses(monkeypatch):
+    serve(monkeypatch, etag_server())
+    http_cache.fetch_and_extract(URL, extract_text)
+    monkeypatch.setattr(http_cache, "PARSER_VERSION", http_cache.PARSER_VERSION + 1)
+    fake = serve(monkeypatch, etag_server())
+    http_cache.fetch_and_extract(URL, extract_text)
+    assert fake.requests == [{}]
+
+def test_entry_for_another_key_is_ignored():
+    key = http_cache.extraction_key(URL, extract_text, ())
+    other_key = http_cache.cache_key("download", URL)
+    http_cache.store_entry(key, '"v1"', None, "cached")
+    # A file holding another key's record (a hash collision, say) is not this key's entry
+    shutil.copyfile(http_cache.cache_path(key), http_cache.cache_path(other_key))
+    assert http_cache.load_entry(other_key) is None
+    assert http_cache.load_entry(key)["result"] == "cached"
+
+def test_unvalidated_response_is_not_cached(monkeypatch):
+    serve(monkeypatch, lambda headers: FakeResponse(200, PAGE))
+    http_cache.fetch_and_extract(URL, extract_text)
+    assert http_cache.load_entry(http_cache.extraction_key(URL, extract_text, ())) is None
+
+def test_failed_fetch_raises(monkeypatch):
+    serve(monkeypatch, lambda headers: FakeResponse(500))
+    with pytest.raises(requests.exceptions.HTTPError):
+        http_cache.fetch_and_extract(URL, extract_text)
+
+def test_key_is_the_same_when_the_script_runs_directly(monkeypatch):
+    imported = http_cache.extraction_key(URL, extract_text, ())
+    # Run as `python3 script.py`, the same function's module is __main__
+    monkeypatch.setattr(extract_text, "__module__", "__main__")
+    assert http_cache.extraction_key(URL, extract_text, ()) == imported
@@ -0,0 +1,62 @@
+import random
+import pytest
+from keywords import KeywordMatcher
+
+# Keyword lists the extractors used to check with `keyword in text.lower()`
+LACTATION_KEYWORDS = ["lactation", "breastfeeding", "breast milk", "nursing", "infant", "maternal", "drug", "medication"]
+EPILEPSY_KEYWORDS = ["epilepsy", "seizure", "pregnancy", "medication", "anti-seizure", "neurologist", "neurology",
+                     "epileptic", "birth control", "contraception", "postpartum", "prenatal", "maternal", "fetal"]
+
+TEXTS = [
+    "",
+    "Nothing relevant here.",
+    "Anti-Seizure Medications and PREGNANCY",
+    "Seizures during pregnancy",
+    "Breast Milk and Breastfeeding while nursing an infant",
+    "breast  milk",
+    "Neurology referral: see a neurologist",
+    "postpartum-contraception, birth control",
+    "drugstore medications",
+    "epilepticus",
+]
+
+def substring_search(keywords, text):
+    return any(keyword in text.lower() for keyword in keywords)
+
+def substring_classes(keywords, text):
+    return {keyword for keyword in keywords if keyword in text.lower()}
+
+def random_texts(keywords, count=200, seed=0):
+    """Texts built from keyword fragments, filler and mixed case, so matches overlap and touch."""
+    rng = random.Random(seed)
+    pieces = keywords + [keyword[:len(keyword) // 2] for keyword in keywords] + ["", " ", "-", "x", "anti", "ies", "."]
+    for _ in range(count):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+        yield "".join(char.upper() if rng.random() < 0.3 else char for char in text)
+
+@pytest.mark.parametrize("keywords", [LACTATION_KEYWORDS, EPILEPSY_KEYWORDS])
+def test_search_matches_substring_check(keywords):
+    matcher = KeywordMatcher(keywords)
+    for text in TEXTS + list(random_texts(keywords)):
+        assert matcher.search(text) == substring_search(keywords, text), text
+
+@pytest.mark.parametrize("keywords", [LACTATION_KEYWORDS, EPILEPSY_KEYWORDS])
+def test_classes_match_substring_check(keywords):
+    matcher = KeywordMatcher(keywords)
+    for text in TEXTS + list(random_texts(keywords)):
+        assert matcher.classes(text) == substring_classes(keywords, text), text
+
+def test_classes_of_a_dict_are_its_keys():
+    matcher = KeywordMatcher({"valproic acid": ["valproic acid", "valproate", "divalproex"], "lamotrigine": ["lamotrigine"]})
+    assert matcher.classes("DIVALPROEX SODIUM | Lamotrigine") == {"valproic acid", "lamotrigine"}
+    assert matcher.classes("levetiracetam") == set()
+
+def test_word_boundary_skips_partial_words():
+    matcher = KeywordMatcher(["drug"], word_boundary=True)
+    assert matcher.search("a drug label")
+    assert not matcher.search("drugstore")
+
+def test_stem_matches_inflections():
+    matcher = KeywordMatcher(["seizure"], stem=True)
+    assert matcher.search("Seizures")
+    assert not matcher.search("anti seize")
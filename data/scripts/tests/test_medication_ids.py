@@ -0,0 +1,32 @@
+import json
+from extract_dailymed_data import label_medications
+from medication_ids import build_ids
+from medication_names import MedicationIds, medication_key
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def test_medication_key_drops_salts_forms_and_brackets():
+    assert medication_key("Divalproex Sodium Delayed-Release Tablets [Teva]") == "divalproex"
+    assert medication_key("VALPROIC ACID") == "valproic acid"
+
+def test_dailymed_names_and_ingredients_are_indexed(tmp_path):
+    write(tmp_path / "comprehensive_epilepsy_medications.json",
+          {"medications": [{"medication": "Valproic Acid", "brand_names": ["Depakote"]}]})
+    write(tmp_path / "dailymed_medication_data.json", {"medications": [
+        {"medication_name": "valproic acid", "active_ingredient": "DIVALPROEX SODIUM"},
+        {"medication_name": "zonisamide", "active_ingredient": "ZONISAMIDE"},
+        {"medication_name": "eslicarbazepine", "active_ingredient": "ESLICARBAZEPINE ACETATE"},
+    ]})
+    ids = MedicationIds(build_ids(str(tmp_path)))
+    assert ids.resolve("Zonisamide") == "zonisamide"
+    assert ids.resolve("eslicarbazepine acetate") == "eslicarbazepine"
+    assert ids.resolve("DIVALPROEX SODIUM") == "valproic-acid"
+    # The curated files, read first, give the generic its display name
+    assert ids.name("valproic-acid") == "Valproic Acid"
+
+def test_label_medications_resolve_like_the_index():
+    assert label_medications({"active_ingredients": ["DIVALPROEX SODIUM"]}) == ["valproic acid"]
+    assert label_medications({"active_ingredients": ["Lacosamide", "VALPROATE SODIUM"]}) == ["valproic acid", "lacosamide"]
+    assert label_medications({"active_ingredients": ["IBUPROFEN"]}) == []
@@ -0,0 +1,22 @@
+import pipeline
+
+def test_every_remote_stage_has_hosts():
+    for stage in pipeline.STAGES:
+        assert bool(pipeline.stage_hosts(stage)) == bool(stage.get("remote")), stage["name"]
+
+def test_stage_hosts_come_from_declared_sources(tmp_path, monkeypatch):
+    (tmp_path / "client.py").write_text('BASE_URL = "https://api.example.org/v2"\n')
+    (tmp_path / "extract.py").write_text(
+        '# See https://docs.example.com/guide for the format\n'
+        'SOURCES = [{"name": "A", "url": "https://A.example.net/page"}, {"name": "B", "url": "https://b.example.net/"}]\n'
+        'LINKS = ["https://unrelated.example.com/"]\n'
+    )
+    monkeypatch.setattr(pipeline, "SCRIPTS_DIR", str(tmp_path))
+    stage = {"name": "extract", "script": "extract.py", "remote": True, "sources": ["SOURCES", "client.py:BASE_URL"]}
+    assert pipeline.stage_hosts(stage) == {"a.example.net", "b.example.net", "api.example.org"}
+
+def test_stage_hosts_of_single_host_stages():
+    stages = {stage["name"]: stage for stage in pipeline.STAGES}
+    assert pipeline.stage_hosts(stages["lactmed"]) == {"www.ncbi.nlm.nih.gov"}
+    assert pipeline.stage_hosts(stages["dailymed"]) == {"dailymed.nlm.nih.gov"}
+    assert pipeline.stage_hosts(stages["cdc"]) == {"www.cdc.gov"}
@@ -0,0 +1,50 @@
+import json
+import pytest
+import outputs
+from record_output import RecordOutput, compact, stream_name
+
+DOCUMENT = {"source": "test", "extracted_at": "2026-01-01T00:00:00", "sources": [], "sections": []}
+RECORDS = [("sources", 2, {"url": "c"}), ("sections", 0, {"title": "A"}),
+           ("sources", 0, {"url": "a"}), ("sources", 1, {"url": "b"})]
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(outputs, "OUTPUT_DIR", str(tmp_path))
+    return tmp_path
+
+def fill(stream):
+    output = RecordOutput("test_output.json", dict(DOCUMENT), stream=stream)
+    for list_name, index, record in RECORDS:
+        output.add(list_name, index, record)
+    output.document["total_sources"] = output.counts["sources"]
+    return output.close()
+
+def test_stream_compacts_to_the_in_memory_output(output_dir):
+    in_memory = fill(stream=False)
+    in_memory_file = (output_dir / "test_output.json").read_text(encoding="utf-8")
+    (output_dir / "test_output.json").unlink()
+    streamed = fill(stream=True)
+    assert streamed == in_memory
+    assert (output_dir / "test_output.json").read_text(encoding="utf-8") == in_memory_file
+    assert streamed["sources"] == [{"url": "a"}, {"url": "b"}, {"url": "c"}]
+    assert streamed["total_sources"] == 3
+
+def test_stream_is_written_as_records_arrive(output_dir):
+    output = RecordOutput("test_output.json", dict(DOCUMENT), stream=True)
+    output.add("sources", 1, {"url": "b"})
+    with open(output_dir / stream_name("test_output.json"), "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["kind"] for line in lines] == ["header", "record"]
+    assert lines[1] == {"kind": "record", "list": "sources", "index": 1, "record": {"url": "b"}}
+    output.close()
+
+def test_stream_cut_off_mid_run_compacts_what_it_has(output_dir):
+    output = RecordOutput("test_output.json", dict(DOCUMENT), stream=True)
+    output.add("sources", 1, {"url": "b"})
+    output.add("sources", 0, {"url": "a"})
+    output._file.write('{"kind": "record", "list": "sources", "ind')
+    output._file.close()
+    document = compact("test_output.json")
+    assert document["sources"] == [{"url": "a"}, {"url": "b"}]
+    assert document["sections"] == []
+    assert "total_sources" not in document
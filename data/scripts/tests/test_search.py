@@ -0,0 +1,15 @@
+from search import snippet
+
+def test_snippet_trims_to_whole_words_across_newlines():
+    text = "Intro line\nLamotrigine and breastfeeding\nCarbamazepine levels"
+    start = text.index("line")
+    end = text.index("Carbamazepine") + 3
+    match_start = text.index("Lamotrigine")
+    result = snippet(text, start + 2, end, [(match_start, match_start + len("Lamotrigine"), "lamotrigin")])
+    assert result == "…<mark>Lamotrigine</mark> and breastfeeding…"
+
+def test_snippet_escapes_text_around_the_marks():
+    text = "a <b>bold</b> & lamotrigine <script>"
+    match_start = text.index("lamotrigine")
+    result = snippet(text, 0, len(text), [(match_start, match_start + len("lamotrigine"), "lamotrigin")])
+    assert result == "a &lt;b&gt;bold&lt;/b&gt; &amp; <mark>lamotrigine</mark> &lt;script&gt;"
@@ -0,0 +1,64 @@
+import json
+import sqlite3
+import section_dedup
+from knowledge_db import build_database
+from search_index import load_documents
+from section_dedup import find_clusters, jaccard, load_duplicates, shingles, write_duplicates
+
+BASE = [f"w{i}" for i in range(200)]
+
+def text(words):
+    return " ".join(words)
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def test_chained_members_not_alike_to_the_canonical_stay_apart():
+    a = text(BASE)
+    b = text(BASE[15:] + [f"x{i}" for i in range(15)])
+    c = text(BASE[30:] + [f"x{i}" for i in range(15)] + [f"y{i}" for i in range(15)])
+    sets = [shingles(t) for t in (a, b, c)]
+    assert jaccard(sets[0], sets[1]) >= 0.8 and jaccard(sets[1], sets[2]) >= 0.8 > jaccard(sets[0], sets[2])
+    clusters = find_clusters([{"content": t} for t in (a, b, c)], num_perm=64, bands=64)
+    assert [[i for i, _ in cluster] for cluster in clusters] == [[0, 1]]
+
+def test_pairs_not_involving_the_first_bucket_member_are_found(monkeypatch):
+    # Every section lands in the same buckets, A first; B and C match, A matches neither
+    monkeypatch.setattr(section_dedup, "minhash", lambda hashes, num_perm: (0,) * num_perm)
+    a = text(f"a{i}" for i in range(300))
+    b = text(BASE)
+    c = text(BASE[:190] + ["z"] * 3)
+    clusters = find_clusters([{"content": t} for t in (a, b, c)])
+    assert [[i for i, _ in cluster] for cluster in clusters] == [[1, 2]]
+
+def build(tmp_path, sections):
+    write(tmp_path / "pages.json", {"sections": [{"title": title, "content": [content]} for title, content in sections]})
+    db_path = str(tmp_path / "knowledge.db")
+    build_database(db_path, ["pages.json"], str(tmp_path))
+    return db_path
+
+def test_knowledge_db_keeps_one_copy_with_back_references(tmp_path):
+    page = text(BASE)
+    db_path = build(tmp_path, [("Original", page), ("Copy", page), ("Other", text(f"o{i}" for i in range(50)))])
+    con = sqlite3.connect(db_path)
+    rows = con.execute("SELECT title, content != '', canonical_id FROM sections ORDER BY id").fetchall()
+    searchable = {title for (title,) in con.execute("SELECT title FROM search WHERE row_table = 'sections'")}
+    con.close()
+    assert rows == [("Original", 1, None), ("Copy", 0, 1), ("Other", 1, None)]
+    assert searchable == {"Original", "Other"}
+    original = next(doc for doc in load_documents(db_path) if doc["title"] == "Original")
+    assert original["duplicates"] == [{"file": "pages.json", "title": "Copy", "row_id": 2}]
+
+def test_duplicates_exported_from_another_database_are_ignored(tmp_path, monkeypatch):
+    page = text(BASE)
+    db_path = build(tmp_path, [("Original", page), ("Copy", page)])
+    monkeypatch.setattr(section_dedup, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(section_dedup, "write_json", lambda name, data: write(tmp_path / name, data))
+    write_duplicates()
+    assert load_duplicates(str(tmp_path)) == {2: 1}
+
+    # Rebuilt with other sections: the row ids in the export no longer mean the same
+    (tmp_path / "knowledge.db").unlink()
+    build(tmp_path, [("New", text(f"n{i}" for i in range(50))), ("Original", page), ("Copy", page)])
+    assert load_duplicates(str(tmp_path)) == {}
@@ -0,0 +1,75 @@
+import pytest
+from bs4 import BeautifulSoup
+from keywords import KeywordMatcher
+from sections import extract_sections, HEADING_TAGS, CONTENT_TAGS
+
+PAGE = """
+<html><body><main>
+  <p>Text before any heading belongs to no section at all.</p>
+  <h1>Epilepsy and pregnancy</h1>
+  <p>Most people with epilepsy have healthy pregnancies and babies.</p>
+  <span>Spans are not content blocks, whatever they say.</span>
+  <ul><li>Plan the pregnancy with your neurologist</li><li>Take folic acid daily</li></ul>
+  <p>Short.</p>
+  <h2>Medication</h2>
+  <div>Some anti-seizure medications raise the risk of birth defects.
+    <h3>Nested heading</h3><p>Valproate carries the highest risk of all.</p>
+    <p>Lamotrigine and levetiracetam are among the lower-risk options.</p>
+  </div>
+  <h5>Not a section heading</h5>
+  <p>This still belongs to Medication, since h5 does not end it.</p>
+  <h3>Empty section</h3>
+  <h4>Breastfeeding</h4>
+  <ol><li>Most medications are compatible with breastfeeding</li></ol>
+  <p>Talk to your doctor about pregnancy and breastfeeding.</p>
+  <h2>  </h2>
+  <p>Content under an untitled heading is dropped with it.</p>
+</main></body></html>
+"""
+
+def find_next_siblings_sections(root, heading_tags=HEADING_TAGS, content_tags=CONTENT_TAGS,
+                                min_title_length=1, min_text_length=10, keywords=None,
+                                title_keywords=None, separator="", keep_empty=False):
+    """The per-heading find_next_siblings() loop the extractors used before sections.py."""
+    sections = []
+    for heading in root.find_all(heading_tags):
+        title = heading.get_text(strip=True)
+        if min_title_length is not None and (not title or len(title) < min_title_length):
+            continue
+        content = []
+        for sibling in heading.find_next_siblings():
+            if sibling.name in heading_tags:
+                break
+            if sibling.name in content_tags:
+                text = sibling.get_text(separator, strip=True)
+                if min_text_length is not None and not (text and len(text) > min_text_length):
+                    continue
+                if keywords is not None and not keywords.search(text):
+                    continue
+                content.append(text)
+        if not content and not keep_empty:
+            continue
+        if title_keywords is not None and not title_keywords.search(title):
+            continue
+        sections.append({"title": title, "content": content})
+    return sections
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"min_title_length": 3, "min_text_length": 15},
+    {"min_title_length": None, "min_text_length": None, "keep_empty": True},
+    {"heading_tags": ["h2", "h3"], "content_tags": ["p", "ul", "ol"], "separator": " ", "keep_empty": True},
+    {"keywords": KeywordMatcher(["pregnan", "breastfeed"])},
+    {"title_keywords": KeywordMatcher(["medication", "breastfeeding"]), "keep_empty": True},
+])
+def test_matches_find_next_siblings(options):
+    root = BeautifulSoup(PAGE, "html.parser").find("main")
+    assert extract_sections(root, **options) == find_next_siblings_sections(root, **options)
+
+def test_headings_own_blocks_up_to_the_next_sibling_heading():
+    root = BeautifulSoup(PAGE, "html.parser").find("main")
+    sections = {section["title"]: section["content"] for section in extract_sections(root)}
+    assert list(sections) == ["Epilepsy and pregnancy", "Medication", "Nested heading", "Breastfeeding"]
+    assert sections["Medication"][-1] == "This still belongs to Medication, since h5 does not end it."
+    assert sections["Nested heading"] == ["Valproate carries the highest risk of all.",
+                                          "Lamotrigine and levetiracetam are among the lower-risk options."]
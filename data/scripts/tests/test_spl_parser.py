@@ -0,0 +1,99 @@
+import io
+import os
+from spl_parser import parse_spl, parse_spl_path
+
+SAMPLE_ZIP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "dailymed_bulk_sample.zip")
+
+LABEL = b"""<?xml version="1.0" encoding="UTF-8"?>
+<document xmlns="urn:hl7-org:v3">
+  <setId root="set-0001"/>
+  <versionNumber value="7"/>
+  <effectiveTime value="20240301"/>
+  <title>LAMOTRIGINE <content>tablets</content>
+    [Example Labs]</title>
+  <author><assignedEntity><representedOrganization><name>Example Labs</name>
+    <assignedEntity><assignedOrganization><representedOrganization><name>Repackager</name></representedOrganization></assignedOrganization></assignedEntity>
+  </representedOrganization></assignedEntity></author>
+  <component><structuredBody>
+    <component><section>
+      <code code="48780-1"/>
+      <title>Product data</title>
+      <subject><manufacturedProduct><manufacturedProduct>
+        <ingredient classCode="ACTIM"><ingredientSubstance><name>LAMOTRIGINE</name></ingredientSubstance></ingredient>
+        <ingredient classCode="IACT"><ingredientSubstance><name>LACTOSE</name></ingredientSubstance></ingredient>
+        <asContent><containerPackagedProduct><code code="12345-678-90" codeSystem="2.16.840.1.113883.6.69"/></containerPackagedProduct></asContent>
+        <asContent><containerPackagedProduct><code code="12345-678-90" codeSystem="2.16.840.1.113883.6.69"/></containerPackagedProduct></asContent>
+        <asContent><containerPackagedProduct><code code="OTHER" codeSystem="1.2.3"/></containerPackagedProduct></asContent>
+      </manufacturedProduct></manufacturedProduct></subject>
+    </section></component>
+    <component><section>
+      <code code="34067-9"/>
+      <title>Indications</title>
+      <text><paragraph>Not a pregnancy section.</paragraph></text>
+    </section></component>
+    <component><section>
+      <code code="42228-7"/>
+      <title>8.1 Pregnancy</title>
+      <text><paragraph>Exposure  registry
+        information.</paragraph></text>
+      <component><section>
+        <code code="42228-7"/>
+        <title>Risk Summary</title>
+        <text>
+          <list><item>First item <list><item>nested item</item></list></item></list>
+          <table><tr><td>Dose</td><td>Risk</td></tr></table>
+        </text>
+      </section></component>
+    </section></component>
+    <component><section>
+      <code code="77290-5"/>
+      <title>8.2 Lactation</title>
+      <text><paragraph>Lamotrigine is present in milk.</paragraph></text>
+    </section></component>
+    <component><section>
+      <code code="34080-2"/>
+      <title>Nursing Mothers</title>
+      <text><paragraph>A second lactation section is ignored.</paragraph></text>
+    </section></component>
+  </structuredBody></component>
+</document>
+"""
+
+def test_metadata_and_product_data():
+    label = parse_spl(io.BytesIO(LABEL))
+    assert label["set_id"] == "set-0001"
+    assert label["version"] == "7"
+    assert label["effective_time"] == "20240301"
+    assert label["title"] == "LAMOTRIGINE tablets [Example Labs]"
+    assert label["manufacturer"] == "Example Labs"
+    assert label["active_ingredients"] == ["LAMOTRIGINE"]
+    assert label["ndc"] == ["12345-678-90"]
+
+def test_sections_keep_subsections_and_nested_blocks():
+    sections = parse_spl(io.BytesIO(LABEL))["sections"]
+    assert sections == {
+        "pregnancy": {
+            "title": "8.1 Pregnancy",
+            "content": ["Exposure registry information.", "Risk Summary", "First item nested item", "Dose | Risk"]
+        },
+        "lactation": {"title": "8.2 Lactation", "content": ["Lamotrigine is present in milk."]}
+    }
+
+def test_keep_sees_the_product_data_and_can_stop_parsing():
+    seen = []
+
+    def keep(label):
+        seen.append(list(label["active_ingredients"]))
+        return False
+
+    assert parse_spl(io.BytesIO(LABEL), keep=keep) is None
+    assert seen == [["LAMOTRIGINE"]]
+    assert parse_spl(io.BytesIO(LABEL), keep=lambda label: True)["sections"]
+
+def test_bulk_archive_labels_are_read_from_nested_zips():
+    labels = dict(parse_spl_path(SAMPLE_ZIP))
+    assert sorted(label["set_id"] for label in labels.values()) == [
+        "fixture-divalproex-0002", "fixture-ibuprofen-0003", "fixture-lamotrigine-0001"]
+    divalproex = next(label for label in labels.values() if label["set_id"] == "fixture-divalproex-0002")
+    # Nursing Mothers stands in for Lactation in labels predating the PLLR format
+    assert divalproex["sections"]["lactation"]["title"] == "8.3 Nursing Mothers"
@@ -1,6 +1,7 @@
 import { NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
+import zlib from 'zlib'
 
 type KnowledgeItem = {
   id: string
@@ -272,12 +273,87 @@ function categorizeFile(filename: string, content: string): { type: KnowledgeIte
   return { type: 'article', category: 'General Information', tags: ['general', 'information'] }
 }
 
+// data/scripts/knowledge_index.py runs the heuristics above once and writes the
+// items to knowledge_index.json (plus .gz/.br copies); keep the two in step
+const INDEX_FILE = 'knowledge_index.json'
+const INDEX_FILES = [INDEX_FILE, `${INDEX_FILE}.gz`, `${INDEX_FILE}.br`]
+const INDEX_SCHEMA_VERSION = 1
+
+type PrebuiltIndex = {
+  key: string
+  version: string
+  json: Uint8Array
+  gzip?: Uint8Array
+  brotli?: Uint8Array
+}
+
+// Loaded once per process and reloaded only when the file is replaced
+let prebuiltIndex: PrebuiltIndex | null = null
+
+function readCompressedCopy(filePath: string, json: Buffer, decompress: (data: Buffer) => Buffer): Uint8Array | undefined {
+  try {
+    const compressed = fs.readFileSync(filePath)
+    // A copy left over from an older build must not be served
+    return decompress(compressed).equals(json) ? new Uint8Array(compressed) : undefined
+  } catch (_err) {
+    return undefined
+  }
+}
+
+function loadPrebuiltIndex(dataDir: string): PrebuiltIndex | null {
+  const indexPath = path.join(dataDir, INDEX_FILE)
+  try {
+    const stat = fs.statSync(indexPath)
+    const key = `${stat.ino}:${stat.size}:${stat.mtimeMs}`
+    if (prebuiltIndex && prebuiltIndex.key === key) return prebuiltIndex
+
+    const json = fs.readFileSync(indexPath)
+    const parsed = JSON.parse(json.toString('utf8'))
+    if (parsed.schema_version !== INDEX_SCHEMA_VERSION || !Array.isArray(parsed.items)) return null
+    prebuiltIndex = {
+      key,
+      version: String(parsed.version),
+      json: new Uint8Array(json),
+      gzip: readCompressedCopy(`${indexPath}.gz`, json, zlib.gunzipSync),
+      brotli: readCompressedCopy(`${indexPath}.br`, json, zlib.brotliDecompressSync),
+    }
+    return prebuiltIndex
+  } catch (_err) {
+    return null
+  }
+}
+
+function serveIndex(index: PrebuiltIndex, request: Request): Response {
+  const etag = `"${index.version}"`
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json; charset=utf-8',
+    ETag: etag,
+    Vary: 'Accept-Encoding',
+  }
+  if (request.headers.get('if-none-match') === etag) {
+    return new Response(null, { status: 304, headers })
+  }
+  const acceptEncoding = request.headers.get('accept-encoding') || ''
+  if (index.brotli && /\bbr\b/.test(acceptEncoding)) {
+    return new Response(index.brotli, { headers: { ...headers, 'Content-Encoding': 'br' } })
+  }
+  if (index.gzip && /\bgzip\b/.test(acceptEncoding)) {
+    return new Response(index.gzip, { headers: { ...headers, 'Content-Encoding': 'gzip' } })
+  }
+  return new Response(index.json, { headers })
+}
+
 export const runtime = 'nodejs'
 export const maxDuration = 30
 
-export async function GET() {
+export async function GET(request: Request) {
   try {
     const dataDir = path.join(process.cwd(), 'data')
+
+    // Serve the prebuilt index when there is one; otherwise scan the files
+    const index = loadPrebuiltIndex(dataDir)
+    if (index) return serveIndex(index, request)
+
     const knowledgeItems: KnowledgeItem[] = []
 
     // Get all files in data directory
@@ -287,7 +363,7 @@ export async function GET() {
       const filePath = path.join(dataDir, file)
       const stat = fs.statSync(filePath)
       
-      if (stat.isDirectory()) continue
+      if (stat.isDirectory() || INDEX_FILES.includes(file)) continue
       
       try {
         const content = fs.readFileSync(filePath, 'utf8')
@@ -6,17 +6,55 @@ echo "Copying data files for Vercel deployment..."
 # Create data directory if it doesn't exist
 mkdir -p data
 
-# Copy essential JSON data files
-cp ../data/comprehensive_epilepsy_medications.json data/ 2>/dev/null || echo "comprehensive_epilepsy_medications.json not found"
-cp ../data/epilepsy_medication_safety_database.json data/ 2>/dev/null || echo "epilepsy_medication_safety_database.json not found"
-cp ../data/epilepsy_pregnancy_comprehensive_database.json data/ 2>/dev/null || echo "epilepsy_pregnancy_comprehensive_database.json not found"
-cp ../data/medical_terms_glossary.json data/ 2>/dev/null || echo "medical_terms_glossary.json not found"
-cp ../data/comprehensive_pregnancy_data.json data/ 2>/dev/null || echo "comprehensive_pregnancy_data.json not found"
-
-# Copy CSV files
-cp ../data/seizure_tracking_log.csv data/ 2>/dev/null || echo "seizure_tracking_log.csv not found"
-cp ../data/epilepsy_medications.csv data/ 2>/dev/null || echo "epilepsy_medications.csv not found"
-cp ../data/pregnancy_tracking_schedule.csv data/ 2>/dev/null || echo "pregnancy_tracking_schedule.csv not found"
+# Essential JSON data files
+JSON_FILES=(
+  comprehensive_epilepsy_medications.json
+  epilepsy_medication_safety_database.json
+  epilepsy_pregnancy_comprehensive_database.json
+  medical_terms_glossary.json
+  comprehensive_pregnancy_data.json
+)
+
+# CSV files
+CSV_FILES=(
+  seizure_tracking_log.csv
+  epilepsy_medications.csv
+  pregnancy_tracking_schedule.csv
+)
+
+# SQLite database of all the data, built by data/scripts/knowledge_db.py
+DB_FILES=(
+  knowledge.db
+)
+
+FILES=()
+for file in "${JSON_FILES[@]}" "${CSV_FILES[@]}" "${DB_FILES[@]}"; do
+  if [ -f "../data/$file" ]; then
+    FILES+=("$file")
+  else
+    echo "$file not found"
+  fi
+done
+
+# Link the files out of the content-addressed store in ../data/.artifacts, so each
+# blob is stored once and unchanged files are left alone. Without python3, copy them.
+if [ ${#FILES[@]} -gt 0 ]; then
+  if command -v python3 >/dev/null 2>&1 && python3 ../data/scripts/artifact_store.py link data "${FILES[@]}"; then
+    :
+  else
+    for file in "${FILES[@]}"; do
+      # Remove first: data/$file may be a link into the store, which must not be overwritten in place
+      rm -f "data/$file"
+      cp "../data/$file" data/
+    done
+  fi
+fi
+
+# Prebuild the Knowledge Center index from exactly these files, so the API route
+# loads one file instead of scanning data/ on every request
+if command -v python3 >/dev/null 2>&1; then
+  DATA_OUTPUT_DIR=data python3 ../data/scripts/knowledge_index.py || echo "Knowledge index not built; the route will scan data/ instead"
+fi
 
 echo "Data files copied successfully!"
 echo "Files in data directory:"